@@ -0,0 +1,58 @@
+import asyncio
+import logging
+import time
+
+log = logging.getLogger("aurora").getChild("loop")
+
+
+class LoopLagMonitor:
+    """Measures how late the asyncio event loop runs scheduled callbacks.
+
+    Sleeps for a short ``interval`` in a loop and records how much later than
+    requested it wakes up. Anything that blocks the loop (inline inference,
+    blocking audio writes) shows up directly as lag, and so does the jitter in
+    delivering mic frames from the PortAudio callback. A summary is logged every
+    ``report_seconds``.
+    """
+
+    def __init__(self, interval: float = 0.02, report_seconds: float = 300.0) -> None:
+        self._interval = interval
+        self._report_seconds = report_seconds
+        self._reset_stats()
+
+    def _reset_stats(self) -> None:
+        self._count = 0
+        self._total = 0.0
+        self._max = 0.0
+        self._late = 0   # samples more than one mic frame (~43 ms) late
+
+    def snapshot(self) -> dict:
+        """Lag statistics (milliseconds) since the last report."""
+        mean = self._total / self._count if self._count else 0.0
+        return {
+            "samples": self._count,
+            "mean_ms": round(mean * 1000.0, 2),
+            "max_ms": round(self._max * 1000.0, 2),
+            "late_over_43ms": self._late,
+        }
+
+    async def run(self) -> None:
+        next_report = time.monotonic() + self._report_seconds
+        while True:
+            start = time.monotonic()
+            await asyncio.sleep(self._interval)
+            now = time.monotonic()
+            lag = max(0.0, now - start - self._interval)
+            self._count += 1
+            self._total += lag
+            self._max = max(self._max, lag)
+            if lag > 0.043:
+                self._late += 1
+            if now >= next_report:
+                stats = self.snapshot()
+                log.info(
+                    "Event loop lag: mean=%.2fms max=%.2fms late(>43ms)=%d over %d samples",
+                    stats["mean_ms"], stats["max_ms"], stats["late_over_43ms"], stats["samples"],
+                )
+                self._reset_stats()
+                next_report = now + self._report_seconds
@@ -1,22 +1,28 @@
 import base64
+import functools
 import json
 import logging
 import os
-import struct
 import time
 import wave
 from collections import deque
+from dataclasses import dataclass
 from datetime import datetime, timedelta
 import requests
 from settings import settings
 from logging_config import configure_logging
 from wake_word.detector import WakeWordDetector
+from wake_word.worker import DetectionWorker
 from wake_word import collect
 import pyaudio
 import asyncio
 import websockets
+from websockets.protocol import State
 from tools.base import load_plugins, Tool
 from analytics import Analytics
+from loop_monitor import LoopLagMonitor
+from playback import JitterBuffer
+from realtime_events import EventDispatcher
 from audio_manager import AudioManager, ScheduledAudio
 from ui.base import AssistantUIBase, AssistantUIState
 
@@ -33,6 +39,19 @@ _WAKE_PREROLL_FRAMES = int(_WAKE_PREROLL_SECONDS * _REALTIME_SAMPLERATE / _INPUT
 _WS_PING_INTERVAL_SECONDS = 30
 _WS_PING_TIMEOUT_SECONDS = 25
 _REALTIME_WATCHDOG_TIMEOUT_SECONDS = 120
+# input_audio_buffer.append, serialized once: only the base64 audio is spliced in
+# per message (base64 needs no JSON escaping).
+_APPEND_TEMPLATE = json.dumps({"type": "input_audio_buffer.append", "audio": "%s"}, separators=(",", ":"))
+_BYTES_PER_MS = _REALTIME_SAMPLERATE * 2 // 1000   # mono int16
+# Default pre-arm level for the speculative realtime connection, as a fraction
+# of the wake word threshold (overridden by REALTIME_PREWARM_LEVEL).
+_PREWARM_THRESHOLD_FRACTION = 0.6
+# Longest we wait at the end of a session for buffered speech (e.g. the goodbye)
+# to finish playing before closing the output stream.
+_PLAYBACK_DRAIN_TIMEOUT_SECONDS = 15
+# The same when the session ended on an error rather than go_to_sleep / capture
+# or the server closing it; cancellation and shutdown don't wait at all.
+_PLAYBACK_ERROR_DRAIN_SECONDS = 1
 
 _COOKING_INSTRUCTIONS = """
 
@@ -115,6 +134,219 @@ def main():
         if ui:
             ui.shutdown()
 
+async def _open_realtime(audio: pyaudio.PyAudio, player: JitterBuffer, agent_instructions: str, tools: list[Tool]):
+    """Connect to the realtime API and open the output stream in parallel.
+    If either fails, the other is closed before the error is raised."""
+    results = await asyncio.gather(
+        _connect_realtime(agent_instructions, tools),
+        _open_output_stream_async(audio, player),
+        return_exceptions=True,
+    )
+    errors = [r for r in results if isinstance(r, BaseException)]
+    if errors:
+        await _close_realtime(*(None if isinstance(r, BaseException) else r for r in results))
+        raise errors[0]
+    return results
+
+async def _close_realtime(ws, output_stream):
+    if output_stream:
+        output_stream.close()
+    if ws:
+        await ws.close()
+
+@dataclass
+class _Prewarm:
+    """A speculative realtime connection (see _Prewarmer)."""
+    task: asyncio.Task | None   # _open_realtime -> (ws, output_stream); set by _start
+    player: JitterBuffer
+    started_at: float
+    ready_at: float | None = None
+    woke_at: float | None = None
+
+class _Prewarmer:
+    """Starts the realtime connection while the wake word looks likely.
+
+    Connecting (TLS + websocket handshake + session.update) is most of the
+    wake-to-ready latency. When the detector's smoothed probability reaches
+    ``level``, below the trigger threshold, the connection and output stream
+    are opened in the background. A wake within ``ttl`` seconds takes them over
+    (:meth:`take`); otherwise they are closed. The probability has to drop back
+    below ``level`` before another pre-warm can start, so a near-miss that
+    lingers doesn't reconnect over and over.
+    """
+
+    def __init__(self, audio: pyaudio.PyAudio, agent_instructions: str, tools: list[Tool],
+                 level: float, ttl: float, log: logging.Logger) -> None:
+        self._audio = audio
+        self._agent_instructions = agent_instructions
+        self._tools = tools
+        self.level = level
+        self._ttl = ttl
+        self._log = log
+        self._current: _Prewarm | None = None
+        self._armed = True
+        self._closing: set[asyncio.Task] = set()
+        self._counts = {"started": 0, "used": 0, "cold": 0, "expired": 0, "failed": 0}
+        self._saved_seconds = 0.0
+
+    def update(self, probability: float) -> None:
+        """Called for every mic frame in the wake word loop."""
+        now = time.monotonic()
+        if self._current and now - self._current.started_at > self._ttl:
+            self._counts["expired"] += 1
+            self._close_later()
+        if probability < self.level:
+            self._armed = True
+        elif self._armed and self._current is None:
+            self._armed = False
+            self._start(now, probability)
+
+    def _start(self, now: float, probability: float) -> None:
+        self._log.debug("Pre-warming realtime connection (smoothed prob=%.3f)", probability)
+        player = JitterBuffer(_REALTIME_SAMPLERATE, target_ms=settings.playback_target_latency_ms)
+        prewarm = _Prewarm(None, player, now)
+
+        async def _open():
+            result = await _open_realtime(self._audio, player, self._agent_instructions, self._tools)
+            prewarm.ready_at = time.monotonic()
+            return result
+
+        prewarm.task = asyncio.create_task(_open())
+        self._current = prewarm
+        self._counts["started"] += 1
+
+    def take(self) -> _Prewarm | None:
+        """Hand the pending connection to the conversation that just woke, or
+        None to connect from scratch."""
+        prewarm, self._current = self._current, None
+        if prewarm and prewarm.task is None:
+            prewarm = None
+        elif prewarm and prewarm.task.done() and prewarm.task.exception() is not None:
+            self._counts["failed"] += 1
+            self._log.info("Pre-warmed realtime connection failed: %s", prewarm.task.exception())
+            prewarm = None
+        if prewarm is None:
+            self._counts["cold"] += 1
+            return None
+        prewarm.woke_at = time.monotonic()
+        self._counts["used"] += 1
+        return prewarm
+
+    def record_ready(self, prewarm: _Prewarm) -> None:
+        """Log the latency a used pre-warm saved, once its connection is up.
+        Without it the wake would have waited the whole connect time; with it
+        only for whatever was still left at the wake."""
+        connect = prewarm.ready_at - prewarm.started_at
+        waited = max(0.0, prewarm.ready_at - prewarm.woke_at)
+        self._saved_seconds += connect - waited
+        self._log.info("Pre-warmed realtime connection used: connect %.0fms, waited %.0fms after wake, saved %.0fms",
+                       connect * 1000, waited * 1000, (connect - waited) * 1000)
+
+    def record_failed(self) -> None:
+        """A taken pre-warm failed to connect after the wake."""
+        self._counts["used"] -= 1
+        self._counts["failed"] += 1
+        self._counts["cold"] += 1
+
+    def _close_later(self) -> None:
+        """Close the pending connection in the background."""
+        prewarm, self._current = self._current, None
+        if prewarm is None or prewarm.task is None:
+            return
+
+        async def _close():
+            try:
+                ws, output_stream = await prewarm.task
+            except Exception:
+                return
+            await _close_realtime(ws, output_stream)
+
+        task = asyncio.create_task(_close())
+        self._closing.add(task)
+        task.add_done_callback(self._closing.discard)
+
+    async def discard(self) -> None:
+        """Close the pending connection (no wake followed, or we're shutting
+        down) and wait until every pre-warmed output stream is closed, so the
+        caller can use the audio device straight away."""
+        self._close_later()
+        if self._closing:
+            await asyncio.gather(*self._closing, return_exceptions=True)
+
+    def stats(self) -> dict:
+        """How often wakes found a pre-warmed connection, and the total and mean
+        wake-to-ready latency it saved."""
+        used = self._counts["used"]
+        wakes = used + self._counts["cold"]
+        return {
+            **self._counts,
+            "used_rate": round(used / wakes, 3) if wakes else 0.0,
+            "saved_ms_total": round(self._saved_seconds * 1000),
+            "saved_ms_mean": round(self._saved_seconds * 1000 / used) if used else 0,
+        }
+
+class _WarmSession:
+    """A realtime session kept open after go_to_sleep for a quick follow-up.
+
+    The websocket stays open with the uplink muted. The output stream is still
+    closed, so alarms can use the device. A background reader discards
+    anything the server still sends. The session closes when the server closes
+    it, or after ``seconds``. A wake in the meantime picks it up with
+    :meth:`reuse`, skipping the handshake and session.update and keeping the
+    conversation context.
+    """
+
+    def __init__(self, ws: websockets.ClientConnection, seconds: float, log: logging.Logger) -> None:
+        self.ws = ws
+        self._log = log
+        self._since = time.monotonic()
+        self._idle_task = asyncio.create_task(self._idle(seconds))
+
+    async def _idle(self, seconds: float) -> None:
+        async def _discard():
+            async for _ in self.ws:
+                pass
+
+        try:
+            await asyncio.wait_for(_discard(), seconds)
+            self._log.info("Warm realtime session closed by the server")
+        except asyncio.TimeoutError:
+            self._log.info("Warm realtime session idle for %.0fs, closing", seconds)
+        except Exception as e:
+            self._log.info("Warm realtime session lost: %s", e)
+        await self.ws.close()
+
+    def alive(self) -> bool:
+        return not self._idle_task.done()
+
+    async def reuse(self) -> websockets.ClientConnection | None:
+        """Stop idling and return the websocket, or None if the session has
+        already closed."""
+        if not self.alive():
+            return None
+        self._idle_task.cancel()
+        try:
+            await self._idle_task
+        except asyncio.CancelledError:
+            pass
+        if self.ws.state is not State.OPEN:
+            await self.ws.close()
+            return None
+        self._log.info("Reusing warm realtime session (idle %.1fs)", time.monotonic() - self._since)
+        # Drop any partial input the server still holds from before the sleep.
+        await self.ws.send(json.dumps({"type": "input_audio_buffer.clear"}))
+        return self.ws
+
+    async def close(self) -> None:
+        if not self.alive():
+            return   # the idle task already closed it
+        self._idle_task.cancel()
+        try:
+            await self._idle_task
+        except asyncio.CancelledError:
+            pass
+        await self.ws.close()
+
 def _drain_queue(q: asyncio.Queue) -> None:
     """Discard any buffered frames (e.g. stale audio before we start sleeping)."""
     try:
@@ -145,6 +377,27 @@ async def _run_assistant(
     # assistant is talking (avoids it hearing itself) and during alarm playback.
     mic_gate = {"capture": True}
 
+    # Built once: loading the metadata and ONNX session is expensive on the Pi,
+    # so each sleep cycle just reset()s the same detector.
+    detector = WakeWordDetector(
+        settings.wake_word_model_path,
+        threshold=settings.wake_word_threshold,
+        variant=settings.wake_word_model_variant,
+        cascade=settings.wake_word_cascade,
+    )
+    # Run detection on its own thread so inference never stalls the loop.
+    worker = DetectionWorker(detector, loop) if settings.wake_word_inference_thread else None
+    lag_task = asyncio.create_task(LoopLagMonitor().run())
+    prewarmer = None
+    if settings.realtime_prewarm:
+        level = settings.realtime_prewarm_level
+        if level is None:
+            level = _PREWARM_THRESHOLD_FRACTION * detector.threshold
+        prewarmer = _Prewarmer(audio, agent_instructions, tools, level,
+                               settings.realtime_prewarm_ttl_seconds, log)
+    # Session kept open after the last conversation (REALTIME_WARM_SECONDS).
+    warm = None
+
     input_stream = await _open_input_stream_async(audio, loop, frame_queue, lambda: mic_gate["capture"])
     input_stream.start_stream()
 
@@ -162,31 +415,42 @@ async def _run_assistant(
             ui.update_state(AssistantUIState.SLEEPING, reason="Listening for wake word")
             mic_gate["capture"] = True
             _drain_queue(frame_queue)
+            if worker:
+                worker.reset()
+            else:
+                detector.reset()
 
-            detector = WakeWordDetector(
-                settings.wake_word_model_path,
-                threshold=settings.wake_word_threshold,
-            )
-
-            outcome = await _wait_for_wake_word(detector, frame_queue, audio_manager, ui, log)
-
-            detector.delete()
+            if warm and not warm.alive():
+                warm = None
+            # No speculative connects while a warm session is waiting.
+            outcome = await _wait_for_wake_word(detector, worker, frame_queue, audio_manager, ui, log,
+                                                None if warm else prewarmer)
 
             if outcome == "shutdown":
                 log.info("User requested shutdown")
                 break
             if outcome != "woke":
                 # due_audio or transient error: loop back to play audio / retry.
+                # The pre-warmed output stream must be closed before playback.
+                if prewarmer:
+                    await prewarmer.discard()
                 continue
 
             log.info("Wake word detected")
+            log.debug("Wake word detector stats: %s", detector.stats())
+            if warm and not warm.alive():
+                warm = None
+            prewarm = prewarmer.take() if prewarmer and not warm else None
             _drain_queue(frame_queue)
             # Show LISTENING immediately on wake so the user has feedback while
             # the realtime session connects in the background.
             ui.update_state(AssistantUIState.LISTENING, reason="Wake word detected")
             # Hand the live queue to the conversation. Frames captured from here
             # on (including during connect) are buffered and sent once connected.
-            action = await run_realtime_conversation(
+            # A warm session is handed over too: the conversation closes it even
+            # if it fails, and returns the next one (if any).
+            reuse, warm = warm, None
+            action, warm = await run_realtime_conversation(
                 audio,
                 frame_queue,
                 mic_gate,
@@ -195,8 +459,13 @@ async def _run_assistant(
                 tools,
                 audio_manager,
                 ui,
-                analytics
+                analytics,
+                prewarm,
+                prewarmer,
+                reuse,
             )
+            if prewarmer:
+                log.info("Realtime pre-warm stats: %s", prewarmer.stats())
 
             # The conversation may ask us to run wake-word training capture once
             # the session has ended (it needs the mic stream / UI we own here).
@@ -216,18 +485,32 @@ async def _run_assistant(
                 # Fall through; the loop returns to SLEEPING and re-arms the wake
                 # word, and the next conversation uses the normal prompt again.
     finally:
+        if prewarmer:
+            await prewarmer.discard()
+        if warm:
+            await warm.close()
         if input_stream:
             input_stream.stop_stream()
             input_stream.close()
+        lag_task.cancel()
+        if worker:
+            worker.stop()
+        detector.delete()
 
 async def _wait_for_wake_word(
         detector: WakeWordDetector,
+        worker: DetectionWorker | None,
         frame_queue: asyncio.Queue,
         audio_manager: AudioManager,
         ui: AssistantUIBase,
-        log: logging.Logger) -> str:
+        log: logging.Logger,
+        prewarmer: _Prewarmer | None = None) -> str:
     """Consume mic frames and feed the detector until the wake word fires.
 
+    With a worker, frames are handed to its thread and detections come back
+    as events (at most one frame later); otherwise the detector runs inline.
+    The smoothed probability is passed to ``prewarmer`` after every frame.
+
     Returns one of: "woke", "shutdown", "due_audio", "error".
     """
     next_timer_update = datetime.now() + timedelta(seconds=1)
@@ -236,18 +519,26 @@ async def _wait_for_wake_word(
         try:
             frame = await frame_queue.get()
             preroll.append(frame)
-            samples = struct.unpack_from("h" * (len(frame) // 2), frame)
-            if detector.process(samples) >= 0:
+            if worker:
+                worker.submit(frame)
+                event = worker.poll()
+                fired_pcm = event.window_pcm if event else None
+            elif detector.process_bytes(frame) >= 0:
+                fired_pcm = detector.window_pcm_bytes()
+            else:
+                fired_pcm = None
+            if prewarmer and fired_pcm is None:
+                prewarmer.update((worker or detector).smoothed_probability)
+            if fired_pcm is not None:
                 # When training is enabled, save the exact 1.2s window that fired
                 # as a negative-candidate clip (reviewed/sorted later). Guarded so
                 # a disk error never blocks waking. The buffer is already in
                 # memory, so this adds negligible latency before the handoff.
                 if settings.wake_word_training_enabled:
                     try:
-                        pcm = detector.window_pcm_bytes()
                         await asyncio.to_thread(
                             collect.save_activation_clip,
-                            pcm,
+                            fired_pcm,
                             settings.wake_word_collect_dir,
                             log,
                         )
@@ -281,6 +572,29 @@ async def _wait_for_wake_word(
             await asyncio.sleep(5)
             return "error"
 
+@dataclass
+class _Conversation:
+    """State of one realtime session, shared by the event handlers below."""
+    ws: websockets.ClientConnection
+    mic_gate: dict
+    player: JitterBuffer
+    agent_instructions: str
+    log: logging.Logger
+    tools: list[Tool]
+    audio_manager: AudioManager
+    ui: AssistantUIBase
+    analytics: Analytics
+    watchdog_control: dict
+    watchdog_task: asyncio.Task | None = None
+    # Optional action for the outer loop to run after this session ends (e.g.
+    # wake-word training capture). None means just go back to sleep.
+    post_action: dict | None = None
+    # Ended by go_to_sleep, with the default instructions and tools in place:
+    # only then can the session be kept warm for a follow-up.
+    slept: bool = False
+    session_changed: bool = False   # training mode; never switched back
+    cooking: bool = False           # recipe prompt; cleared by stop_cooking
+
 async def run_realtime_conversation(
         audio: pyaudio.PyAudio,
         frame_queue: asyncio.Queue,
@@ -290,15 +604,21 @@ async def run_realtime_conversation(
         tools: list[Tool],
         audio_manager: AudioManager,
         ui: AssistantUIBase,
-        analytics: Analytics):
-    watchdog_task = None
+        analytics: Analytics,
+        prewarm: _Prewarm | None = None,
+        prewarmer: _Prewarmer | None = None,
+        warm: _WarmSession | None = None):
+    """Run one conversation. Returns ``(post_action, warm)``: the action for
+    the outer loop (or None), and the session kept warm for a follow-up (or
+    None). ``warm`` is the previous one, reused when it is still open."""
+    conv = None
     due_audio_task = None
     send_audio_task = None
     output_stream = None
     ws = None
-    # Optional action for the outer loop to run after this session ends (e.g.
-    # wake-word training capture). None means just go back to sleep.
-    post_action = None
+    # Response audio is queued here by the loop and pulled by the output stream's
+    # PortAudio callback, so handling events never waits on the sound card.
+    player = None
 
     # The input stream is already open and capturing; mic_gate stays True so that
     # everything the user says after the wake word accumulates in frame_queue
@@ -306,186 +626,258 @@ async def run_realtime_conversation(
     mic_gate["capture"] = True
     watchdog_control = {"reset_event": asyncio.Event()}
 
-    connect_task = asyncio.create_task(_connect_realtime(agent_instructions, tools))
-    output_stream_task = asyncio.create_task(_open_output_stream_async(audio))
-
-    log.info("Connecting to OpenAI Realtime API and opening output stream...")
-    ws, output_stream = await asyncio.gather(connect_task, output_stream_task)
-
-    log.info("Starting audio...")
-    # Flushes the buffered post-wake audio (and then live frames) to the session.
-    send_audio_task = asyncio.create_task(_send_audio_loop(ws, frame_queue))
-    output_stream.start_stream()
-    due_audio_task = asyncio.create_task(_due_audio_loop(ws, audio_manager, ui))
-    
-    # Start watchdog timer
-    log.info("Starting watchdog timer...")
-    watchdog_task = asyncio.create_task(_watchdog_timer(watchdog_control, log, ws))
-
-    log.info("Ready for conversation.")
-
-    analytics.report_event("Conversation")
-
+    # Everything from here on is cleaned up by the finally below, including a
+    # reused or freshly opened session whose setup fails part-way.
+    drain_seconds = _PLAYBACK_DRAIN_TIMEOUT_SECONDS
     try:
-        while True:
-            async for response in ws:
-                res_1=json.loads(response)
-                #log.info(f"Received: {res_1.get('type')}")
-
-                # error, log it
-                if res_1.get("type") == "error":
-                    error = res_1.get("error")
-                    log.warning(f'Realtime Error: {error}')
-
-                # generating a response, update state
-                if res_1.get("type") == "response.created":
-                    mic_gate["capture"] = False
-                    ui.update_state(AssistantUIState.TALKING, reason="Assistant responding")
-
-                # finished a response, update state and reset watchdog
-                if res_1.get("type") == "response.done":
-                    # Reset watchdog timer since assistant finished speaking
-                    watchdog_control["reset_event"].set()
-                    if ui.state != AssistantUIState.TOOL_CALLING: # if tool calling don't update
-                        asyncio.create_task(_reopen_mic_delayed(mic_gate, 500, ui))
-
-                # audio chunk received, play it
-                if res_1.get("type") == "response.output_audio.delta":
-                    base64_audio_data = res_1.get("delta")
-                    if base64_audio_data:
-                        pcm_data = base64.b64decode(base64_audio_data)
-                        output_stream.write(pcm_data)
-
-                # need to call a function (tool call)
-                if res_1.get("type") == "response.function_call_arguments.done":
-                    ui.update_state(AssistantUIState.TOOL_CALLING, reason="Starting a tool call")
-                    function_name = res_1.get("name")
-                    arguments = (res_1.get("arguments"))
-                    call_id = res_1.get("call_id")
-                    output = None
-
-                    if function_name == "go_to_sleep":
-                        # throw an exception
-                        log.info("User asked us to go to sleep, ending session.")
-                        analytics.report_event("Sleep")
-                        raise Exception("User asked us to go to sleep...")
-                    elif function_name == "start_wake_word_training":
-                        # Swap the session into training mode (dedicated prompt +
-                        # minimal tools); Aurora then collects a name and explains
-                        # the rules before calling begin_wake_word_capture.
-                        log.info("Entering wake word training mode.")
-                        analytics.report_event("WakeWordTraining")
-                        await _enter_training_session(ws)
-                        output = "Entered wake word training mode."
-                    elif function_name == "begin_wake_word_capture":
-                        # End this session and run the capture routine in the outer
-                        # loop, which owns the mic stream and UI.
-                        try:
-                            args = json.loads(arguments)
-                        except Exception:
-                            args = {}
-                        name = args.get("name") or ""
-                        log.info("Starting wake word capture for '%s'.", name)
-                        post_action = {"action": "train_wake_word", "name": name}
-                        raise Exception("Beginning wake word capture...")
-                    elif function_name == "start_cooking":
-                        recipe_tool = next((tool for tool in tools if tool.name == "list_recipes"), None)
-                        if recipe_tool and recipe_tool.is_configured():
-                            try:
-                                args = json.loads(arguments)
-                            except Exception:
-                                output = "Invalid arguments payload"
-                            else:
-                                recipe_name = args.get("recipe_name")
-                                if not recipe_name:
-                                    output = "Missing required argument: recipe_name"
-                                else:
-                                    recipes_dir = recipe_tool._recipes_dir or recipe_tool._resolve_recipes_dir()
-                                    if not recipes_dir:
-                                        output = "Recipes folder is not configured or does not exist"
-                                    else:
-                                        recipe_path = (recipes_dir / recipe_name).resolve()
-                                        if not recipe_path.is_file() or recipe_path.suffix.lower() != ".md":
-                                            output = f"Recipe file not found: {recipe_name}"
-                                        else:
-                                            try:
-                                                with open(recipe_path, "r", encoding="utf-8") as f:
-                                                    recipe_content = f.read()
-                                                await _update_realtime_session(ws, agent_instructions, recipe_content, tools)
-
-                                                # Stop watchdog timer
-                                                log.info("Stopping watchdog timer...")
-                                                if watchdog_task:
-                                                    watchdog_task.cancel()
-                                                    watchdog_task = None
-
-                                                output = f"Started cooking session with recipe {recipe_name}."
-                                                log.info(f"Started cooking session with recipe {recipe_name}.")
-                                                analytics.report_event("Cooking")
-                                            except Exception as e:
-                                                log.exception(f"Failed to read recipe file {recipe_name}: {e}")
-                                                output = f"Failed to read recipe file {recipe_name}: {e}"
-                        else:
-                            output = "Recipe tool is not available."
-                    elif function_name == "stop_cooking":
-                        await _update_realtime_session(ws, agent_instructions, "", tools)
-                        # Start watchdog timer
-                        log.info("Restarting watchdog timer...")
-                        watchdog_task = asyncio.create_task(_watchdog_timer(watchdog_control, log, ws))
-                        output = "Stopped cooking session."
-                        log.info("Stopped cooking session.")
-                    else:
-                        for tool in tools:
-                            try:
-                                output = tool.handle(function_name, arguments)
-                                if output:
-                                    log.info(f"Tool {tool.name} handled function call {function_name}")
-                                    break
-                            except Exception as e:
-                                log.exception(f"Error in tool {tool.name}: {e}")
+        if warm:
+            # Follow-up: the last session is still open, only the output stream is new.
+            ws = await warm.reuse()
+            if ws:
+                player = JitterBuffer(_REALTIME_SAMPLERATE, target_ms=settings.playback_target_latency_ms)
+                output_stream = await _open_output_stream_async(audio, player)
+        if prewarm and player is None:
+            # Connecting started speculatively while the wake word was rising.
+            try:
+                ws, output_stream = await prewarm.task
+                player = prewarm.player
+                if prewarmer:
+                    prewarmer.record_ready(prewarm)
+            except Exception as e:
+                log.warning("Pre-warmed realtime connection failed, reconnecting: %s", e)
+                if prewarmer:
+                    prewarmer.record_failed()
+        if player is None:
+            player = JitterBuffer(_REALTIME_SAMPLERATE, target_ms=settings.playback_target_latency_ms)
+            log.info("Connecting to OpenAI Realtime API and opening output stream...")
+            ws, output_stream = await _open_realtime(audio, player, agent_instructions, tools)
+        conv = _Conversation(ws, mic_gate, player, agent_instructions, log, tools,
+                             audio_manager, ui, analytics, watchdog_control)
+        # Audio deltas go straight to the player; every other event type is looked
+        # up in _REALTIME_HANDLERS.
+        dispatcher = EventDispatcher(
+            {event_type: functools.partial(handler, conv) for event_type, handler in _REALTIME_HANDLERS.items()},
+            player.write,
+        )
 
-                    # Keep the UI timer display in sync in case a tool added/removed a
-                    # timer (e.g. delete_timer). Mirrors the resync done in the main/wake
-                    # loops; audio_to_text() returns "" when no timers remain.
-                    ui.set_timer_text(audio_manager.audio_to_text())
+        log.info("Starting audio...")
+        # Flushes the buffered post-wake audio (and then live frames) to the session.
+        send_audio_task = asyncio.create_task(_send_audio_loop(ws, frame_queue))
+        output_stream.start_stream()
+        due_audio_task = asyncio.create_task(_due_audio_loop(ws, audio_manager, ui))
+    
+        # Start watchdog timer
+        log.info("Starting watchdog timer...")
+        conv.watchdog_task = asyncio.create_task(_watchdog_timer(watchdog_control, log, ws))
 
-                    if output:
-                        message = {
-                            "type": "conversation.item.create",
-                            "item": {
-                                "type": "function_call_output",
-                                "output": output,
-                                "call_id": call_id
-                            }
-                        }
-                        await ws.send(json.dumps(message))
+        log.info("Ready for conversation.")
 
-                        # force generation after tool call
-                        message = {
-                                "type": "response.create"
-                            }
-                        await ws.send(json.dumps(message))
+        analytics.report_event("Conversation")
 
-    except Exception as e:
-        log.info(f"Error or user shutdown in conversation: {e}")
+        try:
+            while True:
+                await dispatcher.run(ws)
+                if ws.state is State.CLOSED:
+                    log.info("Realtime session closed by the server.")
+                    break
+        except Exception as e:
+            log.info(f"Error or user shutdown in conversation: {e}")
+            if not (conv.slept or conv.post_action):
+                drain_seconds = _PLAYBACK_ERROR_DRAIN_SECONDS
+    except BaseException:
+        # Cancelled, Ctrl-C or a failed setup: nothing should keep playing.
+        drain_seconds = 0
+        raise
     finally:
         log.info("Conversation over, cleaning up.")
         # Stop sending to the (closing) session; the input stream stays open for
         # the next wake-word cycle. mic_gate is reset by the outer loop.
         mic_gate["capture"] = False
-        if watchdog_task:
-            watchdog_task.cancel()
+        if conv and conv.watchdog_task:
+            conv.watchdog_task.cancel()
         if due_audio_task:
             due_audio_task.cancel()
         if send_audio_task:
             send_audio_task.cancel()
+        keep_warm = (settings.realtime_warm_seconds > 0 and conv is not None and conv.slept
+                     and not conv.session_changed and not conv.cooking and ws.state is State.OPEN)
         if output_stream:
+            # Let queued speech (e.g. the goodbye) finish before closing.
+            player.mark_end()
+            if drain_seconds and not await player.wait_drained(drain_seconds):
+                log.info("Playback did not drain in time, %.1fs of audio cut", player.buffered_seconds())
             output_stream.stop_stream()
             output_stream.close()
-        if ws:
+            log.info("Playback stats: %s", player.stats())
+        if keep_warm:
+            # Uplink is already muted (send task cancelled); the session idles
+            # until the next wake or REALTIME_WARM_SECONDS.
+            log.info("Keeping realtime session warm for %ss.", settings.realtime_warm_seconds)
+            warm = _WarmSession(ws, settings.realtime_warm_seconds, log)
+        elif ws:
             await ws.close()
 
-    return post_action
+    return (conv.post_action if conv else None), (warm if keep_warm else None)
+
+# Realtime event handlers, dispatched by event type (see _REALTIME_HANDLERS).
+# Raising ends the conversation.
+
+async def _on_error(conv: _Conversation, event: dict):
+    conv.log.warning(f'Realtime Error: {event.get("error")}')
+
+async def _on_response_created(conv: _Conversation, event: dict):
+    # generating a response, update state
+    conv.mic_gate["capture"] = False
+    conv.ui.update_state(AssistantUIState.TALKING, reason="Assistant responding")
+
+async def _on_response_done(conv: _Conversation, event: dict):
+    # finished a response, update state and reset watchdog
+    # Reset watchdog timer since assistant finished speaking
+    conv.watchdog_control["reset_event"].set()
+    conv.player.mark_end()
+    if conv.ui.state != AssistantUIState.TOOL_CALLING: # if tool calling don't update
+        asyncio.create_task(_reopen_mic_delayed(conv.mic_gate, 500, conv.ui, conv.player))
+
+async def _on_output_audio_done(conv: _Conversation, event: dict):
+    # last audio of the response, play out the tail
+    conv.player.mark_end()
+
+async def _on_function_call(conv: _Conversation, event: dict):
+    # need to call a function (tool call)
+    log = conv.log
+    ws = conv.ws
+    tools = conv.tools
+    conv.ui.update_state(AssistantUIState.TOOL_CALLING, reason="Starting a tool call")
+    function_name = event.get("name")
+    arguments = (event.get("arguments"))
+    call_id = event.get("call_id")
+    output = None
+
+    if function_name == "go_to_sleep":
+        # throw an exception
+        log.info("User asked us to go to sleep, ending session.")
+        conv.analytics.report_event("Sleep")
+        conv.slept = True
+        if settings.realtime_warm_seconds > 0:
+            # The session may be reused for a follow-up: close out the call so
+            # the model's context stays consistent (no response is requested).
+            message = {
+                "type": "conversation.item.create",
+                "item": {
+                    "type": "function_call_output",
+                    "output": "Went to sleep.",
+                    "call_id": call_id
+                }
+            }
+            await ws.send(json.dumps(message))
+        raise Exception("User asked us to go to sleep...")
+    elif function_name == "start_wake_word_training":
+        # Swap the session into training mode (dedicated prompt +
+        # minimal tools); Aurora then collects a name and explains
+        # the rules before calling begin_wake_word_capture.
+        log.info("Entering wake word training mode.")
+        conv.analytics.report_event("WakeWordTraining")
+        await _enter_training_session(ws)
+        conv.session_changed = True
+        output = "Entered wake word training mode."
+    elif function_name == "begin_wake_word_capture":
+        # End this session and run the capture routine in the outer
+        # loop, which owns the mic stream and UI.
+        try:
+            args = json.loads(arguments)
+        except Exception:
+            args = {}
+        name = args.get("name") or ""
+        log.info("Starting wake word capture for '%s'.", name)
+        conv.post_action = {"action": "train_wake_word", "name": name}
+        raise Exception("Beginning wake word capture...")
+    elif function_name == "start_cooking":
+        recipe_tool = next((tool for tool in tools if tool.name == "list_recipes"), None)
+        if recipe_tool and recipe_tool.is_configured():
+            try:
+                args = json.loads(arguments)
+            except Exception:
+                output = "Invalid arguments payload"
+            else:
+                recipe_name = args.get("recipe_name")
+                if not recipe_name:
+                    output = "Missing required argument: recipe_name"
+                else:
+                    recipes_dir = recipe_tool._recipes_dir or recipe_tool._resolve_recipes_dir()
+                    if not recipes_dir:
+                        output = "Recipes folder is not configured or does not exist"
+                    else:
+                        recipe_path = (recipes_dir / recipe_name).resolve()
+                        if not recipe_path.is_file() or recipe_path.suffix.lower() != ".md":
+                            output = f"Recipe file not found: {recipe_name}"
+                        else:
+                            try:
+                                with open(recipe_path, "r", encoding="utf-8") as f:
+                                    recipe_content = f.read()
+                                await _update_realtime_session(ws, conv.agent_instructions, recipe_content, tools)
+                                conv.cooking = True
+
+                                # Stop watchdog timer
+                                log.info("Stopping watchdog timer...")
+                                if conv.watchdog_task:
+                                    conv.watchdog_task.cancel()
+                                    conv.watchdog_task = None
+
+                                output = f"Started cooking session with recipe {recipe_name}."
+                                log.info(f"Started cooking session with recipe {recipe_name}.")
+                                conv.analytics.report_event("Cooking")
+                            except Exception as e:
+                                log.exception(f"Failed to read recipe file {recipe_name}: {e}")
+                                output = f"Failed to read recipe file {recipe_name}: {e}"
+        else:
+            output = "Recipe tool is not available."
+    elif function_name == "stop_cooking":
+        await _update_realtime_session(ws, conv.agent_instructions, "", tools)
+        conv.cooking = False
+        # Start watchdog timer
+        log.info("Restarting watchdog timer...")
+        conv.watchdog_task = asyncio.create_task(_watchdog_timer(conv.watchdog_control, log, ws))
+        output = "Stopped cooking session."
+        log.info("Stopped cooking session.")
+    else:
+        for tool in tools:
+            try:
+                output = tool.handle(function_name, arguments)
+                if output:
+                    log.info(f"Tool {tool.name} handled function call {function_name}")
+                    break
+            except Exception as e:
+                log.exception(f"Error in tool {tool.name}: {e}")
+
+    # Keep the UI timer display in sync in case a tool added/removed a
+    # timer (e.g. delete_timer). Mirrors the resync done in the main/wake
+    # loops; audio_to_text() returns "" when no timers remain.
+    conv.ui.set_timer_text(conv.audio_manager.audio_to_text())
+
+    if output:
+        message = {
+            "type": "conversation.item.create",
+            "item": {
+                "type": "function_call_output",
+                "output": output,
+                "call_id": call_id
+            }
+        }
+        await ws.send(json.dumps(message))
+
+        # force generation after tool call
+        message = {
+                "type": "response.create"
+            }
+        await ws.send(json.dumps(message))
+
+_REALTIME_HANDLERS = {
+    "error": _on_error,
+    "response.created": _on_response_created,
+    "response.done": _on_response_done,
+    "response.output_audio.done": _on_output_audio_done,
+    "response.function_call_arguments.done": _on_function_call,
+}
 
 async def _watchdog_timer(watchdog_control: dict, log: logging.Logger, ws: websockets.ClientConnection):
     """Watchdog timer that throws an exception if assistant doesn't finish speaking within the timeout."""
@@ -763,19 +1155,41 @@ async def _due_audio_loop(ws: websockets.ClientConnection, audio_manager:AudioMa
             ui.set_timer_text(audio_manager.audio_to_text())
 
 async def _send_audio_loop(ws: websockets.ClientConnection, frame_queue: asyncio.Queue):
+    """Forward mic frames to the session, coalescing them into fewer appends.
+
+    Everything already queued (e.g. the pre-roll and connect backlog right after
+    wake) goes out in one append, up to about UPLINK_MAX_CHUNK_MS of audio.
+    Live audio waits up to UPLINK_COALESCE_MS for further frames to join it.
+    """
+    loop = asyncio.get_running_loop()
+    max_bytes = max(1, settings.uplink_max_chunk_ms) * _BYTES_PER_MS
+    max_delay = settings.uplink_coalesce_ms / 1000
     while True:
         try:
-            frame = await frame_queue.get()
-            if frame:
-                audio_event = {
-                    "type": "input_audio_buffer.append",
-                    "audio": base64.b64encode(frame).decode('utf-8')
-                }
-                await ws.send(json.dumps(audio_event))       
+            chunk = bytearray(await frame_queue.get() or b"")
+            deadline = loop.time() + max_delay
+            while len(chunk) < max_bytes:
+                try:
+                    frame = frame_queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        break
+                    try:
+                        frame = await asyncio.wait_for(frame_queue.get(), remaining)
+                    except asyncio.TimeoutError:
+                        break
+                if frame:
+                    chunk += frame
+            if chunk:
+                await ws.send(_APPEND_TEMPLATE % base64.b64encode(chunk).decode("ascii"))
         except Exception:
             pass
 
-async def _reopen_mic_delayed(mic_gate, delay_ms: int, ui: AssistantUIBase):
+async def _reopen_mic_delayed(mic_gate, delay_ms: int, ui: AssistantUIBase, player: JitterBuffer):
+    # The response arrives faster than real time, so wait for it to finish
+    # playing before listening again (avoids the assistant hearing itself).
+    await player.wait_drained(_PLAYBACK_DRAIN_TIMEOUT_SECONDS)
     await asyncio.sleep(delay_ms / 1000)
     mic_gate["capture"] = True
     ui.update_state(AssistantUIState.LISTENING, reason="Assistant finished")
@@ -805,7 +1219,7 @@ async def _open_input_stream_async(audio: pyaudio.PyAudio, loop, frame_queue: as
         )
     return await asyncio.to_thread(_open)
 
-async def _open_output_stream_async(audio: pyaudio.PyAudio):
+async def _open_output_stream_async(audio: pyaudio.PyAudio, player: JitterBuffer):
     def _open():
         return audio.open(
             format=pyaudio.paInt16,
@@ -814,6 +1228,7 @@ async def _open_output_stream_async(audio: pyaudio.PyAudio):
             output=True,
             frames_per_buffer=_REALTIME_FRAMESPERBUFFER,
             output_device_index=settings.output_device_id,
+            stream_callback=player.callback,
             start=False,  # open but don't start yet
         )
     return await asyncio.to_thread(_open)
@@ -0,0 +1,142 @@
+import asyncio
+import logging
+
+import pyaudio
+
+log = logging.getLogger("aurora").getChild("playback")
+
+_SAMPLE_BYTES = 2   # mono int16
+
+
+class ByteRing:
+    """Fixed-size single-producer / single-consumer byte ring.
+
+    The producer only advances ``_write`` and the consumer only advances
+    ``_read`` (both are running byte counts, never wrapped), so neither side
+    takes a lock: each reads the other's counter, copies, then publishes its
+    own. Safe for one writer thread and one reader thread.
+    """
+
+    def __init__(self, capacity: int) -> None:
+        self._buf = bytearray(capacity)
+        self._view = memoryview(self._buf)
+        self.capacity = capacity
+        self._write = 0
+        self._read = 0
+
+    def __len__(self) -> int:
+        return self._write - self._read
+
+    def write(self, data: bytes) -> int:
+        """Append as much of ``data`` as fits; returns the bytes written."""
+        n = min(len(data), self.capacity - (self._write - self._read))
+        n -= n % _SAMPLE_BYTES   # never split a sample
+        if n <= 0:
+            return 0
+        start = self._write % self.capacity
+        first = min(n, self.capacity - start)
+        self._view[start:start + first] = data[:first]
+        self._view[:n - first] = data[first:n]
+        self._write += n
+        return n
+
+    def read_into(self, out: memoryview) -> int:
+        """Fill ``out`` from the ring as far as possible; returns the bytes read."""
+        n = min(len(out), self._write - self._read)
+        if n <= 0:
+            return 0
+        start = self._read % self.capacity
+        first = min(n, self.capacity - start)
+        out[:first] = self._view[start:start + first]
+        out[first:n] = self._view[:n - first]
+        self._read += n
+        return n
+
+
+class JitterBuffer:
+    """Feeds a callback-mode PortAudio output stream from a :class:`ByteRing`.
+
+    The event loop only calls :meth:`write` (a memory copy, never blocks) and
+    PortAudio pulls from :meth:`callback` on its own thread. Playback starts once
+    ``target_ms`` of audio is buffered, which absorbs the jitter in websocket
+    delivery. :meth:`mark_end` plays out a shorter tail at the end of a
+    response. If the buffer runs dry mid-response it counts an underrun, pads
+    with silence and re-buffers to the target; audio that doesn't fit in
+    ``capacity_seconds`` is dropped and counted as an overrun.
+
+    Each counter has a single writer (the loop for overruns, the PortAudio
+    thread for underruns), so they need no lock either. Use one instance per
+    output stream; :meth:`stats` reports totals.
+    """
+
+    def __init__(self, sample_rate: int, target_ms: int = 200, capacity_seconds: float = 120.0) -> None:
+        self._sample_rate = sample_rate
+        self._target = int(sample_rate * target_ms / 1000) * _SAMPLE_BYTES
+        self._ring = ByteRing(int(sample_rate * capacity_seconds) * _SAMPLE_BYTES)
+        self._ending = False   # set by mark_end(), cleared by the next write()
+        self._playing = False  # consumer side: priming vs playing
+        self._underruns = 0
+        self._overruns = 0
+        self._dropped_bytes = 0
+        self._device_underflows = 0
+        self._max_buffered = 0
+
+    # --- event loop side ---------------------------------------------------
+    def write(self, pcm: bytes) -> None:
+        """Queue int16 PCM for playback. Never blocks."""
+        self._ending = False
+        written = self._ring.write(pcm)
+        if written < len(pcm):
+            self._overruns += 1
+            self._dropped_bytes += len(pcm) - written
+            if self._overruns % 10 == 1:
+                log.warning("Playback buffer full, dropped %d bytes", len(pcm) - written)
+        buffered = len(self._ring)
+        if buffered > self._max_buffered:
+            self._max_buffered = buffered
+
+    def mark_end(self) -> None:
+        """No more audio expected for now: play out what's left, even if short."""
+        self._ending = True
+
+    def buffered_seconds(self) -> float:
+        return len(self._ring) / _SAMPLE_BYTES / self._sample_rate
+
+    async def wait_drained(self, timeout: float, poll: float = 0.02) -> bool:
+        """Wait until everything queued has been handed to the sound card."""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while len(self._ring):
+            if loop.time() >= deadline:
+                return False
+            await asyncio.sleep(poll)
+        return True
+
+    def stats(self) -> dict:
+        """Underrun / overrun counters and the buffer high-water mark."""
+        to_ms = 1000.0 / _SAMPLE_BYTES / self._sample_rate
+        return {
+            "underruns": self._underruns,
+            "overruns": self._overruns,
+            "dropped_ms": round(self._dropped_bytes * to_ms, 1),
+            "device_underflows": self._device_underflows,
+            "max_buffered_ms": round(self._max_buffered * to_ms, 1),
+        }
+
+    # --- PortAudio side ----------------------------------------------------
+    def callback(self, in_data, frame_count, time_info, status_flags):
+        need = frame_count * _SAMPLE_BYTES
+        out = bytearray(need)   # silence unless filled below
+        if status_flags & pyaudio.paOutputUnderflow:
+            self._device_underflows += 1
+
+        available = len(self._ring)
+        if not self._playing and (available >= self._target or (self._ending and available)):
+            self._playing = True
+        if self._playing and self._ring.read_into(memoryview(out)) < need:
+            # Ran dry. Expected at the end of a response; otherwise the network
+            # fell behind, so re-buffer to the target before resuming.
+            if not self._ending:
+                self._underruns += 1
+            self._playing = False
+        return (bytes(out), pyaudio.paContinue)
@@ -44,6 +44,58 @@ class Settings(BaseSettings):
         validation_alias="OUTPUT_DEVICE_ID",
     )
 
+    # Realtime response audio is buffered this long before playback starts (and
+    # again after an underrun), to ride out jitter in websocket delivery.
+    playback_target_latency_ms: int = Field(
+        default=200,
+        description="Jitter buffer target latency for realtime response playback, in milliseconds",
+        validation_alias="PLAYBACK_TARGET_LATENCY_MS",
+    )
+
+    # Speculative realtime connection: when the wake word's smoothed probability
+    # reaches the pre-arm level (below the detection threshold), connecting starts
+    # in the background and is handed to the conversation if the wake word fires
+    # within the TTL, otherwise closed. Saves most of the connect time per wake,
+    # but near-misses open (billable) connections too, so it is opt-in.
+    realtime_prewarm: bool = Field(
+        default=False,
+        description="Start the realtime connection speculatively while the wake word looks likely",
+        validation_alias="REALTIME_PREWARM",
+    )
+    realtime_prewarm_level: float | None = Field(
+        default=None,
+        description="Smoothed wake word probability that starts a pre-warm; None uses 0.6 x the detection threshold",
+        validation_alias="REALTIME_PREWARM_LEVEL",
+    )
+    realtime_prewarm_ttl_seconds: float = Field(
+        default=4.0,
+        description="Seconds a pre-warmed connection is kept waiting for the wake word before it is closed",
+        validation_alias="REALTIME_PREWARM_TTL_SECONDS",
+    )
+
+    # Follow-up window: after the assistant goes to sleep, keep the realtime
+    # session open (uplink muted) this many seconds, so a wake in that window
+    # skips reconnecting and keeps the conversation context. 0 disables it.
+    realtime_warm_seconds: float = Field(
+        default=0.0,
+        description="Seconds to keep the realtime session open after sleep for a follow-up wake (0 = off)",
+        validation_alias="REALTIME_WARM_SECONDS",
+    )
+
+    # Mic audio is sent to the realtime session in coalesced appends: frames that
+    # arrive within UPLINK_COALESCE_MS of each other share one message, capped at
+    # UPLINK_MAX_CHUNK_MS of audio (a backlog is split into chunks of that size).
+    uplink_coalesce_ms: int = Field(
+        default=100,
+        description="Latency budget for coalescing mic frames into one realtime append, in milliseconds",
+        validation_alias="UPLINK_COALESCE_MS",
+    )
+    uplink_max_chunk_ms: int = Field(
+        default=1000,
+        description="Maximum audio per realtime append message, in milliseconds",
+        validation_alias="UPLINK_MAX_CHUNK_MS",
+    )
+
     # Optional path to a folder containing recipes (spelling intentional)
     recipes_folder: str | None = Field(
         default=None,
@@ -67,6 +119,32 @@ class Settings(BaseSettings):
         validation_alias="WAKE_WORD_THRESHOLD",
     )
 
+    # Which exported model variant to run: "float" (default), "int8" (the
+    # quantized model written by train.py --quantize, faster on a Pi 4) or
+    # "stream" (the incremental model written by train.py --streaming).
+    wake_word_model_variant: str = Field(
+        default="float",
+        description="Wake word model variant to load (float, int8 or stream)",
+        validation_alias="WAKE_WORD_MODEL_VARIANT",
+    )
+
+    # Two-stage cascade: a tiny gate model (train.py --cascade) screens each
+    # window so the full CNN only runs on promising audio. Off by default.
+    wake_word_cascade: bool = Field(
+        default=False,
+        description="Run the wake word cascade gate before the full model",
+        validation_alias="WAKE_WORD_CASCADE",
+    )
+
+    # Run wake word feature extraction + inference on a dedicated thread instead
+    # of the asyncio loop. Only worth disabling to compare loop lag (logged by
+    # loop_monitor.py) against the inline path.
+    wake_word_inference_thread: bool = Field(
+        default=True,
+        description="Run wake word detection on a background thread instead of the event loop",
+        validation_alias="WAKE_WORD_INFERENCE_THREAD",
+    )
+
     # Folder for guided ("Aurora, help me train you") wake-word recordings.
     # Clips land in <dir>/positives and <dir>/negatives as <name>_<uuid>.wav.
     wake_word_collect_dir: str = Field(
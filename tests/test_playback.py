@@ -0,0 +1,80 @@
+"""ByteRing / JitterBuffer: wrap-around, underruns, overruns and draining,
+driven by calling the PortAudio callback directly."""
+import asyncio
+
+import pytest
+
+pyaudio = pytest.importorskip("pyaudio")
+
+from playback import ByteRing, JitterBuffer  # noqa: E402
+
+RATE = 1000   # samples/s, so 1 ms == 1 sample == 2 bytes
+
+
+def _pcm(n_samples: int, start: int = 0) -> bytes:
+    return bytes((start + i) % 256 for i in range(2 * n_samples))
+
+
+def test_ring_wraps_around():
+    ring = ByteRing(10)
+    out = bytearray(10)
+    assert ring.write(b"abcdefgh") == 8
+    assert ring.read_into(memoryview(out)[:6]) == 6 and out[:6] == b"abcdef"
+    # Crosses the end of the buffer on both write and read.
+    assert ring.write(b"ijklmnop") == 8
+    assert len(ring) == 10
+    assert ring.read_into(memoryview(out)) == 10
+    assert bytes(out) == b"ghijklmnop"
+    assert len(ring) == 0
+
+
+def test_ring_never_splits_a_sample_and_stops_when_full():
+    ring = ByteRing(7)
+    assert ring.write(b"abcdefgh") == 6
+    assert ring.write(b"xx") == 0
+
+
+def test_short_read_pads_silence_and_counts_an_underrun():
+    buf = JitterBuffer(RATE, target_ms=10)
+    buf.write(_pcm(12))
+    first, flag = buf.callback(None, 8, None, 0)
+    assert first == _pcm(8) and flag == pyaudio.paContinue
+    second, _ = buf.callback(None, 8, None, 0)
+    assert second == _pcm(12)[16:] + bytes(8)   # 4 samples of audio, then silence
+    assert buf.stats()["underruns"] == 1
+    # Re-buffers to the target before playing again.
+    buf.write(_pcm(5))
+    assert buf.callback(None, 4, None, 0)[0] == bytes(8)
+
+
+def test_end_of_response_is_not_an_underrun():
+    buf = JitterBuffer(RATE, target_ms=10)
+    buf.write(_pcm(3))
+    buf.mark_end()   # shorter than the target, played anyway
+    assert buf.callback(None, 8, None, 0)[0] == _pcm(3) + bytes(10)
+    assert buf.stats()["underruns"] == 0
+
+
+def test_overrun_drops_what_does_not_fit():
+    buf = JitterBuffer(RATE, target_ms=10, capacity_seconds=0.02)   # 20 samples
+    buf.write(_pcm(15))
+    buf.write(_pcm(10))
+    stats = buf.stats()
+    assert stats["overruns"] == 1
+    assert stats["dropped_ms"] == 5.0
+    assert stats["max_buffered_ms"] == 20.0
+
+
+def test_wait_drained():
+    async def run():
+        buf = JitterBuffer(RATE, target_ms=10)
+        buf.write(_pcm(4))
+        buf.mark_end()
+        assert not await buf.wait_drained(timeout=0.05, poll=0.01)
+
+        loop = asyncio.get_running_loop()
+        loop.call_later(0.02, buf.callback, None, 8, None, 0)
+        assert await buf.wait_drained(timeout=1.0, poll=0.01)
+        assert buf.buffered_seconds() == 0.0
+
+    asyncio.run(run())
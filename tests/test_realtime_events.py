@@ -0,0 +1,85 @@
+"""EventDispatcher against recorded realtime events (compact JSON, as sent by
+the server): the audio fast path must agree with json.loads."""
+import asyncio
+import base64
+import json
+
+import pytest
+
+from realtime_events import AUDIO_DELTA, EventDispatcher, _fast_audio_delta
+
+PCM = bytes(range(256)) * 8
+B64 = base64.b64encode(PCM).decode("ascii")
+
+# Recorded from a session (ids shortened, audio payload replaced).
+AUDIO_EVENT = ('{"type":"response.output_audio.delta","event_id":"event_CZ1fQ3kWd",'
+               '"response_id":"resp_CZ1fPb","item_id":"item_CZ1fPc","output_index":0,'
+               '"content_index":0,"delta":"' + B64 + '"}')
+TRANSCRIPT_EVENT = ('{"type":"response.output_audio_transcript.delta","event_id":"event_CZ1fR",'
+                    '"response_id":"resp_CZ1fPb","item_id":"item_CZ1fPc","output_index":0,'
+                    '"content_index":0,"delta":"Good morning"}')
+RESPONSE_DONE = '{"type":"response.done","event_id":"event_CZ1fS","response":{"id":"resp_CZ1fPb"}}'
+RATE_LIMITS = '{"type":"rate_limits.updated","event_id":"event_CZ1fT","rate_limits":[]}'
+
+
+async def _aiter(items):
+    for item in items:
+        yield item
+
+
+def _run(dispatcher, events):
+    asyncio.run(dispatcher.run(_aiter(events)))
+
+
+def test_fast_path_matches_json_loads():
+    assert _fast_audio_delta(AUDIO_EVENT) == base64.b64decode(json.loads(AUDIO_EVENT)["delta"])
+    assert _fast_audio_delta(TRANSCRIPT_EVENT) is None
+    assert _fast_audio_delta(RESPONSE_DONE) is None
+
+
+@pytest.mark.parametrize("raw", [
+    # JSON escape inside the payload ("\/" is legal JSON for "/").
+    AUDIO_EVENT.replace(B64, B64.replace("/", "\\/")),
+    # "delta" first and "type" late: the tag isn't near the start.
+    json.dumps({"delta": B64, "event_id": "e" * 300, "type": AUDIO_DELTA}, separators=(",", ":")),
+    # Non-compact JSON (spaces after separators).
+    json.dumps(json.loads(AUDIO_EVENT)),
+])
+def test_unusual_layouts_fall_back_to_json(raw):
+    audio = []
+    dispatcher = EventDispatcher({}, audio.append)
+    _run(dispatcher, [raw])
+    assert audio == [PCM]
+    assert dispatcher.fast_path_events == 0
+    assert dispatcher.parsed_events == 1
+
+
+def test_routing_and_unknown_types():
+    seen = []
+    audio = []
+
+    async def on_done(event):
+        seen.append(event["type"])
+
+    dispatcher = EventDispatcher({"response.done": on_done}, audio.append)
+    _run(dispatcher, [AUDIO_EVENT, TRANSCRIPT_EVENT, RATE_LIMITS, AUDIO_EVENT, RESPONSE_DONE])
+    assert seen == ["response.done"]
+    assert audio == [PCM, PCM]
+    assert dispatcher.fast_path_events == 2
+    assert dispatcher.parsed_events == 3
+
+
+def test_handler_exception_ends_the_run():
+    seen = []
+
+    async def on_done(event):
+        raise RuntimeError("go to sleep")
+
+    async def on_transcript(event):
+        seen.append(event)
+
+    dispatcher = EventDispatcher({"response.done": on_done,
+                                  "response.output_audio_transcript.delta": on_transcript}, lambda pcm: None)
+    with pytest.raises(RuntimeError, match="go to sleep"):
+        _run(dispatcher, [RESPONSE_DONE, TRANSCRIPT_EVENT])
+    assert seen == []
@@ -7,6 +7,7 @@ Runtime (laptop + Raspberry Pi) only needs ``numpy`` and ``onnxruntime`` and use
     - :mod:`wake_word.config`   - shared feature/model constants
     - :mod:`wake_word.features` - pure-numpy log-mel frontend (train/inference parity)
     - :mod:`wake_word.detector` - WakeWordDetector, a drop-in replacement for Porcupine
+    - :mod:`wake_word.worker`   - DetectionWorker, runs the detector off the asyncio loop
 
 Training (PC / Colab only) additionally uses :mod:`wake_word.model` and the scripts
 under ``wake_word/scripts``. See ``wake_word/README.md``.
@@ -40,6 +40,10 @@ NUM_FRAMES = 1 + (WINDOW_SAMPLES - N_FFT) // HOP_LENGTH
 # on the Pi while still being responsive.
 EVAL_HOP_SAMPLES = 2400      # 100 ms
 
+# Frames the background detection worker may fall behind by before new frames
+# are dropped (~1s of FRAME_LENGTH chunks). See wake_word/worker.py.
+WORKER_QUEUE_FRAMES = 24
+
 # Detection smoothing / debouncing. A hit requires the smoothed probability to
 # stay above threshold for this many consecutive evaluations.
 SMOOTHING_WINDOW = 3
@@ -60,6 +64,13 @@ REFRACTORY_SECONDS = 1.5
 # (which can never be a wake word) without hurting recall, and it saves CPU.
 ENERGY_GATE_RMS = 0.005
 
+# Optional two-stage cascade (train.py --cascade, WAKE_WORD_CASCADE): a tiny
+# gate model must reach its threshold before the full CNN runs. Training picks
+# the gate threshold so it keeps this fraction of the validation positives the
+# full model accepts; CASCADE_GATE_THRESHOLD is the fallback if none is saved.
+CASCADE_GATE_RECALL = 0.99
+CASCADE_GATE_THRESHOLD = 0.1
+
 # When auto-selecting a detection threshold during training, never go below this
 # floor. Keeps a safety margin against garbage/near-silence even when the
 # training data is cleanly separable.
@@ -68,7 +79,7 @@ MIN_AUTO_THRESHOLD = 0.3
 # Threshold selection treats the hard-negative ("Alexa") trigger rate as the
 # binding constraint and otherwise maximizes recall. Random speech triggering
 # the wake word is acceptable (the realtime session just closes), but the
-# household's Alexa devices must not. See train.py:_choose_threshold.
+# household's Alexa devices must not. See scripts/metrics.py:choose_threshold.
 MAX_HARD_NEGATIVE_RATE = 0.05
 
 # Default location of the exported model + metadata, relative to the repo root.
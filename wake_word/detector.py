@@ -7,11 +7,17 @@ word loop in ``main.py`` relies on::
     detector.sample_rate     # 24000
     detector.frame_length    # 512
     idx = detector.process(sample)   # sample = tuple of int16; >=0 means detected
+    idx = detector.process_bytes(pcm)  # pcm = raw int16 bytes (no unpacking)
+    detector.reset()                 # re-arm between sleep cycles (not in Porcupine)
+    detector.smoothed_probability    # latest smoothed probability (not in Porcupine)
     detector.delete()
 
-Internally it keeps a sliding ~1.2s ring buffer, runs the ONNX model every
-~100 ms, smooths the probability, and fires when it stays above threshold for a
-couple of consecutive evaluations (with a short refractory period afterwards).
+    result = detector.scan("long.wav")   # offline: trigger times over a recording
+
+Internally it keeps a sliding ~1.2s ring buffer, feeds newly arrived audio
+through an incremental log-mel frontend, runs the ONNX model every ~100 ms,
+smooths the probability, and fires when it stays above threshold for a couple
+of consecutive evaluations (with a short refractory period afterwards).
 
 Runtime dependencies: numpy + onnxruntime only.
 """
@@ -22,7 +28,9 @@ import json
 import logging
 import os
 import time
+import wave
 from collections import deque
+from dataclasses import dataclass
 
 import numpy as np
 import onnxruntime as ort
@@ -32,6 +40,17 @@ from wake_word import config, features
 log = logging.getLogger("aurora.wakeword")
 
 
+@dataclass
+class ScanResult:
+    """Output of :meth:`WakeWordDetector.scan` over one recording."""
+
+    times: np.ndarray       # end of each evaluated window, seconds
+    probs: np.ndarray       # model probability per window (NaN = energy gated)
+    smoothed: np.ndarray    # smoothed probability after each window
+    triggers: list[float]   # window end times (seconds) where the detector fired
+    duration: float         # recording length, seconds
+
+
 class WakeWordDetector:
     def __init__(
         self,
@@ -40,6 +59,9 @@ class WakeWordDetector:
         metadata_path: str | None = None,
         sample_rate: int = config.SAMPLE_RATE,
         frame_length: int = config.FRAME_LENGTH,
+        streaming: bool = True,
+        variant: str | None = None,
+        cascade: bool = False,
     ) -> None:
         self._sample_rate = sample_rate
         self._frame_length = frame_length
@@ -53,14 +75,20 @@ class WakeWordDetector:
 
         # Resolve threshold: explicit arg > metadata file > package default.
         meta_path = metadata_path or os.path.splitext(self.model_path)[0] + ".json"
-        meta_threshold = None
+        meta = {}
         if os.path.exists(meta_path):
             try:
                 with open(meta_path, "r") as f:
                     meta = json.load(f)
-                meta_threshold = meta.get("threshold")
             except Exception:
                 log.warning("Could not read wake word metadata %s", meta_path)
+        meta_threshold = meta.get("threshold")
+        self.variant = "float"
+        variant_entry = {}
+        if variant and variant != "float":
+            variant_entry = self._select_variant(variant, meta)
+            # A separately trained variant (e.g. "stream") has its own threshold.
+            meta_threshold = variant_entry.get("threshold", meta_threshold)
         if threshold is not None:
             self.threshold = float(threshold)
         elif meta_threshold is not None:
@@ -68,26 +96,57 @@ class WakeWordDetector:
         else:
             self.threshold = config.DEFAULT_THRESHOLD
 
-        # Single-threaded session keeps Pi CPU usage predictable.
-        so = ort.SessionOptions()
-        so.intra_op_num_threads = 1
-        so.inter_op_num_threads = 1
-        self._session = ort.InferenceSession(
-            self.model_path, sess_options=so, providers=["CPUExecutionProvider"]
-        )
+        self._session = _make_session(self.model_path)
+        self._bulk_session = None   # created by the first scan()
+        self.scan_threads = 0       # scan() inference threads (0 = all cores)
+        # Time source for the refractory period. Offline replay that runs
+        # faster than real time should pass audio time instead.
+        self.clock = time.monotonic
         self._input_name = self._session.get_inputs()[0].name
 
-        # Sliding window of raw int16 samples.
+        # Streaming variant (train.py --streaming): the graph takes only the new
+        # raw log-mel columns plus cached state, and returns the probability
+        # plus the updated state, so it is run on every evaluation hop.
+        self._stream_names = None
+        if variant_entry.get("interface") == "streaming":
+            inputs = self._session.get_inputs()
+            self._stream_names = [i.name for i in inputs[1:]]
+            self._stream_shapes = [tuple(i.shape) for i in inputs[1:]]
+            streaming = True
+
+        # Optional first stage: a tiny gate model over the same features that
+        # must reach a low threshold before the full CNN is run. The streaming
+        # variant must see every hop to keep its state, so it can't be gated.
+        self._gate = None
+        if cascade and self._stream_names is not None:
+            log.warning("Wake word cascade is not supported with the streaming variant; ignored")
+        elif cascade:
+            self._load_gate(meta)
+
+        # Lifetime counters (not cleared by reset()); see stats().
+        self._counts = {
+            "samples": 0,
+            "evaluations": 0,
+            "energy_gated": 0,
+            "cascade_gated": 0,
+            "full_invocations": 0,
+        }
+
+        # Circular window of raw int16 samples; ``_write`` is the index of the
+        # oldest sample (= where the next one goes). Frames are written in place
+        # and a chronological copy is only made when a window is evaluated.
         self._buffer = np.zeros(config.WINDOW_SAMPLES, dtype=np.int16)
-        self._filled = 0
-        self._samples_since_eval = 0
-        self._probs: deque[float] = deque(maxlen=config.SMOOTHING_WINDOW)
-        self._consecutive = 0
-        self._last_trigger = 0.0
+        self._trigger = _TriggerLogic()
+
+        # Incremental log-mel frontend: only hops that arrived since the last
+        # evaluation are transformed. ``_unfed`` counts buffered samples not yet
+        # pushed into it (capped at a window, beyond which it is rebuilt).
+        self._frontend = features.StreamingLogMel() if streaming else None
+        self.reset()
 
         log.info(
-            "WakeWordDetector loaded model=%s threshold=%.3f sr=%d frame=%d",
-            self.model_path, self.threshold, self._sample_rate, self._frame_length,
+            "WakeWordDetector loaded model=%s (%s) threshold=%.4g sr=%d frame=%d",
+            self.model_path, self.variant, self.threshold, self._sample_rate, self._frame_length,
         )
 
     # --- Porcupine-compatible surface ------------------------------------
@@ -99,43 +158,390 @@ class WakeWordDetector:
     def frame_length(self) -> int:
         return self._frame_length
 
+    @property
+    def smoothed_probability(self) -> float:
+        """Latest smoothed window probability, the value compared with the
+        threshold (0 after silence or a reset). Lets callers act early, e.g.
+        pre-warm the realtime connection, while a wake word looks likely."""
+        return self._trigger.smoothed
+
     def process(self, pcm) -> int:
         """Feed one frame of int16 PCM. Returns 0 on detection, else -1."""
-        frame = np.asarray(pcm, dtype=np.int16)
+        return self._process_frame(np.asarray(pcm, dtype=np.int16))
+
+    def process_bytes(self, pcm: bytes | memoryview) -> int:
+        """Like :meth:`process`, but for raw little-endian int16 PCM bytes (as
+        delivered by the PortAudio callback). The bytes are viewed in place with
+        ``np.frombuffer``, so no per-sample Python objects are created."""
+        return self._process_frame(np.frombuffer(pcm, dtype=np.int16))
+
+    def _process_frame(self, frame: np.ndarray) -> int:
+        # Evaluate exactly every EVAL_HOP_SAMPLES once the window is full (the
+        # window ends scan() uses). The frame is split at each evaluation point,
+        # so the scored window always ends at the newest buffered sample and
+        # stays on the streaming frontend's hop grid whatever the frame size.
+        self._scored = None
+        fired = -1
+        while len(frame):
+            due = max(config.WINDOW_SAMPLES - self._filled,
+                      config.EVAL_HOP_SAMPLES - self._samples_since_eval)
+            head, frame = frame[:due], frame[due:]
+            self._append(head)
+            if len(head) == due and self._evaluate():
+                fired = 0
+        return fired
 
+    def _append(self, frame: np.ndarray) -> None:
         n = len(frame)
-        # Append to the ring buffer (shift left by n, drop oldest).
+        # Overwrite the oldest samples in the ring buffer (no shifting).
         if n >= config.WINDOW_SAMPLES:
             self._buffer[:] = frame[-config.WINDOW_SAMPLES:]
+            self._write = 0
         else:
-            self._buffer[:-n] = self._buffer[n:]
-            self._buffer[-n:] = frame
+            first = min(n, config.WINDOW_SAMPLES - self._write)
+            self._buffer[self._write:self._write + first] = frame[:first]
+            self._buffer[: n - first] = frame[first:]
+            self._write = (self._write + n) % config.WINDOW_SAMPLES
         self._filled = min(self._filled + n, config.WINDOW_SAMPLES)
         self._samples_since_eval += n
+        self._counts["samples"] += n
+        self._unfed = min(self._unfed + n, config.WINDOW_SAMPLES)
 
-        # Only evaluate every ~EVAL_HOP_SAMPLES, once the window is full.
-        if self._filled < config.WINDOW_SAMPLES:
-            return -1
-        if self._samples_since_eval < config.EVAL_HOP_SAMPLES:
-            return -1
+    def _evaluate(self) -> bool:
+        """Score the current window. True = the wake word fired."""
         self._samples_since_eval = 0
+        self._counts["evaluations"] += 1
 
         # Energy gate: skip essentially-silent windows (never a wake word).
+        # RMS does not depend on sample order, so it reads the ring directly.
         rms = float(np.sqrt(np.mean((self._buffer.astype(np.float32) / 32768.0) ** 2)))
         if rms < config.ENERGY_GATE_RMS:
-            self._probs.clear()
-            self._consecutive = 0
-            return -1
+            self._counts["energy_gated"] += 1
+            self._trigger.silence()
+            return False
+
+        if self._stream_names is not None:
+            prob = self._score_stream()
+        else:
+            prob = self._score(self._buffer_features())
+        if self._trigger.update(prob, self.threshold, self.clock()):
+            log.debug("Wake word fired (smoothed prob=%.3f)", self._trigger.smoothed)
+            # The rest of the frame keeps filling the ring; keep what fired.
+            self._scored = self._window()
+            return True
+        return False
+
+    def window_pcm_bytes(self) -> bytes:
+        """The current 1.2s analysis window as int16 PCM bytes. Right after a
+        trigger this is exactly the audio that fired the detector."""
+        window = self._scored if self._scored is not None else self._window()
+        return window.tobytes()
+
+    def stats(self) -> dict:
+        """Evaluation counters since construction, plus full-model (CNN)
+        invocations per hour of audio processed - the CPU cost the energy gate
+        and the cascade gate exist to cut."""
+        out = dict(self._counts)
+        hours = self._counts["samples"] / self._sample_rate / 3600.0
+        out["audio_hours"] = round(hours, 4)
+        out["full_invocations_per_hour"] = (
+            round(self._counts["full_invocations"] / hours, 1) if hours > 0 else 0.0
+        )
+        return out
+
+    def reset(self) -> None:
+        """Forget all buffered audio and detection state.
+
+        Cheap (no model or metadata reload), so one long-lived detector can be
+        re-armed at the start of every sleep cycle instead of rebuilt.
+        """
+        self._buffer.fill(0)
+        self._write = 0
+        self._scored = None
+        self._filled = 0
+        self._samples_since_eval = 0
+        self._unfed = 0
+        self._trigger.reset()
+        if self._frontend is not None:
+            self._frontend.reset()
+        if self._stream_names is not None:
+            self._reset_stream_state()
+
+    def delete(self) -> None:
+        self._session = None
+        self._bulk_session = None
+        self._gate = None
+
+    # --- internals -------------------------------------------------------
+    def _select_variant(self, variant: str, meta: dict) -> dict:
+        """Switch ``model_path`` to an alternative export (e.g. "int8") listed
+        in the metadata next to the float model and return its metadata entry.
+        Falls back to the float model (with a warning, returning {}) if the
+        variant is unknown or its file is missing."""
+        entry = meta.get("variants", {}).get(variant, {})
+        if "file" in entry:
+            path = os.path.join(os.path.dirname(self.model_path), entry["file"])
+        else:
+            path = f"{os.path.splitext(self.model_path)[0]}.{variant}.onnx"
+        if not os.path.exists(path):
+            log.warning("Wake word model variant '%s' not found (%s), using %s",
+                        variant, path, self.model_path)
+            return {}
+        if "recall_delta" in entry:
+            log.info("Wake word variant '%s': recall %+.3f, latency %+.3f ms vs float",
+                     variant, entry["recall_delta"], entry.get("latency_delta_ms", 0.0))
+        self.model_path = path
+        self.variant = variant
+        return entry
+
+    def _load_gate(self, meta: dict) -> None:
+        """Load the cascade gate recorded in the metadata (train.py --cascade)."""
+        entry = meta.get("cascade") or {}
+        path = os.path.join(os.path.dirname(self.model_path), entry.get("file", ""))
+        if not entry.get("file") or not os.path.exists(path):
+            log.warning("Wake word cascade requested but no gate model found; running the full model only")
+            return
+        self._gate = _make_session(path)
+        self._gate_input = self._gate.get_inputs()[0].name
+        self.gate_threshold = float(entry.get("threshold", config.CASCADE_GATE_THRESHOLD))
+        log.info("Wake word cascade gate loaded model=%s threshold=%.4f", path, self.gate_threshold)
+
+    def _latest(self, n: int) -> np.ndarray:
+        """The newest ``n`` buffered samples in chronological order."""
+        start = self._write - n
+        if start >= 0:
+            return self._buffer[start:self._write]
+        return np.concatenate([self._buffer[start:], self._buffer[: self._write]])
+
+    def _window(self) -> np.ndarray:
+        """The full analysis window in chronological order (a copy)."""
+        return np.concatenate([self._buffer[self._write:], self._buffer[: self._write]])
+
+    def _update_frontend(self) -> int:
+        """Push not-yet-fed samples into the streaming frontend. Returns the
+        number of new columns; NUM_FRAMES or more means the history had a gap
+        and every column of the window is new."""
+        if self._unfed >= config.WINDOW_SAMPLES:
+            # Skipped a whole window (start-up or a long energy-gated stretch):
+            # the hop grid has a gap, so rebuild from the full buffer.
+            self._frontend.reset()
+            new = self._frontend.push(self._window())
+        elif self._unfed:
+            new = self._frontend.push(self._latest(self._unfed))
+        else:
+            new = 0
+        self._unfed = 0
+        if not self._frontend.aligned:
+            # The window doesn't start on the frontend's hop grid (evaluations
+            # are spaced by whole hops, so this shouldn't happen): re-anchor.
+            self._frontend.reset()
+            new = self._frontend.push(self._window())
+        return new
+
+    def _buffer_features(self) -> np.ndarray:
+        """Model input for the current window, via the streaming frontend."""
+        if self._frontend is None:
+            return features.waveform_to_model_input(self._window())
+        self._update_frontend()
+        return self._frontend.model_input()
+
+    def _reset_stream_state(self) -> None:
+        self._stream_state = [np.zeros(shape, dtype=np.float32) for shape in self._stream_shapes]
+        self._stream_prob = 0.0
+
+    def _score_stream(self) -> float:
+        """Advance the streaming variant over the columns added since the last
+        evaluation (from zero state over the whole window after a gap)."""
+        new = self._update_frontend()
+        if new >= config.NUM_FRAMES:
+            self._reset_stream_state()
+            new = config.NUM_FRAMES
+        if new:
+            feed = {self._input_name: self._frontend.latest_columns(new)[None]}
+            feed.update(zip(self._stream_names, self._stream_state))
+            out = self._session.run(None, feed)
+            self._stream_prob = float(np.asarray(out[0]).reshape(-1)[0])
+            self._stream_state = out[1:]
+            self._counts["full_invocations"] += 1
+        return self._stream_prob
+
+    def _score(self, feat: np.ndarray) -> float:
+        """Full-model probability, or 0.0 if the cascade gate rejects."""
+        if self._gate is not None:
+            out = self._gate.run(None, {self._gate_input: feat})[0]
+            if float(np.asarray(out).reshape(-1)[0]) < self.gate_threshold:
+                self._counts["cascade_gated"] += 1
+                return 0.0
+        self._counts["full_invocations"] += 1
+        return self._run(feat)
 
-        prob = self._infer(self._buffer)
+    def _infer(self, window: np.ndarray) -> float:
+        if self._stream_names is not None:
+            # Whole window from zero state == the variant's full-window output.
+            raw = features.waveform_to_model_input(window, standardize=False)[0]
+            feed = {self._input_name: raw}
+            feed.update((n, np.zeros(shape, dtype=np.float32))
+                        for n, shape in zip(self._stream_names, self._stream_shapes))
+            return float(np.asarray(self._session.run(None, feed)[0]).reshape(-1)[0])
+        return self._run(features.waveform_to_model_input(window))
+
+    def _run(self, feat: np.ndarray) -> float:
+        out = self._session.run(None, {self._input_name: feat})[0]
+        return float(np.asarray(out).reshape(-1)[0])
+
+    def predict_proba(self, waveform: np.ndarray) -> float:
+        """Convenience for offline tests: probability for a full waveform."""
+        return self._infer(np.asarray(waveform))
+
+    # --- offline bulk scanning -------------------------------------------
+    def scan(
+        self,
+        waveform_or_path,
+        hop: int = config.EVAL_HOP_SAMPLES,
+        batch_size: int = 256,
+    ) -> ScanResult:
+        """Score a whole recording in one vectorized pass.
+
+        Windows end every ``hop`` samples (a multiple of ``HOP_LENGTH``), so
+        their log-mel columns overlap exactly: columns are computed once per
+        block of ``batch_size`` windows, sliced into windows and standardized
+        together, and scored with one batched ``InferenceSession.run`` on a session
+        that may use every core (the live one is single-threaded). The
+        energy gate, cascade gate, smoothing, consecutive-hit and refractory
+        rules are then replayed exactly as :meth:`process` applies them, with
+        audio time in place of the wall clock.
+
+        ``waveform_or_path`` is a 1-D waveform at the detector's sample rate
+        (int16 or float in [-1, 1]) or the path of a 16-bit PCM wav at that
+        rate (use ``wake_word/scripts/scan.py`` for anything else). Does not
+        touch the live detection state or the :meth:`stats` counters.
+        """
+        if hop <= 0 or hop % config.HOP_LENGTH:
+            raise ValueError(f"hop must be a positive multiple of {config.HOP_LENGTH} samples")
+        if isinstance(waveform_or_path, (str, os.PathLike)):
+            x = _read_wav(os.fspath(waveform_or_path), self._sample_rate)
+        else:
+            x = np.asarray(waveform_or_path)
+        if x.dtype == np.int16:
+            x = x.astype(np.float32) / 32768.0
+        else:
+            x = x.astype(np.float32)
+
+        window = config.WINDOW_SAMPLES
+        count = 1 + (len(x) - window) // hop if len(x) >= window else 0
+        ends = window + hop * np.arange(count)
+        probs = np.full(count, np.nan, dtype=np.float32)
+
+        # Energy gate for every window at once from a running sum of squares.
+        if count:
+            energy = np.concatenate([[0.0], np.cumsum(x.astype(np.float64) ** 2)])
+            rms = np.sqrt((energy[ends] - energy[ends - window]) / window)
+            active = rms >= config.ENERGY_GATE_RMS
+            if self._stream_names is not None:
+                probs[active] = self._scan_stream(x, hop, count)[active]
+            else:
+                for start in range(0, count, batch_size):
+                    stop = min(start + batch_size, count)
+                    if active[start:stop].any():
+                        block = self._scan_block(x, hop, start, stop, active[start:stop])
+                        probs[start:stop][active[start:stop]] = block
+
+        times = ends / float(self._sample_rate)
+        smoothed, triggers = replay_triggers(times, probs, self.threshold)
+        return ScanResult(times=times, probs=probs, smoothed=smoothed, triggers=triggers,
+                          duration=len(x) / float(self._sample_rate))
+
+    def _scan_block(self, x: np.ndarray, hop: int, start: int, stop: int,
+                    active: np.ndarray) -> np.ndarray:
+        """Probabilities for the active windows among ``start:stop``."""
+        step = hop // config.HOP_LENGTH
+        first = start * hop
+        last = (stop - 1) * hop + config.WINDOW_SAMPLES
+        cols = features.waveform_to_logmel(x[first:last], standardize=False)
+        # (n_mels, windows, NUM_FRAMES) view -> (windows, 1, n_mels, NUM_FRAMES)
+        windows = np.lib.stride_tricks.sliding_window_view(cols, config.NUM_FRAMES, axis=1)
+        windows = windows[:, ::step][:, active].transpose(1, 0, 2)
+        feats = features.standardize_windows(windows)[:, None]
+
+        probs = np.zeros(len(feats), dtype=np.float32)
+        keep = np.ones(len(feats), dtype=bool)
+        if self._gate is not None:
+            gate = np.asarray(self._gate.run(None, {self._gate_input: feats})[0]).reshape(-1)
+            keep = gate >= self.gate_threshold
+        if keep.any():
+            if self._bulk_session is None:
+                # Offline: batched runs can use every core, unlike the live path.
+                self._bulk_session = _make_session(self.model_path, threads=self.scan_threads)
+            out = self._bulk_session.run(None, {self._input_name: feats[keep]})[0]
+            probs[keep] = np.asarray(out).reshape(-1)
+        return probs
+
+    def _scan_stream(self, x: np.ndarray, hop: int, count: int) -> np.ndarray:
+        """Probabilities of the streaming variant for every window, stepping
+        its cached state forward one hop of columns at a time. Its output only
+        depends on the last NUM_FRAMES columns, so this matches the live
+        detector's restarts after energy-gated gaps."""
+        step = hop // config.HOP_LENGTH
+        state = [np.zeros(shape, dtype=np.float32) for shape in self._stream_shapes]
+        probs = np.zeros(count, dtype=np.float32)
+        block = 1024  # windows of columns computed per frontend call
+        for start in range(0, count, block):
+            stop = min(start + block, count)
+            first = start * hop
+            last = (stop - 1) * hop + config.WINDOW_SAMPLES
+            cols = features.waveform_to_logmel(x[first:last], standardize=False)
+            for i in range(start, stop):
+                # The first window needs all its columns, later ones one hop.
+                n = config.NUM_FRAMES if i == 0 else step
+                end = (i - start) * step + config.NUM_FRAMES
+                offset = end - n
+                feed = {self._input_name: np.ascontiguousarray(cols[None, :, offset:end])}
+                feed.update(zip(self._stream_names, state))
+                out = self._session.run(None, feed)
+                probs[i] = float(np.asarray(out[0]).reshape(-1)[0])
+                state = out[1:]
+        return probs
+
+
+def _make_session(path: str, threads: int = 1) -> ort.InferenceSession:
+    # Single-threaded session keeps Pi CPU usage predictable (0 = all cores).
+    so = ort.SessionOptions()
+    so.intra_op_num_threads = threads
+    so.inter_op_num_threads = 1
+    return ort.InferenceSession(path, sess_options=so, providers=["CPUExecutionProvider"])
+
+
+class _TriggerLogic:
+    """Smoothing, consecutive-hit and refractory rules applied to the stream of
+    window probabilities. Shared by the live path (wall-clock time) and
+    :meth:`WakeWordDetector.scan` (audio time), so offline scans fire exactly
+    where the live detector would."""
+
+    def __init__(self) -> None:
+        self._probs: deque[float] = deque(maxlen=config.SMOOTHING_WINDOW)
+        self.reset()
+
+    def reset(self) -> None:
+        self._probs.clear()
+        self._consecutive = 0
+        self._last_trigger = float("-inf")
+        self.smoothed = 0.0
+
+    def silence(self) -> None:
+        """An energy-gated window: breaks the smoothing and the hit streak."""
+        self._probs.clear()
+        self._consecutive = 0
+        self.smoothed = 0.0
+
+    def update(self, prob: float, threshold: float, now: float) -> bool:
+        """Add one window probability at time ``now`` (seconds). True = fire."""
         self._probs.append(prob)
-        smoothed = float(np.mean(self._probs))
+        self.smoothed = float(np.mean(self._probs))
 
         # Refractory period: ignore detections shortly after the last one.
-        now = time.monotonic()
         in_refractory = (now - self._last_trigger) < config.REFRACTORY_SECONDS
 
-        if smoothed >= self.threshold:
+        if self.smoothed >= threshold:
             self._consecutive += 1
         else:
             self._consecutive = 0
@@ -144,24 +550,42 @@ class WakeWordDetector:
             self._last_trigger = now
             self._consecutive = 0
             self._probs.clear()
-            log.debug("Wake word fired (smoothed prob=%.3f)", smoothed)
-            return 0
-        return -1
+            return True
+        return False
 
-    def window_pcm_bytes(self) -> bytes:
-        """The current 1.2s analysis window as int16 PCM bytes. At a trigger
-        this is exactly the audio that fired the detector."""
-        return self._buffer.tobytes()
 
-    def delete(self) -> None:
-        self._session = None
+def replay_triggers(times: np.ndarray, probs: np.ndarray, threshold: float) -> tuple[np.ndarray, list[float]]:
+    """Apply the live decision logic to per-window probabilities.
 
-    # --- internals -------------------------------------------------------
-    def _infer(self, window: np.ndarray) -> float:
-        feat = features.waveform_to_model_input(window)
-        out = self._session.run(None, {self._input_name: feat})[0]
-        return float(np.asarray(out).reshape(-1)[0])
+    ``probs`` as in :class:`ScanResult` (NaN = energy gated), ``times`` the
+    window end times in seconds. Returns the smoothed probability after each
+    window and the times at which the detector fires at ``threshold``. Cheap
+    compared to scoring, so one scan can be replayed at many thresholds.
+    """
+    trigger = _TriggerLogic()
+    smoothed = np.zeros(len(probs), dtype=np.float32)
+    triggers = []
+    for i, (t, p) in enumerate(zip(times.tolist(), probs.tolist())):
+        if p != p:  # NaN
+            trigger.silence()
+        elif trigger.update(p, threshold, t):
+            triggers.append(t)
+        smoothed[i] = trigger.smoothed
+    return smoothed, triggers
 
-    def predict_proba(self, waveform: np.ndarray) -> float:
-        """Convenience for offline tests: probability for a full waveform."""
-        return self._infer(np.asarray(waveform))
+
+def _read_wav(path: str, sample_rate: int) -> np.ndarray:
+    """Read a 16-bit PCM wav (stdlib only) as int16 mono at ``sample_rate``."""
+    with wave.open(path, "rb") as w:
+        if w.getsampwidth() != 2:
+            raise ValueError(f"{path}: expected 16-bit PCM wav")
+        if w.getframerate() != sample_rate:
+            raise ValueError(
+                f"{path}: sample rate {w.getframerate()} Hz, expected {sample_rate} Hz "
+                "(wake_word/scripts/scan.py resamples other files)"
+            )
+        channels = w.getnchannels()
+        data = np.frombuffer(w.readframes(w.getnframes()), dtype="<i2")
+    if channels > 1:
+        data = data.reshape(-1, channels).mean(axis=1).astype(np.int16)
+    return data
@@ -64,11 +64,48 @@ def num_frames(num_samples: int = config.WINDOW_SAMPLES) -> int:
     return 1 + (num_samples - config.N_FFT) // config.HOP_LENGTH
 
 
-def waveform_to_logmel(waveform: np.ndarray) -> np.ndarray:
+def _log_mel_frames(x: np.ndarray, frames: int) -> np.ndarray:
+    """Un-normalized log-mel of the first ``frames`` hops of float32 ``x``.
+
+    ``x`` is (samples,) or a batch (B, samples). Returns (..., frames, n_mels).
+    Shared by the one-shot, batched and streaming frontends so all of them
+    compute every column with exactly the same operations.
+    """
+    # Frame the signal (..., frames, n_fft) via a strided view (no copy until
+    # the window is applied).
+    view = np.lib.stride_tricks.sliding_window_view(x, config.N_FFT, axis=-1)
+    framed = view[..., : frames * config.HOP_LENGTH : config.HOP_LENGTH, :] * _HANN
+
+    spectrum = np.fft.rfft(framed, n=config.N_FFT, axis=-1)
+    power = (spectrum.real ** 2 + spectrum.imag ** 2).astype(np.float32)  # (..., frames, bins)
+
+    mel = power @ _MEL_FB.T              # (..., frames, n_mels); one GEMM per window
+    return np.log(mel + _EPS)
+
+
+def _standardize(log_mel: np.ndarray) -> np.ndarray:
+    """Per-window standardization -> gain invariant."""
+    mean = log_mel.mean()
+    std = log_mel.std()
+    log_mel = (log_mel - mean) / (std + _EPS)
+    return log_mel.astype(np.float32)
+
+
+def standardize_windows(feats: np.ndarray) -> np.ndarray:
+    """Per-window standardization of a stack of un-normalized log-mel
+    features (..., n_mels, frames), matching ``standardize=True``."""
+    mean = feats.mean(axis=(-2, -1), keepdims=True)
+    std = feats.std(axis=(-2, -1), keepdims=True)
+    return ((feats - mean) / (std + _EPS)).astype(np.float32)
+
+
+def waveform_to_logmel(waveform: np.ndarray, standardize: bool = True) -> np.ndarray:
     """Convert a 1-D waveform into a normalized log-mel feature.
 
     Args:
         waveform: 1-D float array in roughly [-1, 1] (int16 is auto-scaled).
+        standardize: per-window standardize (the CNN's input). False returns
+            the raw log-mel, as used by the streaming model variant.
 
     Returns:
         float32 array of shape (n_mels, frames), per-window standardized
@@ -84,32 +121,14 @@ def waveform_to_logmel(waveform: np.ndarray) -> np.ndarray:
     if frames <= 0:
         return np.zeros((config.N_MELS, 0), dtype=np.float32)
 
-    # Frame the signal (frames, n_fft) via a strided view.
-    idx = (
-        np.arange(config.N_FFT)[None, :]
-        + config.HOP_LENGTH * np.arange(frames)[:, None]
-    )
-    framed = x[idx] * _HANN  # (frames, n_fft)
-
-    spectrum = np.fft.rfft(framed, n=config.N_FFT, axis=1)
-    power = (spectrum.real ** 2 + spectrum.imag ** 2).astype(np.float32)  # (frames, bins)
+    log_mel = _log_mel_frames(x, frames).T  # (n_mels, frames)
+    if not standardize:
+        return np.ascontiguousarray(log_mel, dtype=np.float32)
+    return _standardize(log_mel)
 
-    mel = power @ _MEL_FB.T              # (frames, n_mels)
-    log_mel = np.log(mel + _EPS).T       # (n_mels, frames)
-
-    # Per-window standardization -> gain invariant.
-    mean = log_mel.mean()
-    std = log_mel.std()
-    log_mel = (log_mel - mean) / (std + _EPS)
-    return log_mel.astype(np.float32)
 
-
-def waveform_to_model_input(waveform: np.ndarray) -> np.ndarray:
-    """Produce a (1, 1, n_mels, NUM_FRAMES) batch tensor for the CNN.
-
-    The waveform is right-aligned/truncated/zero-padded to exactly
-    ``config.WINDOW_SAMPLES`` so the feature has the fixed shape the model expects.
-    """
+def fit_window(waveform: np.ndarray) -> np.ndarray:
+    """float32 copy right-aligned/truncated/zero-padded to WINDOW_SAMPLES."""
     x = np.asarray(waveform)
     if x.dtype == np.int16:
         x = x.astype(np.float32) / 32768.0
@@ -121,12 +140,124 @@ def waveform_to_model_input(waveform: np.ndarray) -> np.ndarray:
         x = np.concatenate([np.zeros(target - len(x), dtype=np.float32), x])
     elif len(x) > target:
         x = x[-target:]
+    return x
+
+
+def waveform_to_model_input(waveform: np.ndarray, standardize: bool = True) -> np.ndarray:
+    """Produce a (1, 1, n_mels, NUM_FRAMES) batch tensor for the CNN.
+
+    The waveform is right-aligned/truncated/zero-padded to exactly
+    ``config.WINDOW_SAMPLES`` so the feature has the fixed shape the model expects.
+    """
+    return waveforms_to_model_input(fit_window(waveform)[None], standardize)
+
+
+def waveforms_to_model_input(batch, standardize: bool = True, chunk: int = 4) -> np.ndarray:
+    """Batched :func:`waveform_to_model_input`: (B, 1, n_mels, NUM_FRAMES).
+
+    ``batch`` is a (B, WINDOW_SAMPLES) array (int16 is auto-scaled) or a
+    sequence of 1-D waveforms, each fitted to the window like the single-window
+    function. Framing, rfft, mel projection and standardization run as a few
+    vectorized calls per ``chunk`` windows (kept small: the framed / spectrum
+    temporaries then stay in cache, which beats larger batches), and every
+    window's result is identical to the single-window function.
+    """
+    if isinstance(batch, np.ndarray) and batch.ndim == 2:
+        x = batch.astype(np.float32) / 32768.0 if batch.dtype == np.int16 else batch.astype(np.float32, copy=False)
+        if x.shape[1] != config.WINDOW_SAMPLES:
+            raise ValueError(f"expected (B, {config.WINDOW_SAMPLES}) windows, got {x.shape}")
+    else:
+        windows = [fit_window(w) for w in batch]
+        x = np.stack(windows) if windows else np.zeros((0, config.WINDOW_SAMPLES), dtype=np.float32)
+
+    out = np.empty((len(x), 1, config.N_MELS, config.NUM_FRAMES), dtype=np.float32)
+    for start in range(0, len(x), chunk):
+        log_mel = _log_mel_frames(x[start:start + chunk], config.NUM_FRAMES).transpose(0, 2, 1)
+        out[start:start + chunk, 0] = standardize_windows(log_mel) if standardize else log_mel
+    return out
+
+
+class StreamingLogMel:
+    """Incremental log-mel frontend for the live detector.
+
+    :func:`waveform_to_model_input` recomputes all ``NUM_FRAMES`` STFT columns
+    of a window, although between two evaluations only ~10 of them are new. This
+    keeps the last ``NUM_FRAMES`` un-normalized log-mel columns in a ring,
+    computes columns only for newly completed hops as samples are pushed, and
+    applies the per-window standardization when the feature is read.
+
+    Columns are laid on a hop grid anchored at the first sample pushed after
+    construction / :meth:`reset`. Whenever :attr:`aligned` is true (the window
+    of ``WINDOW_SAMPLES`` ending at the newest pushed sample starts on that
+    grid), :meth:`model_input` equals ``waveform_to_model_input`` of exactly
+    that window. The detector evaluates every ``EVAL_HOP_SAMPLES``, a whole
+    number of hops, so this holds at every evaluation.
+    Samples pushed must be contiguous; call :meth:`reset` after a gap.
+    """
 
-    feat = waveform_to_logmel(x)  # (n_mels, NUM_FRAMES)
-    # Defensive: pad/trim the frame axis to NUM_FRAMES.
-    if feat.shape[1] < config.NUM_FRAMES:
-        pad = config.NUM_FRAMES - feat.shape[1]
-        feat = np.pad(feat, ((0, 0), (0, pad)))
-    elif feat.shape[1] > config.NUM_FRAMES:
-        feat = feat[:, : config.NUM_FRAMES]
-    return feat[None, None, :, :].astype(np.float32)
+    def __init__(self) -> None:
+        self._ring = np.zeros((config.NUM_FRAMES, config.N_MELS), dtype=np.float32)
+        self._tail = np.zeros(0, dtype=np.float32)
+        self._write = 0     # ring index of the next column
+        self._count = 0     # columns written since reset (saturates at NUM_FRAMES)
+
+    def reset(self) -> None:
+        """Forget all history (e.g. after a gap in the audio)."""
+        self._tail = np.zeros(0, dtype=np.float32)
+        self._write = 0
+        self._count = 0
+
+    @property
+    def ready(self) -> bool:
+        """True once a full window of columns has been computed."""
+        return self._count >= config.NUM_FRAMES
+
+    @property
+    def aligned(self) -> bool:
+        """True when the newest ``NUM_FRAMES`` columns are exactly the frames
+        of the window ending at the newest pushed sample."""
+        # _tail starts at the next column; the window must start on the grid.
+        return (self._count >= config.NUM_FRAMES
+                and (len(self._tail) - config.WINDOW_SAMPLES) % config.HOP_LENGTH == 0)
+
+    def push(self, samples: np.ndarray) -> int:
+        """Append contiguous samples (int16 auto-scaled). Returns new columns."""
+        x = np.asarray(samples)
+        if x.dtype == np.int16:
+            x = x.astype(np.float32) / 32768.0
+        else:
+            x = x.astype(np.float32)
+        if len(self._tail):
+            x = np.concatenate([self._tail, x])
+
+        frames = num_frames(len(x))
+        if frames <= 0:
+            self._tail = x
+            return 0
+
+        # Only the newest NUM_FRAMES columns can ever be read; skip older hops.
+        skip = max(0, frames - config.NUM_FRAMES)
+        cols = _log_mel_frames(x[skip * config.HOP_LENGTH:], frames - skip)
+        self._tail = x[frames * config.HOP_LENGTH:]
+
+        n = len(cols)
+        first = min(n, config.NUM_FRAMES - self._write)
+        self._ring[self._write:self._write + first] = cols[:first]
+        self._ring[: n - first] = cols[first:]
+        self._write = (self._write + n) % config.NUM_FRAMES
+        self._count = min(self._count + frames, config.NUM_FRAMES)
+        return frames
+
+    def latest_columns(self, n: int) -> np.ndarray:
+        """The newest ``n`` (<= NUM_FRAMES) un-normalized columns, (n_mels, n)."""
+        idx = (self._write - n + np.arange(n)) % config.NUM_FRAMES
+        return self._ring[idx].T
+
+    def logmel(self) -> np.ndarray:
+        """Standardized (n_mels, NUM_FRAMES) feature of the newest window."""
+        cols = np.concatenate([self._ring[self._write:], self._ring[: self._write]])
+        return _standardize(cols.T)
+
+    def model_input(self) -> np.ndarray:
+        """Produce a (1, 1, n_mels, NUM_FRAMES) batch tensor for the CNN."""
+        return self.logmel()[None, None, :, :]
@@ -12,6 +12,7 @@ from __future__ import annotations
 
 import os
 
+import numpy as np
 import torch
 import torch.nn as nn
 
@@ -49,6 +50,115 @@ class WakeWordCNN(nn.Module):
         return self.head(x)  # (B, 1) raw logit
 
 
+class WakeWordGate(nn.Module):
+    """Tiny first-stage gate for the optional cascade (~1.6k params).
+
+    One temporal convolution over the mel bands, max-pooled over time, then a
+    single logit. It sees the same (1, n_mels, frames) features as the CNN but
+    costs a few percent of it, so the CNN only runs on windows it lets through.
+    """
+
+    def __init__(self, n_mels: int = config.N_MELS, channels: int = 8) -> None:
+        super().__init__()
+        self.conv = nn.Conv1d(n_mels, channels, kernel_size=5, stride=2)
+        self.head = nn.Linear(channels, 1)
+
+    def forward(self, x: torch.Tensor) -> torch.Tensor:
+        x = torch.relu(self.conv(x.squeeze(1)))   # (B, channels, T')
+        x = torch.amax(x, dim=-1)                 # (B, channels)
+        return self.head(x)                       # (B, 1) raw logit
+
+
+class StreamingWakeWordCNN(nn.Module):
+    """Causal, dilated 1-D CNN that can be run incrementally (~40k params).
+
+    The mel bands are channels and every convolution looks only backwards in
+    time with no padding ("valid"), so each output column depends on the last
+    ``receptive_field`` input columns. The head max-pools only the
+    ``pool_frames`` outputs whose receptive field lies inside the window. That
+    makes :meth:`step` - fed new columns plus the cached layer inputs and pool
+    ring - return exactly what :meth:`forward` returns for the same window,
+    while only convolving the new columns.
+
+    Per-window standardization would change every cached column each hop, so
+    this variant takes *un-normalized* log-mel (``features.waveform_to_logmel(...,
+    standardize=False)``) and normalizes with fixed per-band training-set
+    statistics (:meth:`set_normalization`); gain robustness comes from the
+    gain augmentation instead.
+    """
+
+    DILATIONS = (1, 2, 4, 8)
+    KERNEL = 3
+
+    def __init__(self, n_mels: int = config.N_MELS, channels: int = 64) -> None:
+        super().__init__()
+        self.register_buffer("mel_mean", torch.zeros(n_mels, 1))
+        self.register_buffer("mel_std", torch.ones(n_mels, 1))
+        layers = []
+        c_in = n_mels
+        for d in self.DILATIONS:
+            layers.append(nn.Sequential(
+                nn.Conv1d(c_in, channels, kernel_size=self.KERNEL, dilation=d),
+                nn.BatchNorm1d(channels),
+                nn.ReLU(inplace=True),
+            ))
+            c_in = channels
+        self.layers = nn.ModuleList(layers)
+        self.head = nn.Sequential(nn.Dropout(0.3), nn.Linear(channels, 1))
+        self.channels = channels
+
+    @classmethod
+    def contexts(cls) -> list[int]:
+        """Past input columns each layer needs (its cached state length)."""
+        return [(cls.KERNEL - 1) * d for d in cls.DILATIONS]
+
+    @classmethod
+    def receptive_field(cls) -> int:
+        return 1 + sum(cls.contexts())
+
+    @classmethod
+    def pool_frames(cls) -> int:
+        return config.NUM_FRAMES - cls.receptive_field() + 1
+
+    def set_normalization(self, mean: np.ndarray, std: np.ndarray) -> None:
+        """Per-band mean / std of the raw training log-mel, shape (n_mels,)."""
+        self.mel_mean.copy_(torch.as_tensor(mean, dtype=torch.float32).reshape(-1, 1))
+        self.mel_std.copy_(torch.as_tensor(std, dtype=torch.float32).reshape(-1, 1))
+
+    def forward(self, x: torch.Tensor) -> torch.Tensor:
+        """Full window: (B, 1, n_mels, NUM_FRAMES) raw log-mel -> (B, 1) logit."""
+        x = (x.squeeze(1) - self.mel_mean) / self.mel_std
+        for layer in self.layers:
+            x = layer(x)
+        return self.head(torch.amax(x, dim=-1))
+
+    def step(self, columns: torch.Tensor, *state: torch.Tensor):
+        """Incremental: (1, n_mels, T) new raw columns + state -> (logit, *state).
+
+        ``state`` is one (1, C_in, context) tensor per layer followed by the
+        (1, channels, pool_frames) ring of final outputs (see
+        :func:`initial_stream_state`).
+        """
+        x = (columns - self.mel_mean) / self.mel_std
+        new_state = []
+        for layer, ctx, cache in zip(self.layers, self.contexts(), state[:-1]):
+            x = torch.cat([cache, x], dim=-1)
+            new_state.append(x[:, :, -ctx:])
+            x = layer(x)
+        pool = torch.cat([state[-1], x], dim=-1)[:, :, -self.pool_frames():]
+        new_state.append(pool)
+        return (self.head(torch.amax(pool, dim=-1)), *new_state)
+
+
+def initial_stream_state(n_mels: int = config.N_MELS, channels: int = 64) -> list[np.ndarray]:
+    """Zero state for :meth:`StreamingWakeWordCNN.step` / the exported graph."""
+    c_ins = [n_mels] + [channels] * (len(StreamingWakeWordCNN.DILATIONS) - 1)
+    state = [np.zeros((1, c, ctx), dtype=np.float32)
+             for c, ctx in zip(c_ins, StreamingWakeWordCNN.contexts())]
+    state.append(np.zeros((1, channels, StreamingWakeWordCNN.pool_frames()), dtype=np.float32))
+    return state
+
+
 class SigmoidWrapper(nn.Module):
     """Wraps the model so the exported ONNX graph outputs a probability.
 
@@ -56,7 +166,7 @@ class SigmoidWrapper(nn.Module):
     detection probability directly, no sigmoid needed on the Pi.
     """
 
-    def __init__(self, model: WakeWordCNN) -> None:
+    def __init__(self, model: nn.Module) -> None:
         super().__init__()
         self.model = model
 
@@ -64,7 +174,7 @@ class SigmoidWrapper(nn.Module):
         return torch.sigmoid(self.model(x)).squeeze(-1)  # (B,)
 
 
-def export_onnx(model: WakeWordCNN, path: str) -> None:
+def export_onnx(model: nn.Module, path: str) -> None:
     """Export ``model`` (probability output) to ONNX at ``path``."""
     model.eval()
     wrapped = SigmoidWrapper(model).eval()
@@ -80,6 +190,51 @@ def export_onnx(model: WakeWordCNN, path: str) -> None:
         verbose=False,
     )
 
+    _inline_external_data(path)
+
+
+class _StreamingStep(nn.Module):
+    """Export wrapper: StreamingWakeWordCNN.step with a probability output."""
+
+    def __init__(self, model: StreamingWakeWordCNN) -> None:
+        super().__init__()
+        self.model = model
+
+    # Explicit arguments (one per DILATIONS entry + the pool ring): the ONNX
+    # exporter cannot map *args to named graph inputs.
+    def forward(self, columns, state_0, state_1, state_2, state_3, state_4):
+        logit, *new_state = self.model.step(columns, state_0, state_1, state_2, state_3, state_4)
+        return (torch.sigmoid(logit).squeeze(-1), *new_state)
+
+
+def export_streaming_onnx(model: StreamingWakeWordCNN, path: str) -> list[str]:
+    """Export the incremental step graph of ``model`` to ONNX at ``path``.
+
+    Inputs are ``columns`` (1, n_mels, T new raw log-mel columns) and
+    ``state_0..state_N``; outputs are ``probability`` (1,) and
+    ``new_state_0..new_state_N``. Returns the state names in order.
+    """
+    model.eval()
+    wrapped = _StreamingStep(model).eval()
+    state = [torch.from_numpy(s) for s in initial_stream_state(model.layers[0][0].in_channels,
+                                                               model.channels)]
+    names = [f"state_{i}" for i in range(len(state))]
+    columns = torch.zeros(1, config.N_MELS, config.EVAL_HOP_SAMPLES // config.HOP_LENGTH)
+    torch.onnx.export(
+        wrapped,
+        (columns, *state),
+        path,
+        input_names=["columns", *names],
+        output_names=["probability", *[f"new_{n}" for n in names]],
+        dynamic_axes={"columns": {2: "time"}},
+        opset_version=17,
+        verbose=False,
+    )
+    _inline_external_data(path)
+    return names
+
+
+def _inline_external_data(path: str) -> None:
     # The exporter may stash weights in an external "<path>.data" file. Inline
     # them so the model is a single self-contained file that's easy to deploy.
     ext_data = path + ".data"
@@ -88,3 +243,47 @@ def export_onnx(model: WakeWordCNN, path: str) -> None:
         model_proto = onnx.load(path)  # pulls in the external weights
         onnx.save_model(model_proto, path, save_as_external_data=False)
         os.remove(ext_data)
+
+
+def quantize_onnx(float_path: str, out_path: str, calibration: np.ndarray | None = None) -> None:
+    """Write an INT8 copy of the exported float model at ``float_path``.
+
+    With ``calibration`` features (N, 1, n_mels, frames) the activations are
+    statically quantized (QDQ) from their observed ranges, which is what makes
+    the convolutions faster on the Pi. Without, only the weights are quantized
+    (dynamic quantization) - smaller, but usually no faster for a CNN.
+    """
+    from onnxruntime.quantization import (
+        CalibrationDataReader,
+        QuantFormat,
+        QuantType,
+        quantize_dynamic,
+        quantize_static,
+    )
+    from onnxruntime.quantization.shape_inference import quant_pre_process
+
+    class _Reader(CalibrationDataReader):
+        def __init__(self, feats: np.ndarray) -> None:
+            self._it = iter(feats.astype(np.float32))
+
+        def get_next(self):
+            feat = next(self._it, None)
+            return None if feat is None else {"features": feat[None]}
+
+    # Shape inference + graph cleanup recommended by onnxruntime before quantizing.
+    pre_path = out_path + ".pre.onnx"
+    quant_pre_process(float_path, pre_path)
+    try:
+        if calibration is None:
+            quantize_dynamic(pre_path, out_path, weight_type=QuantType.QInt8)
+        else:
+            quantize_static(
+                pre_path,
+                out_path,
+                _Reader(calibration),
+                quant_format=QuantFormat.QDQ,
+                activation_type=QuantType.QUInt8,
+                weight_type=QuantType.QInt8,
+            )
+    finally:
+        os.remove(pre_path)
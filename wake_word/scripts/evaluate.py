@@ -3,34 +3,343 @@
 Runs the ONNX model over the audio in wake_word/data (or a held-out --data-dir),
 and reports:
     - overall recall (true-positive rate) and false-alarm rate at the model threshold
-    - a threshold sweep so you can see the recall / false-alarm trade-off
+    - a threshold sweep so you can see the recall / false-alarm trade-off (exact
+      rates from the sorted scores, see metrics.py), plus the threshold train.py's
+      policy would pick on this data; --update-metadata saves the full curve
     - per-category breakdown, including how well "Alexa" is rejected
+    - per-variant (float / int8) latency and accuracy deltas; with
+      --update-metadata these are written into the model's .json
+    - with --background, full-model invocations per hour of real background
+      audio, with and without the cascade gate
+    - with --stream, false wakes per hour of continuous audio through the real
+      detector decision logic, detection latency on wake words mixed into the
+      same audio, and a DET curve (FA/hour vs miss rate) across thresholds
 
 Usage::
 
     python wake_word/scripts/evaluate.py
     python wake_word/scripts/evaluate.py --data-dir path/to/heldout
+    python wake_word/scripts/evaluate.py --update-metadata
+    python wake_word/scripts/evaluate.py --background recordings/*.wav
+    python wake_word/scripts/evaluate.py --stream recordings/*.wav --det-csv det.csv
 """
 
 from __future__ import annotations
 
 import argparse
+import csv
+import glob
+import json
+import multiprocessing
 import os
+import time
+from concurrent.futures import ProcessPoolExecutor
 
 import _bootstrap  # noqa: F401
 import numpy as np
 
-from prepare_dataset import DATA_DIR, build_dataset, to_arrays
+from metrics import choose_threshold, rate_curve, write_report
+from prepare_dataset import (
+    CACHE_DIR,
+    DATA_DIR,
+    POSITIVE_DIR,
+    build_dataset,
+    load_dataset,
+    load_wav_mono,
+)
 from wake_word import config
-from wake_word.detector import WakeWordDetector  # for threshold metadata reuse
+from wake_word.detector import WakeWordDetector, replay_triggers
 
 MODELS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "models")
 
 
+def _latency_ms(model_path: str, feat: np.ndarray, runs: int = 200) -> float:
+    """Median single-window latency with the detector's session settings."""
+    import onnxruntime as ort
+
+    so = ort.SessionOptions()
+    so.intra_op_num_threads = 1
+    so.inter_op_num_threads = 1
+    sess = ort.InferenceSession(model_path, sess_options=so, providers=["CPUExecutionProvider"])
+    feed = {sess.get_inputs()[0].name: feat}
+    sess.run(None, feed)  # warm-up
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        sess.run(None, feed)
+        times.append(time.perf_counter() - start)
+    return float(np.median(times)) * 1000.0
+
+
+def _predict(sess, X: np.ndarray, batch: int = 1024) -> np.ndarray:
+    """Probabilities for every window of the (memory-mapped) dataset, scored
+    a batch at a time so the features are never all in memory."""
+    name = sess.get_inputs()[0].name
+    out = [sess.run(None, {name: np.ascontiguousarray(X[i:i + batch])})[0].reshape(-1)
+           for i in range(0, len(X), batch)]
+    return np.concatenate(out) if out else np.zeros(0, dtype=np.float32)
+
+
+def _compare_variants(model_path: str, X, y, categories, threshold: float, update: bool,
+                      curve=None) -> None:
+    """Score every variant listed in the metadata and report deltas vs float."""
+    import onnxruntime as ort
+
+    meta_path = os.path.splitext(model_path)[0] + ".json"
+    if not os.path.exists(meta_path):
+        return
+    with open(meta_path, "r") as f:
+        meta = json.load(f)
+    variants = meta.get("variants") or {"float": {"file": os.path.basename(model_path)}}
+    model_dir = os.path.dirname(model_path)
+
+    results = {}
+    for name, entry in variants.items():
+        if entry.get("interface") == "streaming":
+            # Takes raw columns + cached state, not standardized windows; its
+            # clip metrics come from train.py, its FA/hour from --stream.
+            continue
+        path = os.path.join(model_dir, entry["file"])
+        if not os.path.exists(path):
+            print(f"  {name}: {path} missing, skipped")
+            continue
+        sess = ort.InferenceSession(path, providers=["CPUExecutionProvider"])
+        probs = _predict(sess, X)
+        results[name] = rate_curve(probs, y, categories).at(threshold)
+        results[name]["latency_ms"] = _latency_ms(path, np.ascontiguousarray(X[:1]))
+
+    if len(results) < 2 and not update:
+        return
+    base = results.get("float")
+    print("\nModel variants (at the metadata threshold):")
+    print(f"  {'variant':>8}  {'latency':>9}  {'recall':>7}  {'FA rate':>8}  {'hard-neg':>8}")
+    for name, r in results.items():
+        print(f"  {name:>8}  {r['latency_ms']:7.3f}ms  {r['recall']:7.3f}  "
+              f"{r['false_alarm_rate']:8.3f}  {r['hard_negative_rate']:8.3f}")
+        entry = variants[name]
+        entry["latency_ms"] = round(r["latency_ms"], 4)
+        entry["eval_recall"] = round(r["recall"], 4)
+        entry["eval_false_alarm_rate"] = round(r["false_alarm_rate"], 4)
+        entry["eval_hard_negative_rate"] = round(r["hard_negative_rate"], 4)
+        if base is not None and name != "float":
+            entry["latency_delta_ms"] = round(r["latency_ms"] - base["latency_ms"], 4)
+            entry["recall_delta"] = round(r["recall"] - base["recall"], 4)
+            entry["false_alarm_delta"] = round(r["false_alarm_rate"] - base["false_alarm_rate"], 4)
+            entry["hard_negative_delta"] = round(r["hard_negative_rate"] - base["hard_negative_rate"], 4)
+
+    if update:
+        meta["variants"] = variants
+        if curve is not None:
+            meta["eval_roc"] = curve.to_metadata(threshold)
+            print(f"Updated {write_report(meta_path, {'eval': curve})}")
+        with open(meta_path, "w") as f:
+            json.dump(meta, f, indent=2)
+        print(f"Updated {meta_path}")
+
+
+def _cascade_report(model_path: str, paths: list[str]) -> None:
+    """Stream long recordings through the live detector with the cascade on
+    and report how often the full model actually runs."""
+    detector = WakeWordDetector(model_path, cascade=True)
+    if detector._gate is None:
+        print("\nNo cascade gate in the metadata (train with --cascade).")
+        return
+    # Replay runs far faster than real time: the refractory period must run on
+    # audio time (samples consumed), as it would live, or triggers are missed.
+    detector.clock = lambda: detector._counts["samples"] / config.SAMPLE_RATE
+    triggers = 0
+    for path in paths:
+        detector.reset()   # recordings aren't contiguous
+        pcm = (np.clip(load_wav_mono(path), -1.0, 1.0) * 32767.0).astype(np.int16)
+        step = config.FRAME_LENGTH
+        for start in range(0, len(pcm) - step + 1, step):
+            if detector.process_bytes(pcm[start:start + step].tobytes()) >= 0:
+                triggers += 1
+    stats = detector.stats()
+    hours = stats["audio_hours"]
+    if hours <= 0:
+        print("\nNo background audio streamed.")
+        return
+    # Without the cascade every window that passes the energy gate runs the CNN.
+    single = (stats["evaluations"] - stats["energy_gated"]) / hours
+    cascade = stats["full_invocations_per_hour"]
+    print(f"\nCascade on {len(paths)} background file(s), {hours * 60:.1f} min of audio:")
+    print(f"  evaluations/hour:                  {stats['evaluations'] / hours:9.1f}")
+    print(f"  full-model invocations/hour (off): {single:9.1f}")
+    print(f"  full-model invocations/hour (on):  {cascade:9.1f}"
+          f"  ({1.0 - cascade / single if single else 0.0:.1%} saved)")
+    print(f"  triggers: {triggers}  ({triggers / hours:.2f}/hour)")
+
+
+# --- streaming evaluation (--stream) -----------------------------------------
+# A trigger in the mixed scan within this long of one in the clean scan of the
+# same background is that false alarm, not a detection of the mixed-in word.
+_FA_MATCH_SECONDS = 2 * config.EVAL_HOP_SAMPLES / config.SAMPLE_RATE
+
+# One detector per worker process, built once by the pool initializer.
+_stream_detector: WakeWordDetector | None = None
+_stream_clips: list[tuple[np.ndarray, int]] = []
+
+
+def _speech_end(clip: np.ndarray) -> int:
+    """Sample index where the wake word ends: the last 10 ms hop whose RMS is
+    within 20 dB of the clip's loudest hop (ignores trailing room tone)."""
+    hop = config.HOP_LENGTH
+    n = len(clip) // hop
+    if n == 0:
+        return len(clip)
+    rms = np.sqrt(np.mean(clip[: n * hop].reshape(n, hop) ** 2, axis=1))
+    loud = np.nonzero(rms >= 0.1 * rms.max())[0]
+    return int(loud[-1] + 1) * hop
+
+
+def _stream_init(model_path: str, positive_paths: list[str]) -> None:
+    global _stream_detector, _stream_clips
+    _stream_detector = WakeWordDetector(model_path)
+    _stream_detector.scan_threads = 1   # parallelism comes from the process pool
+    _stream_clips = []
+    for path in positive_paths:
+        clip = load_wav_mono(path)
+        _stream_clips.append((clip, _speech_end(clip)))
+
+
+def _stream_file(task: tuple[str, float, int]) -> dict:
+    """Scan one recording as-is (false alarms) and with wake words mixed in
+    every ``spacing`` seconds (latency / misses). Seeded per file, so results
+    don't depend on the number of workers."""
+    path, spacing, seed = task
+    x = load_wav_mono(path)
+    clean = _stream_detector.scan(x)
+    result = {"path": path, "duration": clean.duration,
+              "clean": (clean.times, clean.probs), "mixed": None, "events": []}
+    if not _stream_clips:
+        return result
+
+    rng = np.random.default_rng(seed)
+    sr = config.SAMPLE_RATE
+    mixed = x.copy()
+    pos = config.WINDOW_SAMPLES
+    while True:
+        clip, end = _stream_clips[int(rng.integers(len(_stream_clips)))]
+        if pos + len(clip) > len(mixed):
+            break
+        mixed[pos:pos + len(clip)] += clip
+        result["events"].append((pos / sr, (pos + end) / sr))
+        pos += len(clip) + int(spacing * sr)
+    scanned = _stream_detector.scan(np.clip(mixed, -1.0, 1.0))
+    result["mixed"] = (scanned.times, scanned.probs)
+    return result
+
+
+def _stream_metrics(results: list[dict], threshold: float) -> dict:
+    """False alarms per hour and wake word detection at one threshold.
+
+    A wake word counts as detected by the first trigger at or after its onset
+    (and at most one window past its end) that the clean scan of the same
+    background doesn't also have; triggers that do are the background's false
+    alarms and are counted separately as ``fa_attributed``.
+    """
+    hours = sum(r["duration"] for r in results) / 3600.0
+    false_alarms = 0
+    events = 0
+    fa_attributed = 0
+    latencies = []
+    for r in results:
+        clean = np.asarray(replay_triggers(*r["clean"], threshold)[1])
+        false_alarms += len(clean)
+        if r["mixed"] is None:
+            continue
+        triggers = np.asarray(replay_triggers(*r["mixed"], threshold)[1])
+        for start, end in r["events"]:
+            events += 1
+            near = triggers[(triggers >= start) & (triggers <= end + config.WINDOW_SECONDS)]
+            background = np.array([np.any(np.abs(clean - t) <= _FA_MATCH_SECONDS) for t in near],
+                                  dtype=bool)
+            fa_attributed += int(background.sum())
+            hit = near[~background]
+            if len(hit):
+                latencies.append(hit[0] - end)
+    return {
+        "fa_per_hour": false_alarms / hours if hours > 0 else 0.0,
+        "false_alarms": false_alarms,
+        "events": events,
+        "fa_attributed": fa_attributed,
+        "miss_rate": 1.0 - len(latencies) / events if events else float("nan"),
+        "latencies": np.asarray(latencies),
+    }
+
+
+def _stream_report(model_path: str, paths: list[str], data_dir: str, threshold: float,
+                   spacing: float, workers: int, det_csv: str | None) -> None:
+    """Run long recordings through the detector across a process pool and
+    report FA/hour, detection latency and a DET curve."""
+    positives = sorted(glob.glob(os.path.join(data_dir, POSITIVE_DIR, "*.wav")))
+    tasks = [(path, spacing, seed) for seed, path in enumerate(paths)]
+    workers = max(1, min(workers, len(tasks)))
+    print(f"\nStreaming evaluation: {len(paths)} file(s), {workers} worker(s), "
+          f"{len(positives)} wake word clip(s) mixed in every {spacing:.0f}s")
+    ctx = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(workers, mp_context=ctx, initializer=_stream_init,
+                             initargs=(model_path, positives)) as pool:
+        results = list(pool.map(_stream_file, tasks))
+
+    hours = sum(r["duration"] for r in results) / 3600.0
+    if hours <= 0:
+        print("No audio long enough for a full window.")
+        return
+
+    at = _stream_metrics(results, threshold)
+    print(f"  audio: {hours:.2f} h")
+    print(f"  at threshold {threshold:.3f}: {at['false_alarms']} false wakes "
+          f"({at['fa_per_hour']:.2f}/hour)")
+    if at["events"]:
+        lat = at["latencies"] * 1000.0
+        print(f"  wake words: {at['events']}, miss rate {at['miss_rate']:.3f}, "
+              f"{at['fa_attributed']} trigger(s) near a word attributed to background false alarms")
+        if len(lat):
+            print(f"  latency from word end to trigger: median {np.median(lat):.0f} ms, "
+                  f"p90 {np.percentile(lat, 90):.0f} ms, max {lat.max():.0f} ms")
+
+    thresholds = sorted(set(np.round(np.arange(0.05, 1.0, 0.05), 2).tolist()) | {threshold})
+    rows = []
+    print("\n  DET curve:")
+    print(f"  {'thr':>6}  {'FA/hour':>8}  {'miss':>6}  {'latency':>9}")
+    for thr in thresholds:
+        m = _stream_metrics(results, thr)
+        median = float(np.median(m["latencies"])) * 1000.0 if len(m["latencies"]) else float("nan")
+        marker = "  <- threshold" if thr == threshold else ""
+        print(f"  {thr:6.3f}  {m['fa_per_hour']:8.2f}  {m['miss_rate']:6.3f}  {median:7.0f}ms{marker}")
+        rows.append((thr, round(m["fa_per_hour"], 4), round(m["miss_rate"], 4), round(median, 1),
+                     m["fa_attributed"]))
+
+    if det_csv:
+        with open(det_csv, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["threshold", "fa_per_hour", "miss_rate", "median_latency_ms",
+                             "fa_attributed"])
+            writer.writerows(rows)
+        print(f"Wrote DET curve to {det_csv}")
+
+
 def main() -> None:
     ap = argparse.ArgumentParser(description="Evaluate the Aurora wake word model.")
     ap.add_argument("--data-dir", default=DATA_DIR)
     ap.add_argument("--model", default=os.path.join(MODELS_DIR, "aurora.onnx"))
+    ap.add_argument("--no-cache", action="store_true",
+                    help="Recompute all features instead of using the feature cache.")
+    ap.add_argument("--dataset", default=None,
+                    help="Evaluate a dataset directory from prepare_dataset.py instead of --data-dir.")
+    ap.add_argument("--update-metadata", action="store_true",
+                    help="Write per-variant latency / accuracy deltas into the model .json.")
+    ap.add_argument("--background", nargs="+", default=[],
+                    help="Long background recordings to measure cascade savings on.")
+    ap.add_argument("--stream", nargs="+", default=[],
+                    help="Long background / negative recordings for the FA/hour evaluation.")
+    ap.add_argument("--stream-spacing", type=float, default=6.0,
+                    help="Seconds of audio between wake words mixed in for latency.")
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                    help="Processes for the streaming evaluation.")
+    ap.add_argument("--det-csv", default=None, help="Write the streaming DET curve to this CSV.")
     args = ap.parse_args()
 
     import onnxruntime as ort
@@ -42,34 +351,41 @@ def main() -> None:
     detector = WakeWordDetector(args.model)
     threshold = detector.threshold
 
-    print("Building evaluation set (no augmentation)...")
-    samples = build_dataset(args.data_dir, augment=False)
-    if not samples:
+    if args.dataset:
+        print(f"Loading evaluation set {args.dataset}...")
+        X, y, _groups, categories = load_dataset(args.dataset)
+    else:
+        print("Building evaluation set (no augmentation)...")
+        X, y, _groups, categories = build_dataset(
+            args.data_dir, augment=False, cache_dir=None if args.no_cache else CACHE_DIR)
+    if not len(y):
         raise SystemExit("No data found.")
-    X, y, _groups, categories = to_arrays(samples)
 
     sess = ort.InferenceSession(args.model, providers=["CPUExecutionProvider"])
-    name = sess.get_inputs()[0].name
-    probs = sess.run(None, {name: X})[0].reshape(-1)
+    probs = _predict(sess, X)
 
-    pos = probs[y == 1]
-    neg = probs[y == 0]
+    curve = rate_curve(probs, y, categories)
 
     print(f"\nModel: {args.model}")
     print(f"Threshold (from metadata): {threshold}")
-    print(f"Samples: {len(y)} ({len(pos)} positive, {len(neg)} negative)\n")
+    print(f"Samples: {len(y)} ({len(curve.pos)} positive, {len(curve.neg)} negative)\n")
 
+    # Exact rates, read off the sorted scores; the metadata threshold and the
+    # one train.py's policy would choose on this data are marked.
+    suggested = choose_threshold(curve, config.MAX_HARD_NEGATIVE_RATE)
+    marks = {threshold: "  <- threshold", suggested: "  <- policy on this data"}
+    if suggested == threshold:
+        marks[threshold] = "  <- threshold (= policy on this data)"
     print("Threshold sweep:")
-    print(f"  {'thr':>5}  {'recall':>7}  {'FA rate':>8}")
-    for thr in np.linspace(0.1, 0.9, 9):
-        recall = float(np.mean(pos >= thr)) if len(pos) else 0.0
-        fa = float(np.mean(neg >= thr)) if len(neg) else 0.0
-        marker = "  <- threshold" if abs(thr - threshold) < 0.05 else ""
-        print(f"  {thr:5.2f}  {recall:7.3f}  {fa:8.3f}{marker}")
+    print(f"  {'thr':>7}  {'recall':>7}  {'FA rate':>8}  {'hard-neg':>8}")
+    for thr in sorted(set(np.round(np.linspace(0.1, 0.9, 9), 2).tolist()) | set(marks)):
+        r = curve.at(thr)
+        print(f"  {thr:7.4g}  {r['recall']:7.3f}  {r['false_alarm_rate']:8.3f}  "
+              f"{r['hard_negative_rate']:8.3f}{marks.get(thr, '')}")
 
-    recall = float(np.mean(pos >= threshold)) if len(pos) else 0.0
-    fa = float(np.mean(neg >= threshold)) if len(neg) else 0.0
-    print(f"\nAt threshold {threshold}:  recall={recall:.3f}  false-alarm rate={fa:.3f}")
+    at = curve.at(threshold)
+    print(f"\nAt threshold {threshold}:  recall={at['recall']:.3f}  "
+          f"false-alarm rate={at['false_alarm_rate']:.3f}")
 
     print("\nPer-category mean probability and trigger rate:")
     for cat in sorted(set(categories.tolist())):
@@ -89,6 +405,15 @@ def main() -> None:
             trig = float(np.mean(probs[hn] >= threshold))
             print(f"\nHard-negative (incl. 'Alexa') trigger rate: {trig:.3f}  (lower is better)")
 
+    _compare_variants(args.model, X, y, categories, threshold, args.update_metadata, curve)
+
+    if args.background:
+        _cascade_report(args.model, args.background)
+
+    if args.stream:
+        _stream_report(args.model, args.stream, args.data_dir, threshold,
+                       args.stream_spacing, args.workers, args.det_csv)
+
 
 if __name__ == "__main__":
     main()
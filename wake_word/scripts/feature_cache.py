@@ -0,0 +1,88 @@
+"""Content-addressed on-disk cache of per-file training features.
+
+:func:`prepare_dataset.build_dataset` featurizes every wav on every train /
+evaluate run. This cache stores each file's feature array under a key derived
+from the file's *content* hash, the feature configuration in
+:mod:`wake_word.config` and, for augmented copies, the augmentation seed /
+index and the background set. Rebuilds after adding a few clips only featurize
+the new files, and changing e.g. ``N_MELS`` or ``HOP_LENGTH`` invalidates every
+entry automatically (the keys change). Bump :data:`CACHE_VERSION` when the
+feature or augmentation *code* changes in a way the keys can't see.
+
+Entries are ``<root>/<ab>/<key>.npz`` holding the features and the seconds it
+took to compute them (for the time-saved report). Writes are atomic, so
+concurrent dataset workers can share one cache. Delete the directory to clear it.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import time
+
+import numpy as np
+
+from wake_word import config
+
+CACHE_VERSION = 3  # 2: windowed-sinc resampling on load; 3: blockwise StreamResampler
+
+
+def file_digest(path: str) -> str:
+    """SHA-256 of a file's bytes."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def feature_config() -> dict:
+    """Everything in wake_word.config that changes the computed features."""
+    return {
+        "version": CACHE_VERSION,
+        "sample_rate": config.SAMPLE_RATE,
+        "window_samples": config.WINDOW_SAMPLES,
+        "n_fft": config.N_FFT,
+        "hop_length": config.HOP_LENGTH,
+        "n_mels": config.N_MELS,
+        "fmin": config.FMIN,
+        "fmax": config.FMAX,
+        "num_frames": config.NUM_FRAMES,
+    }
+
+
+class FeatureCache:
+    def __init__(self, root: str) -> None:
+        self.root = root
+        self._config = feature_config()
+
+    def key(self, *parts) -> str:
+        """Cache key for JSON-serializable ``parts`` plus the feature config."""
+        blob = json.dumps([self._config, *parts], sort_keys=True)
+        return hashlib.sha256(blob.encode()).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, key[:2], key + ".npz")
+
+    def load(self, key: str) -> tuple[np.ndarray, float] | None:
+        """(features, seconds saved) for a hit, else None."""
+        path = self._path(key)
+        if not os.path.exists(path):
+            return None
+        start = time.perf_counter()
+        try:
+            with np.load(path) as data:
+                feats = data["features"]
+                seconds = float(data["seconds"])
+        except Exception:  # noqa: BLE001 - truncated / corrupt entry: recompute
+            return None
+        return feats, max(0.0, seconds - (time.perf_counter() - start))
+
+    def store(self, key: str, feats: np.ndarray, seconds: float) -> None:
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            np.savez(f, features=feats, seconds=np.float64(seconds))
+        os.replace(tmp, path)
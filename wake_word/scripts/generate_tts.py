@@ -8,24 +8,41 @@ you have collected many real recordings.
 Reuses your existing OPENAI_API_KEY (from .env / settings). Clips are short, so
 this is inexpensive, but use --dry-run first to see the plan and counts.
 
+Requests run ``--concurrency`` at a time. Rate limits (429, honouring
+``Retry-After``), server errors and dropped connections are retried with
+jittered exponential backoff; a 429 pauses every worker, not just the one that
+hit it. Every finished item is appended to ``tts_manifest.jsonl`` in the data
+directory as ``done`` or ``failed``, so an interrupted run (Ctrl-C, crash, lost
+network) picks up exactly where it stopped: re-running the same command skips
+what is done and retries what failed. ``--base-url`` points the client at any
+server implementing ``POST /audio/speech``, e.g. a local stub for testing.
+
 Usage::
 
     python wake_word/scripts/generate_tts.py --dry-run
     python wake_word/scripts/generate_tts.py
     python wake_word/scripts/generate_tts.py --voices alloy,nova --variations 2
+    python wake_word/scripts/generate_tts.py --concurrency 16
+    python wake_word/scripts/generate_tts.py --base-url http://127.0.0.1:8000/v1
 """
 
 from __future__ import annotations
 
 import argparse
 import io
+import json
 import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 import _bootstrap  # noqa: F401
 import numpy as np
 import soundfile as sf
 
-from prepare_dataset import DATA_DIR, HARD_NEG_DIR, NEG_DIR, POSITIVE_DIR, _resample_linear
+from prepare_dataset import DATA_DIR, HARD_NEG_DIR, NEG_DIR, POSITIVE_DIR
+from resample import resample
 from settings import settings
 from wake_word import config
 
@@ -71,12 +88,137 @@ STYLES = [
 ]
 
 
+MANIFEST_FILE = "tts_manifest.jsonl"
+
+# HTTP statuses worth retrying besides 429: timeouts, conflicts, server errors.
+_RETRY_STATUSES = {408, 409, 500, 502, 503, 504}
+
+
 def _save_resampled(audio_bytes: bytes, out_path: str) -> None:
     data, sr = sf.read(io.BytesIO(audio_bytes), dtype="float32", always_2d=False)
     if data.ndim > 1:
         data = data.mean(axis=1)
-    data = _resample_linear(data, sr, config.SAMPLE_RATE)
-    sf.write(out_path, data, config.SAMPLE_RATE, subtype="PCM_16")
+    data = resample(data, sr, config.SAMPLE_RATE)
+    # Write then rename, so an interrupted run never leaves a truncated clip behind.
+    tmp = f"{out_path}.{threading.get_ident()}.tmp"
+    sf.write(tmp, data, config.SAMPLE_RATE, subtype="PCM_16", format="WAV")
+    os.replace(tmp, out_path)
+
+
+class Manifest:
+    """Append-only JSONL log of finished plan items, keyed by ``<category>/<file>``.
+
+    The last record for a key wins, so retrying a failed item just appends its
+    new outcome. A ``done`` record only counts if it was made with the same
+    voice / phrase / style / model and the clip is still on disk.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.records: dict[str, dict] = {}
+        self._lock = threading.Lock()
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        rec = json.loads(line)
+                    except json.JSONDecodeError:  # torn last line from a crash
+                        continue
+                    self.records[rec["key"]] = rec
+
+    def is_done(self, key: str, request: dict, out_path: str) -> bool:
+        rec = self.records.get(key)
+        return (rec is not None and rec["status"] == "done" and os.path.exists(out_path)
+                and all(rec.get(k) == v for k, v in request.items()))
+
+    def record(self, key: str, status: str, request: dict, **extra) -> None:
+        rec = {"key": key, "status": status, **request, **extra}
+        with self._lock:
+            self.records[key] = rec
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(rec) + "\n")
+
+
+class _Backoff:
+    """Shared cool-down: a rate limit seen by one worker pauses all of them."""
+
+    def __init__(self, base: float, cap: float) -> None:
+        self.base = base
+        self.cap = cap
+        self._until = 0.0
+        self._lock = threading.Lock()
+
+    def delay(self, attempt: int, retry_after: float | None) -> float:
+        if retry_after is not None:
+            return min(retry_after, self.cap)
+        return min(self.cap, self.base * 2 ** attempt) * random.uniform(0.5, 1.0)
+
+    def pause_all(self, seconds: float) -> None:
+        with self._lock:
+            self._until = max(self._until, time.monotonic() + seconds)
+
+    def wait(self, stop: threading.Event) -> None:
+        while not stop.is_set():
+            with self._lock:
+                remaining = self._until - time.monotonic()
+            if remaining <= 0:
+                return
+            stop.wait(remaining)
+
+
+def _retry_after(exc: Exception) -> float | None:
+    """Seconds from a ``Retry-After`` / ``retry-after-ms`` response header, if any."""
+    response = getattr(exc, "response", None)
+    if response is None:
+        return None
+    headers = response.headers
+    try:
+        if "retry-after-ms" in headers:
+            return float(headers["retry-after-ms"]) / 1000.0
+        if "retry-after" in headers:
+            return float(headers["retry-after"])
+    except ValueError:  # HTTP-date form: fall back to exponential backoff
+        pass
+    return None
+
+
+def _is_retryable(exc: Exception) -> bool:
+    import openai
+
+    if isinstance(exc, (openai.RateLimitError, openai.APIConnectionError)):
+        return True
+    return isinstance(exc, openai.APIStatusError) and exc.status_code in _RETRY_STATUSES
+
+
+def _synthesize(client, request: dict, out_path: str, retries: int, backoff: _Backoff,
+                stop: threading.Event) -> int:
+    """Generate one clip, retrying transient errors. Returns the attempts used."""
+    import openai
+
+    for attempt in range(retries + 1):
+        backoff.wait(stop)
+        if stop.is_set():
+            raise InterruptedError("stopped")
+        try:
+            resp = client.audio.speech.create(
+                model=request["model"],
+                voice=request["voice"],
+                input=request["phrase"],
+                instructions=request["style"],
+                response_format="wav",
+            )
+            _save_resampled(resp.read(), out_path)
+            return attempt + 1
+        except Exception as exc:  # noqa: BLE001
+            if attempt == retries or not _is_retryable(exc):
+                exc.attempts = attempt + 1
+                raise
+            delay = backoff.delay(attempt, _retry_after(exc))
+            if isinstance(exc, openai.RateLimitError):
+                backoff.pause_all(delay)
+            else:
+                stop.wait(delay)
+    raise AssertionError("unreachable")
 
 
 def main() -> None:
@@ -89,6 +231,16 @@ def main() -> None:
     ap.add_argument("--data-dir", default=DATA_DIR)
     ap.add_argument("--dry-run", action="store_true")
     ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--concurrency", type=int, default=8,
+                    help="Maximum requests in flight at once.")
+    ap.add_argument("--retries", type=int, default=5,
+                    help="Retries per clip for rate limits / transient errors.")
+    ap.add_argument("--backoff", type=float, default=1.0,
+                    help="Initial retry delay in seconds (doubles per attempt).")
+    ap.add_argument("--max-backoff", type=float, default=60.0)
+    ap.add_argument("--timeout", type=float, default=60.0, help="Per-request timeout (s).")
+    ap.add_argument("--base-url", default=None,
+                    help="Alternative API base URL, e.g. a local stub server.")
     args = ap.parse_args()
 
     voices = [v.strip() for v in args.voices.split(",") if v.strip()]
@@ -113,37 +265,73 @@ def main() -> None:
         print("\n--dry-run: nothing generated.")
         return
 
-    if not settings.openai_api_key:
-        raise SystemExit("OPENAI_API_KEY is not set (see .env).")
+    api_key = settings.openai_api_key
+    if not api_key:
+        if not args.base_url:
+            raise SystemExit("OPENAI_API_KEY is not set (see .env).")
+        api_key = "stub"  # local test servers don't check it
 
     from openai import OpenAI
-    client = OpenAI(api_key=settings.openai_api_key)
+    # Retries are handled here (shared across workers), not by the client.
+    client = OpenAI(api_key=api_key, base_url=args.base_url, timeout=args.timeout,
+                    max_retries=0)
 
     for category in PHRASES:
         os.makedirs(os.path.join(args.data_dir, category), exist_ok=True)
+    manifest = Manifest(os.path.join(args.data_dir, MANIFEST_FILE))
 
-    done = 0
+    todo = []
+    skipped = 0
     for category, voice, phrase, style, fname in plan:
+        key = f"{category}/{fname}"
         out_path = os.path.join(args.data_dir, category, fname)
-        if os.path.exists(out_path):
-            done += 1
-            continue
-        try:
-            resp = client.audio.speech.create(
-                model=args.model,
-                voice=voice,
-                input=phrase,
-                instructions=style,
-                response_format="wav",
-            )
-            _save_resampled(resp.read(), out_path)
+        request = {"voice": voice, "phrase": phrase, "style": style, "model": args.model}
+        if manifest.is_done(key, request, out_path):
+            skipped += 1
+        elif key not in manifest.records and os.path.exists(out_path):
+            # Generated before the manifest existed: trust it and record it.
+            manifest.record(key, "done", request, attempts=0)
+            skipped += 1
+        else:
+            todo.append((key, request, out_path))
+    if skipped:
+        print(f"Resuming: {skipped} clips already done, {len(todo)} to generate")
+
+    backoff = _Backoff(args.backoff, args.max_backoff)
+    stop = threading.Event()
+    done = failed = 0
+    start = time.perf_counter()
+    pool = ThreadPoolExecutor(max_workers=max(1, args.concurrency))
+    futures = {pool.submit(_synthesize, client, request, out_path, args.retries, backoff, stop):
+               (key, request) for key, request, out_path in todo}
+    try:
+        for fut in as_completed(futures):
+            key, request = futures[fut]
+            try:
+                attempts = fut.result()
+            except InterruptedError:
+                continue
+            except Exception as exc:  # noqa: BLE001
+                failed += 1
+                manifest.record(key, "failed", request, attempts=getattr(exc, "attempts", 1),
+                                error=f"{type(exc).__name__}: {exc}")
+                print(f"  failed {request['voice']}/{request['phrase']!r}: {exc}")
+                continue
             done += 1
+            manifest.record(key, "done", request, attempts=attempts)
             if done % 10 == 0:
-                print(f"  {done}/{len(plan)}")
-        except Exception as exc:  # noqa: BLE001
-            print(f"  failed {voice}/{phrase!r}: {exc}")
+                rate = done / (time.perf_counter() - start)
+                print(f"  {skipped + done}/{len(plan)} ({rate:.1f} clips/s)")
+    except KeyboardInterrupt:
+        stop.set()
+        print("\nInterrupted; finishing in-flight requests. Re-run the same command to resume.")
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
 
-    print(f"Generated {done} clips into {args.data_dir}")
+    print(f"Generated {done} clips into {args.data_dir} "
+          f"({skipped} already done, {failed} failed)")
+    if failed:
+        print(f"Failed items are listed in {manifest.path}; re-run to retry them.")
 
 
 if __name__ == "__main__":
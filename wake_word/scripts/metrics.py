@@ -0,0 +1,166 @@
+"""Exact threshold metrics for the wake word model, shared by train.py,
+evaluate.py and sweep.py.
+
+A window triggers when its probability is >= the threshold, so the recall /
+false-alarm / hard-negative rates only change at the scores themselves.
+:func:`rate_curve` sorts each class's scores once and reads every rate at every
+distinct score off ``searchsorted`` - O(N log N) for the whole curve instead of
+a pass over the data per candidate threshold - and :func:`choose_threshold`
+places the threshold exactly at the hard-negative constraint boundary rather
+than at the nearest point of a fixed grid.
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import os
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from wake_word import config
+
+# Never auto-select a threshold above this, even if that lets Alexa through:
+# past it the model barely fires for real wake words either.
+MAX_AUTO_THRESHOLD = 0.9
+
+# Curve points kept in the model .json; the full curve goes to the report file.
+METADATA_CURVE_POINTS = 64
+
+
+@dataclass
+class RateCurve:
+    """Trigger rates at every distinct score (``thresholds``, ascending):
+    ``recall[i]`` is the fraction of positives scoring >= ``thresholds[i]``,
+    and likewise for negatives (false alarms) and hard negatives ("Alexa")."""
+
+    thresholds: np.ndarray
+    recall: np.ndarray
+    false_alarm_rate: np.ndarray
+    hard_negative_rate: np.ndarray
+    pos: np.ndarray = field(repr=False)
+    neg: np.ndarray = field(repr=False)
+    hard: np.ndarray = field(repr=False)
+
+    def at(self, threshold: float) -> dict:
+        """Exact rates at any threshold (not just the curve's points)."""
+        return {
+            "recall": _rate_at(self.pos, threshold),
+            "false_alarm_rate": _rate_at(self.neg, threshold),
+            "hard_negative_rate": _rate_at(self.hard, threshold),
+        }
+
+    def to_metadata(self, threshold: float, max_points: int = METADATA_CURVE_POINTS) -> dict:
+        """The operating point plus at most ``max_points`` of the curve, evenly
+        spaced over its scores (for the model .json; see :meth:`to_report`)."""
+        idx = np.unique(np.linspace(0, len(self.thresholds) - 1,
+                                    min(max_points, len(self.thresholds))).round().astype(int))
+        return {
+            "operating_point": {"threshold": threshold,
+                                **{k: round(v, 5) for k, v in self.at(threshold).items()}},
+            **self._lists(idx),
+        }
+
+    def to_report(self) -> dict:
+        """The full curve as JSON-friendly lists (see :func:`write_report`)."""
+        return self._lists(slice(None))
+
+    def _lists(self, idx) -> dict:
+        return {
+            "num_positive": len(self.pos),
+            "num_negative": len(self.neg),
+            "num_hard_negative": len(self.hard),
+            "thresholds": [round(float(t), 6) for t in self.thresholds[idx]],
+            "recall": [round(float(r), 5) for r in self.recall[idx]],
+            "false_alarm_rate": [round(float(r), 5) for r in self.false_alarm_rate[idx]],
+            "hard_negative_rate": [round(float(r), 5) for r in self.hard_negative_rate[idx]],
+        }
+
+
+def report_path(meta_path: str) -> str:
+    """Where the full curves for a model .json are kept (``aurora.roc.json``)."""
+    return os.path.splitext(meta_path)[0] + ".roc.json"
+
+
+def write_report(meta_path: str, curves: dict[str, RateCurve]) -> str:
+    """Store full curves under their names in the model's report file, keeping
+    curves written earlier under other names. Returns the report path."""
+    path = report_path(meta_path)
+    report = {}
+    if os.path.exists(path):
+        with open(path, "r") as f:
+            report = json.load(f)
+    report.update((name, curve.to_report()) for name, curve in curves.items())
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+    return path
+
+
+def _rate_at(sorted_scores: np.ndarray, threshold) -> np.ndarray | float:
+    """Fraction of ``sorted_scores`` >= ``threshold`` (scalar or array)."""
+    n = len(sorted_scores)
+    if n == 0:
+        return 0.0 if np.isscalar(threshold) else np.zeros(len(threshold))
+    above = n - np.searchsorted(sorted_scores, threshold, side="left")
+    return float(above) / n if np.isscalar(threshold) else above / n
+
+
+def rate_curve(probs: np.ndarray, labels: np.ndarray, categories: np.ndarray) -> RateCurve:
+    """Recall / false-alarm / hard-negative rates at every distinct score."""
+    probs = np.asarray(probs, dtype=np.float64).reshape(-1)
+    labels = np.asarray(labels)
+    pos = np.sort(probs[labels == 1])
+    neg = np.sort(probs[labels == 0])
+    hard = np.sort(probs[(labels == 0) & (np.asarray(categories) == "hard_negatives")])
+    thresholds = np.unique(probs)
+    return RateCurve(thresholds, _rate_at(pos, thresholds), _rate_at(neg, thresholds),
+                     _rate_at(hard, thresholds), pos, neg, hard)
+
+
+def _short_decimal(lo: float, hi: float) -> float:
+    """The value with the fewest decimals in ``(lo, hi]``, nearest their midpoint."""
+    mid = (lo + hi) / 2.0
+    for digits in range(1, 10):
+        r = round(mid, digits)
+        if lo < r <= hi:
+            return r
+    return mid
+
+
+def choose_threshold(
+    curve: RateCurve,
+    max_hard_neg_rate: float,
+    floor: float = config.MIN_AUTO_THRESHOLD,
+    ceiling: float = MAX_AUTO_THRESHOLD,
+) -> float:
+    """Most permissive threshold that still rejects the hard negatives ("Alexa").
+
+    The requirements are asymmetric: random speech triggering the wake word is
+    acceptable (the realtime session just closes), but the household's Alexa
+    devices must NOT set it off. So the hard-negative trigger rate is the
+    binding constraint and recall is otherwise maximized: the *lowest*
+    threshold whose hard-negative rate stays <= ``max_hard_neg_rate``.
+
+    With ``k`` hard negatives allowed to trigger, every threshold above the
+    (k+1)-th highest hard-negative score and up to the next score above it
+    gives the same (maximal) recall; the threshold is taken from the middle of
+    that interval, as a short decimal, for margin on unseen audio. The result
+    is then clamped to [floor, ceiling]: the floor keeps a safety margin
+    against garbage / near-silence triggers.
+    """
+    if len(curve.pos) == 0:
+        return config.DEFAULT_THRESHOLD
+    hard = curve.hard
+    allowed = int(math.floor(max_hard_neg_rate * len(hard) + 1e-9))
+    if allowed >= len(hard):
+        best = floor   # unconstrained: maximize recall
+    else:
+        boundary = float(hard[len(hard) - allowed - 1])   # must be rejected
+        above = np.searchsorted(curve.thresholds, boundary, side="right")
+        if boundary >= 1.0:
+            best = ceiling   # cannot reject Alexa; be as strict as allowed
+        else:
+            nxt = float(curve.thresholds[above]) if above < len(curve.thresholds) else 1.0
+            best = _short_decimal(boundary, nxt)
+    return float(min(max(best, floor), ceiling))
@@ -13,20 +13,29 @@ Short clips become a single centered window; long files are sliced into
 overlapping windows. Optional file-name speaker tags ("kate_001.wav") are used
 to group train/val splits so we measure cross-speaker generalization.
 
-This module exposes :func:`build_dataset` for train.py / evaluate.py and can also
-be run directly to cache a dataset to .npz.
+This module exposes :func:`build_dataset` / :func:`load_dataset` for train.py /
+evaluate.py and can also be run directly to write a dataset directory that they
+can reuse with ``--dataset``.
 """
 
 from __future__ import annotations
 
 import argparse
+import atexit
 import glob
+import itertools
+import multiprocessing
 import os
-from dataclasses import dataclass
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
 
 import _bootstrap  # noqa: F401  (adds repo root to sys.path)
 import numpy as np
 
+from feature_cache import FeatureCache, file_digest
+from resample import StreamResampler
 from wake_word import config, features
 
 try:
@@ -41,37 +50,45 @@ HARD_NEG_DIR = "hard_negatives"
 NEG_DIR = "negatives"
 BACKGROUND_DIR = "background"
 
-# label 1 = wake word, label 0 = everything else.
-CATEGORY_LABELS = {POSITIVE_DIR: 1, HARD_NEG_DIR: 0, NEG_DIR: 0}
+# Content-addressed per-file feature cache (see feature_cache.py).
+CACHE_DIR = os.path.join(DATA_DIR, ".feature_cache")
+# Decoded background audio for augmentation (see load_noise_bank).
+NOISE_BANK_DIR = os.path.join(DATA_DIR, ".noise_bank")
+
+# Frames read from disk per block when streaming a file (~2.7 s at 48 kHz).
+_READ_BLOCK = 1 << 17
+# Windows featurized per batch while streaming a file.
+_FEATURE_CHUNK = 256
 
+# On-disk dataset layout (see build_dataset / load_dataset).
+_FEATURES_FILE = "features.npy"
+_SIDECAR_FILE = "labels.npz"
 
-@dataclass
-class Sample:
-    features: np.ndarray   # (1, n_mels, NUM_FRAMES)
-    label: int
-    group: str             # speaker / source tag for grouped splits
-    category: str          # subdir name (for per-category metrics)
+# label 1 = wake word, label 0 = everything else.
+CATEGORY_LABELS = {POSITIVE_DIR: 1, HARD_NEG_DIR: 0, NEG_DIR: 0}
 
 
-def _resample_linear(x: np.ndarray, src_sr: int, dst_sr: int) -> np.ndarray:
-    if src_sr == dst_sr:
-        return x
-    n_dst = int(round(len(x) * dst_sr / src_sr))
-    if n_dst <= 1:
-        return np.zeros(0, dtype=np.float32)
-    src_t = np.linspace(0.0, 1.0, num=len(x), endpoint=False)
-    dst_t = np.linspace(0.0, 1.0, num=n_dst, endpoint=False)
-    return np.interp(dst_t, src_t, x).astype(np.float32)
+def stream_wav_mono(path: str, block: int = _READ_BLOCK):
+    """Yield any wav as float32 mono blocks at config.SAMPLE_RATE, reading and
+    resampling ``block`` frames at a time, so memory doesn't grow with the
+    file's length. Concatenated, the blocks are :func:`load_wav_mono`."""
+    if sf is None:
+        raise RuntimeError("soundfile is required: pip install -r wake_word/requirements-train.txt")
+    with sf.SoundFile(path) as f:
+        stream = StreamResampler(f.samplerate, config.SAMPLE_RATE)
+        for data in f.blocks(block, dtype="float32", always_2d=True):
+            out = stream.process(data.mean(axis=1) if data.shape[1] > 1 else data[:, 0])
+            if len(out):
+                yield out
+        tail = stream.flush()
+        if len(tail):
+            yield tail
 
 
 def load_wav_mono(path: str) -> np.ndarray:
     """Load any wav as float32 mono at config.SAMPLE_RATE in roughly [-1, 1]."""
-    if sf is None:
-        raise RuntimeError("soundfile is required: pip install -r wake_word/requirements-train.txt")
-    data, sr = sf.read(path, dtype="float32", always_2d=False)
-    if data.ndim > 1:
-        data = data.mean(axis=1)
-    return _resample_linear(data, sr, config.SAMPLE_RATE)
+    blocks = list(stream_wav_mono(path))
+    return np.concatenate(blocks) if blocks else np.zeros(0, dtype=np.float32)
 
 
 def _speaker_group(path: str, category: str) -> str:
@@ -82,15 +99,63 @@ def _speaker_group(path: str, category: str) -> str:
     return f"{category}:{name}"
 
 
-def iter_windows(wave: np.ndarray, hop: int | None = None):
-    """Yield fixed-length windows. Short clips -> one centered window."""
+def _num_samples(path: str) -> int:
+    """Samples :func:`load_wav_mono` will return for a file, from its header alone."""
+    if sf is None:
+        raise RuntimeError("soundfile is required: pip install -r wake_word/requirements-train.txt")
+    info = sf.info(path)
+    n = info.frames
+    if info.samplerate != config.SAMPLE_RATE:
+        n = int(round(n * config.SAMPLE_RATE / info.samplerate))
+        if n <= 1:
+            n = 0
+    return n
+
+
+def _num_windows(path: str) -> int:
+    """Windows :func:`iter_windows` will yield for a file, from its header alone."""
+    n = _num_samples(path)
+    if n == 0:
+        return 0
+    w = config.WINDOW_SAMPLES
+    return 1 if n <= w else 1 + (n - w) // (w // 2)
+
+
+def iter_windows(wave, hop: int | None = None):
+    """Yield fixed-length windows. Short clips -> one centered window.
+
+    ``wave`` is a waveform or an iterable of blocks (:func:`stream_wav_mono`);
+    a stream only ever holds about one window of audio.
+    """
     w = config.WINDOW_SAMPLES
-    if len(wave) <= w:
-        yield wave
-        return
     hop = hop or w // 2
-    for start in range(0, len(wave) - w + 1, hop):
-        yield wave[start : start + w]
+    if isinstance(wave, np.ndarray):
+        if len(wave) <= w:
+            yield wave
+            return
+        for start in range(0, len(wave) - w + 1, hop):
+            yield wave[start : start + w]
+        return
+
+    buf = np.zeros(0, dtype=np.float32)
+    start = 0  # of the next window, in buf
+    emitted = False
+    for block in wave:
+        drop = min(start, len(buf))
+        buf = np.concatenate([buf[drop:], block])
+        start -= drop
+        while start + w <= len(buf):
+            yield buf[start : start + w]
+            start += hop
+            emitted = True
+    if not emitted:
+        yield buf
+
+
+def _batched(iterable, n: int):
+    it = iter(iterable)
+    while batch := list(itertools.islice(it, n)):
+        yield batch
 
 
 # --- augmentation --------------------------------------------------------
@@ -130,60 +195,350 @@ def _augment(wave: np.ndarray, backgrounds: list[np.ndarray], rng: np.random.Gen
     return x
 
 
-def _load_backgrounds() -> list[np.ndarray]:
-    bg_dir = os.path.join(DATA_DIR, BACKGROUND_DIR)
-    out = []
-    for path in sorted(glob.glob(os.path.join(bg_dir, "*.wav"))):
-        try:
-            out.append(load_wav_mono(path))
-        except Exception:
-            pass
+class NoiseBank:
+    """Background clips stored end to end in one float32 array, normally a
+    read-only memory map (see :func:`load_noise_bank`), so hours of room tone
+    cost page cache rather than process memory and are shared by every worker.
+
+    ``bank[i]`` is clip ``i``, so :func:`_augment` can use it like a list of
+    clips; :meth:`windows` draws random noise windows a whole batch at a time
+    (see :func:`augment_batch`) from clips at least a window long.
+    """
+
+    def __init__(self, audio: np.ndarray, lengths: np.ndarray, path: str | None = None) -> None:
+        self.audio = audio
+        self.lengths = np.asarray(lengths, dtype=np.int64)
+        self.starts = np.concatenate([[0], np.cumsum(self.lengths)[:-1]]).astype(np.int64)
+        self.usable = np.nonzero(self.lengths >= config.WINDOW_SAMPLES)[0]
+        self.path = path
+
+    @classmethod
+    def open(cls, path: str) -> "NoiseBank":
+        """Memory-map a bank written by :func:`load_noise_bank`."""
+        lengths = np.load(path + ".lengths.npy")
+        return cls(np.load(path, mmap_mode="r"), lengths, path)
+
+    def __getstate__(self):
+        # Re-open the memory map in DataLoader / pool workers instead of pickling the audio.
+        if self.path is not None:
+            return {"path": self.path}
+        return self.__dict__
+
+    def __setstate__(self, state) -> None:
+        if set(state) == {"path"}:
+            state = NoiseBank.open(state["path"]).__dict__
+        self.__dict__.update(state)
+
+    def __len__(self) -> int:
+        return len(self.lengths)
+
+    def __getitem__(self, i: int) -> np.ndarray:
+        return self.audio[self.starts[i] : self.starts[i] + self.lengths[i]]
+
+    def windows(self, n: int, rng: np.random.Generator) -> np.ndarray:
+        """``n`` random (clip, offset) noise windows, (n, WINDOW_SAMPLES)."""
+        w = config.WINDOW_SAMPLES
+        clip = self.usable[rng.integers(len(self.usable), size=n)]
+        offset = self.starts[clip] + rng.integers(0, self.lengths[clip] - w + 1)
+        return np.lib.stride_tricks.sliding_window_view(self.audio, w)[offset]
+
+
+def load_noise_bank(bank_dir: str = NOISE_BANK_DIR, digest: str | None = None) -> NoiseBank:
+    """The background clips as a memory-mapped :class:`NoiseBank`.
+
+    Built on first use by streaming each file block by block into
+    ``<bank_dir>/<key>.npy``, and reused until the background set (content
+    hash, or ``digest`` if the caller already has it) or the feature config
+    changes; stale banks are removed.
+    """
+    paths = sorted(glob.glob(os.path.join(DATA_DIR, BACKGROUND_DIR, "*.wav")))
+    if digest is None:
+        digest = _background_digest()
+    key = FeatureCache(bank_dir).key("noise_bank", digest)
+    path = os.path.join(bank_dir, key + ".npy")
+    if not os.path.exists(path):
+        os.makedirs(bank_dir, exist_ok=True)
+        for stale in glob.glob(os.path.join(bank_dir, "*.npy")):
+            os.remove(stale)
+        sizes = []
+        for p in paths:
+            try:
+                sizes.append(_num_samples(p))
+            except Exception:  # noqa: BLE001 - unreadable: left out, as before
+                sizes.append(0)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        audio = np.lib.format.open_memmap(tmp, mode="w+", dtype=np.float32, shape=(sum(sizes),))
+        lengths, pos = [], 0
+        for p, size in zip(paths, sizes):
+            start = pos
+            try:
+                for block in stream_wav_mono(p):
+                    block = block[:size - (pos - start)]
+                    audio[pos:pos + len(block)] = block
+                    pos += len(block)
+            except Exception:  # noqa: BLE001
+                pos = start
+                continue
+            lengths.append(pos - start)
+        audio.flush()
+        del audio
+        np.save(path + ".lengths.npy", np.array(lengths, dtype=np.int64))
+        os.replace(tmp, path)
+    return NoiseBank.open(path)
+
+
+def augment_batch(x: np.ndarray, bank: NoiseBank | None, rng: np.random.Generator) -> np.ndarray:
+    """:func:`_augment` vectorized over a (B, WINDOW_SAMPLES) batch of windows:
+    the same time shift, gain and background-noise / SNR distributions."""
+    b, w = x.shape
+
+    # Random time shift with zero fill: out[i] = x[i - shift]. Rows are
+    # copied out of a strided view of the zero-padded batch.
+    m = w // 8
+    shift = rng.integers(-m, m + 1, size=b)
+    padded = np.pad(x.astype(np.float32, copy=False), ((0, 0), (m, m)))
+    view = np.lib.stride_tricks.sliding_window_view(padded, w, axis=1)
+    out = view[np.arange(b), m - shift]
+
+    # Random gain.
+    out *= rng.uniform(0.5, 1.4, size=(b, 1)).astype(np.float32)
+
+    # Mix in background noise at a random SNR.
+    if bank is not None and len(bank.usable):
+        mix = np.nonzero(rng.random(b) < 0.7)[0]
+        if len(mix):
+            noise = bank.windows(len(mix), rng)
+            sig_p = np.mean(out[mix] ** 2, axis=1) + 1e-9
+            noise_p = np.mean(noise ** 2, axis=1) + 1e-9
+            snr_db = rng.uniform(0.0, 20.0, size=len(mix))
+            scale = np.sqrt(sig_p / (noise_p * (10 ** (snr_db / 10.0))))
+            out[mix] += (scale[:, None] * noise).astype(np.float32)
+
+    np.clip(out, -1.0, 1.0, out=out)
     return out
 
 
+# --- per-file work (runs in pool workers) ------------------------------------
+# Background clips for augmentation, opened once per worker by _init_worker.
+_backgrounds: NoiseBank | list = []
+
+
+def _init_worker(bank_path: str | None) -> None:
+    global _backgrounds
+    _backgrounds = NoiseBank.open(bank_path) if bank_path else []
+
+
+def _background_digest() -> str:
+    """Content hash of the background set (part of augmented cache keys)."""
+    paths = sorted(glob.glob(os.path.join(DATA_DIR, BACKGROUND_DIR, "*.wav")))
+    return ",".join(file_digest(p) for p in paths)
+
+
+def _featurize_file(task: tuple) -> tuple[np.ndarray | None, str | None, tuple[int, int, float]]:
+    """All windows (plus augmented copies) of one file as a single
+    (n, 1, n_mels, frames) array, or None (+ message) if it was skipped.
+
+    The clean windows and each augmentation index are cached separately, so
+    raising ``augment_factor`` only computes the new copies. Augmentation is
+    seeded per (seed, file content, window, index): reproducible whatever the
+    worker count, file order or cache state. The last element is cache stats:
+    (hits, lookups, seconds saved).
+
+    The file is streamed once, ``_FEATURE_CHUNK`` windows at a time, for all
+    the copies that weren't cached, so long recordings are never fully decoded
+    in memory.
+    """
+    path, augment_factor, seed, standardize, cache_dir, bg_digest, waveforms = task
+    if waveforms:
+        parts = []
+        try:
+            for windows in _batched(iter_windows(stream_wav_mono(path)), _FEATURE_CHUNK):
+                if len(windows[0]) == 0:   # empty file
+                    return None, None, (0, 0, 0.0)
+                parts.append(np.stack([features.fit_window(w) for w in windows]))
+        except Exception as exc:  # noqa: BLE001
+            return None, f"skipped {path}: {exc}", (0, 0, 0.0)
+        return np.concatenate(parts), None, (0, 0, 0.0)
+    try:
+        digest = file_digest(path)
+    except OSError as exc:
+        return None, f"skipped {path}: {exc}", (0, 0, 0.0)
+    cache = FeatureCache(cache_dir) if cache_dir else None
+    lookups = augment_factor + 1
+    hits, saved = 0, 0.0
+    done: dict[int, np.ndarray] = {}
+    keys: dict[int, str | None] = {}
+    for index in range(-1, augment_factor):   # -1 = the clean windows
+        if index < 0:
+            key_parts = (digest, standardize, "clean")
+        else:
+            key_parts = (digest, standardize, "augment", seed, index, bg_digest)
+        key = cache.key(*key_parts) if cache else None
+        cached = cache.load(key) if cache else None
+        if cached is not None:
+            hits += 1
+            saved += cached[1]
+            done[index] = cached[0]
+        else:
+            keys[index] = key
+
+    if keys:
+        start = time.perf_counter()
+        chunks: dict[int, list[np.ndarray]] = {index: [] for index in keys}
+        row = 0
+        try:
+            for windows in _batched(iter_windows(stream_wav_mono(path)), _FEATURE_CHUNK):
+                if len(windows[0]) == 0:   # empty file
+                    return None, None, (hits, lookups, saved)
+                for index in keys:
+                    batch = windows if index < 0 else [
+                        _augment(window, _backgrounds,
+                                 np.random.default_rng([seed, int(digest[:16], 16), row + w, index]))
+                        for w, window in enumerate(windows)
+                    ]
+                    chunks[index].append(features.waveforms_to_model_input(batch, standardize))
+                row += len(windows)
+        except Exception as exc:  # noqa: BLE001
+            return None, f"skipped {path}: {exc}", (hits, lookups, saved)
+        seconds = (time.perf_counter() - start) / len(keys)
+        for index, key in keys.items():
+            done[index] = np.concatenate(chunks.pop(index))  # (n, 1, n_mels, frames)
+            if cache:
+                cache.store(key, done[index], seconds)
+
+    # Window-major order: each window followed by its augmented copies.
+    out = np.stack([done[index] for index in range(-1, augment_factor)], axis=1)
+    return out.reshape(-1, *out.shape[2:]), None, (hits, lookups, saved)
+
+
 def build_dataset(
     data_dir: str = DATA_DIR,
     augment: bool = True,
     augment_factor: int = 4,
     seed: int = 0,
-) -> list[Sample]:
-    """Build a list of :class:`Sample` from the data directory."""
-    rng = np.random.default_rng(seed)
-    backgrounds = _load_backgrounds() if augment else []
-    samples: list[Sample] = []
-
-    for category, label in CATEGORY_LABELS.items():
-        cat_dir = os.path.join(data_dir, category)
-        paths = sorted(glob.glob(os.path.join(cat_dir, "*.wav")))
-        for path in paths:
+    standardize: bool = True,
+    workers: int | None = None,
+    cache_dir: str | None = CACHE_DIR,
+    out_dir: str | None = None,
+    waveforms: bool = False,
+):
+    """Build the on-disk dataset from the data directory and open it.
+
+    Files are sharded across ``workers`` processes (default: all cores; 1 runs
+    in-process) and each file's windows come back as one array, so the result
+    is identical for any worker count. Per-file features are read from / added
+    to the content-addressed cache in ``cache_dir`` (None disables it; see
+    feature_cache.py).
+
+    ``standardize=False`` keeps the raw log-mel (see features.waveform_to_logmel);
+    features.standardize_windows turns those into the standard CNN input.
+
+    The features go straight into a preallocated ``features.npy`` in
+    ``out_dir`` (default: a temporary directory removed at exit) with labels,
+    groups and categories in a ``labels.npz`` sidecar, so the full tensor is
+    never held in memory. Returns ``(X, y, groups, categories)`` as
+    :func:`load_dataset`: X (N, 1, n_mels, frames) float32 memory map, y (N,)
+    float32 labels, and per-window group / category string arrays.
+
+    ``waveforms=True`` stores the clean windows themselves, (N, WINDOW_SAMPLES)
+    float32, for augmentation and featurization at training time
+    (train.py --online-augment); ``augment`` and the cache are then unused.
+    """
+    if waveforms:
+        augment, cache_dir = False, None
+    factor = augment_factor if augment else 0
+    bg_digest = _background_digest() if factor else ""
+    # Decoded once here; workers memory-map it.
+    bank_path = load_noise_bank(digest=bg_digest).path if factor else None
+    tasks, task_categories, capacity = [], [], 0
+    for category in CATEGORY_LABELS:
+        for path in sorted(glob.glob(os.path.join(data_dir, category, "*.wav"))):
             try:
-                wave = load_wav_mono(path)
+                capacity += _num_windows(path) * (factor + 1)
             except Exception as exc:  # noqa: BLE001
                 print(f"  skipped {path}: {exc}")
                 continue
-            if len(wave) == 0:
+            tasks.append((path, factor, seed, standardize, cache_dir, bg_digest, waveforms))
+            task_categories.append(category)
+
+    if out_dir is None:
+        out_dir = tempfile.mkdtemp(prefix="aurora-dataset-")
+        atexit.register(shutil.rmtree, out_dir, True)
+    os.makedirs(out_dir, exist_ok=True)
+    # Preallocated on disk; each file's windows are written as they arrive.
+    row_shape = (config.WINDOW_SAMPLES,) if waveforms else (1, config.N_MELS, config.NUM_FRAMES)
+    X = np.lib.format.open_memmap(
+        os.path.join(out_dir, _FEATURES_FILE), mode="w+", dtype=np.float32,
+        shape=(capacity,) + row_shape,
+    )
+
+    workers = min(workers or os.cpu_count() or 1, max(1, len(tasks)))
+    if workers <= 1:
+        _init_worker(bank_path)
+        results = map(_featurize_file, tasks)
+        pool = None
+    else:
+        # spawn: callers may already hold onnxruntime / torch threads.
+        pool = ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn"),
+                                   initializer=_init_worker, initargs=(bank_path,))
+        results = pool.map(_featurize_file, tasks, chunksize=max(1, len(tasks) // (workers * 8)))
+
+    rows, counts, labels, groups, categories = 0, [], [], [], []
+    hits, lookups, saved = 0, 0, 0.0
+    try:
+        for task, category, (feats, message, stats) in zip(tasks, task_categories, results):
+            hits, lookups, saved = hits + stats[0], lookups + stats[1], saved + stats[2]
+            if message:
+                print(f"  {message}")
+            if feats is None:
                 continue
-            group = _speaker_group(path, category)
+            if rows + len(feats) > capacity:
+                raise RuntimeError(f"{task[0]}: more windows than its header implies")
+            X[rows:rows + len(feats)] = feats
+            rows += len(feats)
+            counts.append(len(feats))
+            labels.append(CATEGORY_LABELS[category])
+            groups.append(_speaker_group(task[0], category))
+            categories.append(category)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    X.flush()
+    del X
+    if cache_dir and lookups:
+        print(f"  feature cache: {hits}/{lookups} hits ({hits / lookups:.0%}), "
+              f"~{saved:.1f}s of feature extraction saved")
+
+    # Rows past ``rows`` (files that failed to load) are ignored by load_dataset.
+    np.savez(
+        os.path.join(out_dir, _SIDECAR_FILE),
+        rows=np.int64(rows),
+        augment_factor=np.int64(factor),
+        y=np.repeat(np.array(labels, dtype=np.float32), counts),
+        groups=np.repeat(np.array(groups, dtype=str), counts),
+        categories=np.repeat(np.array(categories, dtype=str), counts),
+    )
+    return load_dataset(out_dir)
 
-            for window in iter_windows(wave):
-                feat = features.waveform_to_model_input(window)[0]  # (1, n_mels, frames)
-                samples.append(Sample(feat, label, group, category))
 
-                if augment:
-                    for _ in range(augment_factor):
-                        aug = _augment(window, backgrounds, rng)
-                        feat_a = features.waveform_to_model_input(aug)[0]
-                        samples.append(Sample(feat_a, label, group, category))
+def load_dataset(path: str):
+    """Open a dataset directory written by :func:`build_dataset`.
 
-    return samples
+    Returns ``(X, y, groups, categories)`` with X a read-only memory map, so
+    windows are only read from disk when indexed.
+    """
+    with np.load(os.path.join(path, _SIDECAR_FILE)) as side:
+        rows = int(side["rows"])
+        y, groups, categories = side["y"], side["groups"], side["categories"]
+    X = np.load(os.path.join(path, _FEATURES_FILE), mmap_mode="r")
+    return X[:rows], y, groups, categories
 
 
-def to_arrays(samples: list[Sample]):
-    X = np.stack([s.features for s in samples]).astype(np.float32)  # (N,1,n_mels,frames)
-    y = np.array([s.label for s in samples], dtype=np.float32)
-    groups = np.array([s.group for s in samples])
-    categories = np.array([s.category for s in samples])
-    return X, y, groups, categories
+def dataset_augment_factor(path: str) -> int | None:
+    """Augmented copies after each clean window in a dataset directory (rows
+    are window-major), or None if it was written before this was recorded."""
+    with np.load(os.path.join(path, _SIDECAR_FILE)) as side:
+        return int(side["augment_factor"]) if "augment_factor" in side.files else None
 
 
 def main() -> None:
@@ -191,18 +546,20 @@ def main() -> None:
     ap.add_argument("--data-dir", default=DATA_DIR)
     ap.add_argument("--no-augment", action="store_true")
     ap.add_argument("--augment-factor", type=int, default=4)
-    ap.add_argument("--out", default=os.path.join(DATA_DIR, "dataset.npz"))
+    ap.add_argument("--workers", type=int, default=None, help="Processes (default: all cores).")
+    ap.add_argument("--no-cache", action="store_true", help="Don't read or write the feature cache.")
+    ap.add_argument("--out", default=os.path.join(DATA_DIR, "dataset"),
+                    help="Dataset directory (features.npy + labels.npz).")
     args = ap.parse_args()
 
-    samples = build_dataset(
-        args.data_dir, augment=not args.no_augment, augment_factor=args.augment_factor
+    _X, y, _groups, _categories = build_dataset(
+        args.data_dir, augment=not args.no_augment, augment_factor=args.augment_factor,
+        workers=args.workers, cache_dir=None if args.no_cache else CACHE_DIR, out_dir=args.out,
     )
-    if not samples:
+    if not len(y):
         print("No samples found. Add wavs under wake_word/data/ (see README).")
         return
-    X, y, groups, categories = to_arrays(samples)
-    np.savez_compressed(args.out, X=X, y=y, groups=groups, categories=categories)
-    print(f"Saved {len(samples)} samples ({int(y.sum())} positive) -> {args.out}")
+    print(f"Saved {len(y)} samples ({int(y.sum())} positive) -> {args.out}")
 
 
 if __name__ == "__main__":
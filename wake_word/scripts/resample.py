@@ -0,0 +1,198 @@
+"""Polyphase windowed-sinc resampling in pure numpy.
+
+Recordings arrive at 44.1 / 48 / 16 kHz and are converted to
+``config.SAMPLE_RATE`` on load. Linear interpolation (``np.interp``) has almost
+no stop-band, so downsampling folds everything above 12 kHz back into the band
+the mel frontend sees. This module resamples by the exact rational ratio
+``up / down`` with a Kaiser-windowed sinc low-pass at 0.9 x the lower Nyquist.
+
+The filter is split into ``up`` phases, and each phase is a dot product over a
+strided sliding window of the input, so the work per output sample is
+``taps_per_phase`` multiply-adds. The zero-stuffed signal is never built.
+Filters are cached per reduced ratio. Long inputs are processed in blocks of
+output samples, so extra memory stays flat regardless of file length, and
+:class:`StreamResampler` does the same across blocks read from disk.
+
+Output length and time alignment match the old linear path: ``round(n * dst /
+src)`` samples, with output sample ``k`` at input time ``k * src / dst``.
+
+Run ``python wake_word/scripts/resample.py`` for a speed and aliasing benchmark
+against ``np.interp``.
+"""
+
+from __future__ import annotations
+
+import math
+import time
+from functools import lru_cache
+
+import numpy as np
+
+# Sinc zero crossings kept on each side of the centre, and the Kaiser beta:
+# ~70 dB of alias rejection with a flat passband to ~10 kHz at 24 kHz out,
+# well past the mel frontend's FMAX.
+_ZERO_CROSSINGS = 12
+_KAISER_BETA = 7.0
+# Cutoff as a fraction of the lower of the two Nyquist frequencies.
+_ROLLOFF = 0.9
+# Blocking: when a phase's strided windows overlap (down < taps) they are
+# copied into a contiguous (rows, taps) buffer so the dot product runs in BLAS,
+# several times faster than matmul on the overlapping view. Rows per block are
+# capped so the buffer and the input span a block reads stay cache-sized.
+_BLOCK_ROWS = 4096
+_BLOCK_SPAN = 1 << 17
+
+
+@lru_cache(maxsize=16)
+def _polyphase(up: int, down: int) -> tuple[np.ndarray, np.ndarray]:
+    """Per-phase taps ``(up, L)`` and first-input offsets ``(up,)`` for ``up/down``.
+
+    Output ``q * up + r`` is ``taps[r] @ x[q * down + offsets[r] : ... + L]``.
+    """
+    cutoff = _ROLLOFF / max(up, down)  # cycles per upsampled sample, x2
+    half = int(math.ceil(_ZERO_CROSSINGS / cutoff))  # half-length, upsampled samples
+    r = np.arange(up)
+    # First input sample j with |r*down - j*up| <= half, per phase.
+    offsets = -((half - r * down) // up)
+    n_taps = int((2 * half) // up + 1)
+    j = offsets[:, None] + np.arange(n_taps)[None, :]
+    i = r[:, None] * down - j * up  # filter index relative to the centre
+    inside = np.abs(i) <= half
+    window = np.kaiser(2 * half + 1, _KAISER_BETA)[np.clip(i + half, 0, 2 * half)]
+    taps = np.where(inside, np.sinc(cutoff * i) * window, 0.0)
+    taps /= taps.sum(axis=1, keepdims=True)  # unity DC gain on every phase
+    return taps.astype(np.float32), offsets
+
+
+def _apply(xp: np.ndarray, start: int, n_q: int, down: int, taps: np.ndarray,
+           offsets: np.ndarray) -> np.ndarray:
+    """Output groups ``0..n_q-1``: group ``k`` phase ``r`` reads ``xp`` from
+    ``start + k * down + offsets[r]``. Returns ``(n_q * up,)`` samples."""
+    up, n_taps = taps.shape
+    frames = np.lib.stride_tricks.sliding_window_view(xp, n_taps)
+    block = max(1, min(_BLOCK_ROWS, _BLOCK_SPAN // down, n_q))
+    out = np.empty((n_q, up), dtype=np.float32)
+    buf = np.empty((block, n_taps), dtype=np.float32)
+    for q0 in range(0, n_q, block):
+        rows = min(block, n_q - q0)
+        for r in range(up):
+            first = start + q0 * down + offsets[r]
+            view = frames[first:first + (rows - 1) * down + 1:down]
+            if down < n_taps:  # overlapping rows: numpy won't pass them to BLAS
+                np.copyto(buf[:rows], view)
+                view = buf[:rows]
+            out[q0:q0 + rows, r] = view @ taps[r]
+    return out.reshape(-1)
+
+
+class StreamResampler:
+    """Incremental :func:`resample` for audio read block by block.
+
+    Feed blocks to :meth:`process` and finish with :meth:`flush`. The
+    concatenated outputs equal ``resample`` of the concatenated input, and only
+    about one filter span of input is held between calls.
+    """
+
+    def __init__(self, src_sr: int, dst_sr: int) -> None:
+        self.src_sr, self.dst_sr = int(src_sr), int(dst_sr)
+        g = math.gcd(self.src_sr, self.dst_sr)
+        self.up, self.down = self.dst_sr // g, self.src_sr // g
+        self._n_in = 0
+        self._n_out = 0
+        if self.src_sr == self.dst_sr:
+            return
+        self._taps, self._offsets = _polyphase(self.up, self.down)
+        self._q = 0  # next output group (of `up` samples)
+        self._base = int(self._offsets.min())  # input index of _pending[0]
+        self._pending = np.zeros(-self._base, dtype=np.float32)  # implicit left zeros
+
+    def process(self, block: np.ndarray) -> np.ndarray:
+        """Resampled output that ``block`` completes (possibly empty)."""
+        block = np.asarray(block, dtype=np.float32)
+        self._n_in += len(block)
+        if self.src_sr == self.dst_sr:
+            self._n_out += len(block)
+            return block
+        self._pending = np.concatenate([self._pending, block])
+        end = self._base + len(self._pending)
+        # Groups whose whole filter span has arrived.
+        ready = (end - self._taps.shape[1] - int(self._offsets.max())) // self.down + 1
+        return self._emit(ready - self._q)
+
+    def flush(self) -> np.ndarray:
+        """The remaining output, zero-padding past the end of the input."""
+        n_dst = int(round(self._n_in * self.dst_sr / self.src_sr))
+        if n_dst <= 1 and self.src_sr != self.dst_sr:
+            n_dst = 0  # matches resample() on a too-short input
+        if self.src_sr == self.dst_sr:
+            return np.zeros(0, dtype=np.float32)
+        n_q = -(-n_dst // self.up) - self._q
+        if n_q > 0:
+            need = ((self._q + n_q - 1) * self.down + int(self._offsets.max())
+                    + self._taps.shape[1] - self._base)
+            if need > len(self._pending):
+                self._pending = np.pad(self._pending, (0, need - len(self._pending)))
+        out = self._emit(n_q)
+        return out[:max(0, n_dst - (self._n_out - len(out)))]
+
+    def _emit(self, n_q: int) -> np.ndarray:
+        if n_q <= 0:
+            return np.zeros(0, dtype=np.float32)
+        out = _apply(self._pending, self._q * self.down - self._base, n_q, self.down,
+                     self._taps, self._offsets)
+        self._q += n_q
+        # Drop input no later group can read.
+        keep = self._q * self.down + int(self._offsets.min())
+        self._pending = self._pending[keep - self._base:]
+        self._base = keep
+        self._n_out += len(out)
+        return out
+
+
+def resample(x: np.ndarray, src_sr: int, dst_sr: int) -> np.ndarray:
+    """Resample a 1-D signal from ``src_sr`` to ``dst_sr`` Hz (float32 out)."""
+    x = np.asarray(x, dtype=np.float32)
+    if src_sr == dst_sr:
+        return x
+    stream = StreamResampler(src_sr, dst_sr)
+    return np.concatenate([stream.process(x), stream.flush()])
+
+
+def _bench() -> None:
+    """Speed and aliasing of :func:`resample` vs the old ``np.interp`` path."""
+
+    def interp(x, src, dst):
+        n = int(round(len(x) * dst / src))
+        return np.interp(np.linspace(0, 1, n, endpoint=False),
+                         np.linspace(0, 1, len(x), endpoint=False), x).astype(np.float32)
+
+    def level_db(y):
+        # Total energy relative to a full-scale sine.
+        spec = np.abs(np.fft.rfft(y * np.hanning(len(y)))) ** 2
+        ref = (np.hanning(len(y)).sum() / 2) ** 2
+        return 10 * np.log10(spec.sum() / ref + 1e-20)
+
+    dst = 24000
+    rng = np.random.default_rng(0)
+    print(f"{'src':>6} {'interp s':>9} {'poly s':>7}  {'interp alias':>12} {'poly alias':>10}")
+    for src in (48000, 44100, 16000):
+        x = rng.standard_normal(src * 600).astype(np.float32) * 0.1  # 10 minutes
+        t0 = time.perf_counter()
+        interp(x, src, dst)
+        t1 = time.perf_counter()
+        resample(x, src, dst)
+        t2 = time.perf_counter()
+        if src > dst:
+            # A 15 kHz tone is above the 12 kHz output Nyquist: it must vanish,
+            # not fold down to 9 kHz.
+            s = np.sin(2 * np.pi * 15000.0 * np.arange(src * 2) / src).astype(np.float32)
+            a_lin = level_db(interp(s, src, dst))
+            a_poly = level_db(resample(s, src, dst))
+            alias = f"{a_lin:10.1f} dB {a_poly:8.1f} dB"
+        else:
+            alias = f"{'-':>12} {'-':>10}"
+        print(f"{src:>6} {t1 - t0:9.2f} {t2 - t1:7.2f}  {alias}")
+
+
+if __name__ == "__main__":
+    _bench()
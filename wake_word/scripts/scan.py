@@ -0,0 +1,84 @@
+"""Scan long recordings for wake word triggers offline.
+
+Runs :meth:`WakeWordDetector.scan` over each file (any sample rate / channel
+count; resampled to 24 kHz mono on load) and prints where the live detector
+would have fired, using the same energy gate, smoothing, consecutive-hit and
+refractory rules. Useful for auditing hours of household audio for false
+alarms, or for checking that a recording of someone saying "Aurora" fires.
+
+Usage::
+
+    python wake_word/scripts/scan.py recordings/*.wav
+    python wake_word/scripts/scan.py --variant int8 --cascade living_room.wav
+    python wake_word/scripts/scan.py --threshold 0.4 --csv triggers.csv day.wav
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import os
+import time
+
+import _bootstrap  # noqa: F401
+import numpy as np
+
+from prepare_dataset import load_wav_mono
+from wake_word import config
+from wake_word.detector import WakeWordDetector
+
+MODELS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "models")
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Scan recordings for Aurora wake word triggers.")
+    ap.add_argument("files", nargs="+", help="Audio files to scan.")
+    ap.add_argument("--model", default=os.path.join(MODELS_DIR, "aurora.onnx"))
+    ap.add_argument("--threshold", type=float, default=None,
+                    help="Override the threshold saved in the model metadata.")
+    ap.add_argument("--variant", default=None, help="Model variant (float, int8, stream).")
+    ap.add_argument("--cascade", action="store_true", help="Use the cascade gate model.")
+    ap.add_argument("--hop", type=int, default=config.EVAL_HOP_SAMPLES,
+                    help="Samples between evaluations (multiple of the STFT hop).")
+    ap.add_argument("--csv", default=None, help="Write one row per trigger to this CSV.")
+    args = ap.parse_args()
+
+    if not os.path.exists(args.model):
+        raise SystemExit(f"Model not found: {args.model}. Train it first (train.py).")
+    detector = WakeWordDetector(args.model, threshold=args.threshold,
+                                variant=args.variant, cascade=args.cascade)
+
+    rows = []
+    total_seconds = 0.0
+    total_triggers = 0
+    for path in args.files:
+        start = time.perf_counter()
+        result = detector.scan(load_wav_mono(path), hop=args.hop)
+        elapsed = time.perf_counter() - start
+        total_seconds += result.duration
+        total_triggers += len(result.triggers)
+
+        gated = float(np.mean(np.isnan(result.probs))) if len(result.probs) else 0.0
+        speed = result.duration / elapsed if elapsed > 0 else float("inf")
+        print(f"{path}: {result.duration / 60.0:.1f} min, {len(result.triggers)} triggers "
+              f"({gated:.0%} windows energy-gated, {speed:.0f}x real time)")
+        for t in result.triggers:
+            i = int(np.searchsorted(result.times, t))
+            print(f"  {t:10.2f}s  smoothed={result.smoothed[i]:.3f}  prob={result.probs[i]:.3f}")
+            rows.append((path, round(t, 3), round(float(result.probs[i]), 4)))
+
+    hours = total_seconds / 3600.0
+    if hours > 0:
+        print(f"\nTotal: {total_triggers} triggers in {hours:.2f} h "
+              f"({total_triggers / hours:.2f} per hour) at threshold {detector.threshold:.3f}")
+
+    if args.csv:
+        with open(args.csv, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["file", "time_s", "probability"])
+            writer.writerows(rows)
+        print(f"Wrote {len(rows)} triggers to {args.csv}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,290 @@
+"""Grouped k-fold hyperparameter sweep for the Aurora wake word model.
+
+train.py fits one configuration on one grouped split. This builds the features
+once, as a memory-mapped dataset directory that every worker opens read-only,
+then trains every (lr, epochs, augment factor) combination on every fold of a
+grouped k-fold split over speakers / sources, in a process pool with torch
+pinned to ``--threads-per-worker`` threads per process. Each model is scored
+on its held-out fold under every threshold policy (``--max-hard-negative-rate``
+values, applied exactly as train.py picks its threshold, from one sorted
+ROC curve per model) and exported to ONNX;
+single-window latency is then measured with the detector's session settings
+once the pool has finished, so the timings aren't skewed by training load.
+
+The dataset is built at the largest ``--augment-factor`` in the grid. Smaller
+factors train on a subset of its rows: rows are window-major (a clean window,
+then its augmented copies) and each copy is seeded per (file, window, index),
+so the subset is exactly what ``train.py --augment-factor N`` would build.
+Held-out folds are always scored on the same rows (clean windows plus every
+copy), so all configurations are compared on identical data.
+
+Usage::
+
+    python wake_word/scripts/sweep.py
+    python wake_word/scripts/sweep.py --lr 1e-3,3e-4 --epochs 20,40 --augment-factor 2,4
+    python wake_word/scripts/sweep.py --max-hard-negative-rate 0,0.02,0.05 --folds 4
+    python wake_word/scripts/sweep.py --dataset wake_word/data/dataset --workers 8
+
+Writes ``leaderboard.csv`` and ``leaderboard.json`` (plus the per-fold
+results) to ``--out-dir``, ranked by mean held-out recall, then hard-negative
+rate, then latency.
+"""
+
+from __future__ import annotations
+
+import argparse
+import atexit
+import csv
+import itertools
+import json
+import multiprocessing
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import _bootstrap  # noqa: F401
+import numpy as np
+
+from evaluate import _latency_ms
+from metrics import choose_threshold, rate_curve
+from prepare_dataset import CACHE_DIR, DATA_DIR, build_dataset, dataset_augment_factor, load_dataset
+from train import _fit, _logits, _WindowDataset
+from wake_word import config
+
+MODELS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "models")
+
+
+def _grouped_kfold(groups: np.ndarray, categories: np.ndarray, k: int, seed: int):
+    """``k`` (train_idx, val_idx) splits where every group (speaker / source)
+    is held out in exactly one fold. Groups are shuffled and dealt round-robin
+    per category, so each fold holds out a share of the positives, hard
+    negatives and negatives alike."""
+    rng = np.random.default_rng(seed)
+    fold_of = {}
+    offset = 0
+    for category in np.unique(categories):
+        uniq = np.unique(groups[categories == category])
+        rng.shuffle(uniq)
+        for i, g in enumerate(uniq):
+            fold_of[g] = (offset + i) % k
+        offset += len(uniq)
+    fold = np.array([fold_of[g] for g in groups])
+    return [(np.where(fold != f)[0], np.where(fold == f)[0]) for f in range(k)]
+
+
+# --- per-trial work (runs in pool workers) -----------------------------------
+# (X, y, groups, categories), memory-mapped once per worker by _init_worker.
+_data = None
+
+
+def _init_worker(dataset_dir: str, threads: int) -> None:
+    global _data
+    import torch
+
+    torch.set_num_threads(threads)
+    torch.set_num_interop_threads(1)
+    _data = load_dataset(dataset_dir)
+
+
+def _run_trial(task: tuple) -> dict:
+    """Train one configuration on one fold; score it under every threshold policy."""
+    import torch
+
+    from wake_word.model import export_onnx
+
+    trial, params, fold, train_rows, val_rows, policies, seed, batch_size, onnx_path = task
+    torch.manual_seed(seed)
+    np.random.seed(seed)
+    X, y, _groups, categories = _data
+
+    start = time.perf_counter()
+    val_ds = _WindowDataset(X, y, val_rows)
+    model, val_loss, best_epoch = _fit(_WindowDataset(X, y, train_rows), params["epochs"],
+                                       params["lr"], batch_size, val_ds, verbose=False)
+    probs = torch.sigmoid(_logits(model, val_ds)).numpy()
+    export_onnx(model, onnx_path)
+
+    curve = rate_curve(probs, y[val_rows], categories[val_rows])
+    results = []
+    for rate in policies:
+        thr = choose_threshold(curve, rate)
+        results.append({"max_hard_negative_rate": rate, "threshold": thr, **curve.at(thr)})
+    return {
+        "trial": trial,
+        "fold": fold,
+        **params,
+        "val_loss": float(val_loss),
+        "best_epoch": int(best_epoch),
+        "train_windows": len(train_rows),
+        "val_windows": len(val_rows),
+        "seconds": time.perf_counter() - start,
+        "policies": results,
+    }
+
+
+def _leaderboard(runs: list[dict], latencies: dict) -> list[dict]:
+    """One row per (configuration, threshold policy), averaged over folds."""
+    rows = []
+    by_trial: dict[int, list[dict]] = {}
+    for run in runs:
+        by_trial.setdefault(run["trial"], []).append(run)
+    for trial, folds in by_trial.items():
+        first = folds[0]
+        latency = float(np.median([latencies[(trial, r["fold"])] for r in folds]))
+        for p, policy in enumerate(first["policies"]):
+            per_fold = [r["policies"][p] for r in folds]
+
+            def mean(key):
+                return float(np.mean([f[key] for f in per_fold]))
+
+            rows.append({
+                "lr": first["lr"],
+                "epochs": first["epochs"],
+                "augment_factor": first["augment_factor"],
+                "max_hard_negative_rate": policy["max_hard_negative_rate"],
+                "recall": round(mean("recall"), 4),
+                "recall_std": round(float(np.std([f["recall"] for f in per_fold])), 4),
+                "hard_negative_rate": round(mean("hard_negative_rate"), 4),
+                "false_alarm_rate": round(mean("false_alarm_rate"), 4),
+                "threshold": round(mean("threshold"), 3),
+                "val_loss": round(float(np.mean([r["val_loss"] for r in folds])), 4),
+                "best_epoch": round(float(np.mean([r["best_epoch"] for r in folds])), 1),
+                "latency_ms": round(latency, 4),
+                "folds": len(folds),
+            })
+    rows.sort(key=lambda r: (-r["recall"], r["hard_negative_rate"], r["latency_ms"]))
+    for rank, row in enumerate(rows, 1):
+        row["rank"] = rank
+    return rows
+
+
+def _floats(text: str) -> list[float]:
+    return [float(v) for v in text.split(",") if v.strip()]
+
+
+def _ints(text: str) -> list[int]:
+    return [int(v) for v in text.split(",") if v.strip()]
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Grouped k-fold hyperparameter sweep for the wake word model.")
+    ap.add_argument("--data-dir", default=DATA_DIR)
+    ap.add_argument("--dataset", default=None,
+                    help="Sweep over a dataset directory from prepare_dataset.py instead of building one.")
+    ap.add_argument("--lr", default="1e-3,3e-4", help="Comma-separated learning rates.")
+    ap.add_argument("--epochs", default="20,40", help="Comma-separated epoch counts.")
+    ap.add_argument("--augment-factor", default="2,4", help="Comma-separated augmentation factors.")
+    ap.add_argument("--max-hard-negative-rate", default=f"0,{config.MAX_HARD_NEGATIVE_RATE}",
+                    help="Comma-separated threshold policies (max Alexa / hard-negative trigger rate).")
+    ap.add_argument("--folds", type=int, default=5, help="Grouped k-fold splits over speakers.")
+    ap.add_argument("--batch-size", type=int, default=64)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--workers", type=int, default=None,
+                    help="Training processes (default: cores / --threads-per-worker).")
+    ap.add_argument("--threads-per-worker", type=int, default=1,
+                    help="torch / OpenMP threads in each training process.")
+    ap.add_argument("--no-cache", action="store_true",
+                    help="Recompute all features instead of using the feature cache.")
+    ap.add_argument("--latency-runs", type=int, default=200,
+                    help="Timed single-window ONNX runs per model.")
+    ap.add_argument("--out-dir", default=os.path.join(MODELS_DIR, "sweep"))
+    args = ap.parse_args()
+
+    lrs, epochs, factors = _floats(args.lr), _ints(args.epochs), _ints(args.augment_factor)
+    policies = _floats(args.max_hard_negative_rate)
+    if not (lrs and epochs and factors and policies):
+        raise SystemExit("Every grid axis needs at least one value.")
+    threads = max(1, args.threads_per_worker)
+    workers = args.workers or max(1, (os.cpu_count() or 1) // threads)
+
+    max_factor = max(factors)
+    if args.dataset:
+        dataset_dir = args.dataset
+        stored = dataset_augment_factor(dataset_dir)
+        if stored is None or stored < max_factor:
+            raise SystemExit(f"{dataset_dir} has augment factor {stored}; rebuild it with "
+                             f"prepare_dataset.py --augment-factor {max_factor} or lower --augment-factor.")
+        max_factor = stored
+        print(f"Loading dataset {dataset_dir}...")
+    else:
+        dataset_dir = tempfile.mkdtemp(prefix="aurora-sweep-")
+        atexit.register(shutil.rmtree, dataset_dir, True)
+        print(f"Building dataset (augment factor {max_factor})...")
+        build_dataset(args.data_dir, augment=True, augment_factor=max_factor, seed=args.seed,
+                      workers=args.workers, cache_dir=None if args.no_cache else CACHE_DIR,
+                      out_dir=dataset_dir)
+    _X, y, groups, categories = load_dataset(dataset_dir)
+    if len(y) < 4 or y.sum() == 0 or y.sum() == len(y):
+        raise SystemExit("Need both positive and negative samples to sweep. Add wavs under wake_word/data/.")
+    n_pos_groups = len(np.unique(groups[y == 1]))
+    if n_pos_groups < args.folds:
+        raise SystemExit(f"Only {n_pos_groups} positive speaker groups; use --folds <= {n_pos_groups}.")
+
+    # Augmentation index of every row: 0 = clean, 1..max_factor = copies.
+    copy = np.arange(len(y)) % (max_factor + 1)
+    splits = _grouped_kfold(groups, categories, args.folds, args.seed)
+    grid = [{"lr": lr, "epochs": e, "augment_factor": f} for lr, e, f in itertools.product(lrs, epochs, factors)]
+    print(f"  {len(y)} windows, {len(np.unique(groups))} groups, {args.folds} folds; "
+          f"{len(grid)} configurations x {len(policies)} threshold policies")
+
+    onnx_dir = tempfile.mkdtemp(prefix="aurora-sweep-onnx-")
+    atexit.register(shutil.rmtree, onnx_dir, True)
+    tasks = []
+    for trial, params in enumerate(grid):
+        for fold, (train_idx, val_idx) in enumerate(splits):
+            train_rows = train_idx[copy[train_idx] <= params["augment_factor"]]
+            tasks.append((trial, params, fold, train_rows, val_idx, policies, args.seed,
+                          args.batch_size, os.path.join(onnx_dir, f"trial{trial}_fold{fold}.onnx")))
+
+    print(f"Training {len(tasks)} models on {workers} workers x {threads} threads...")
+    # Inherited by the spawned workers, so OpenMP / BLAS start with `threads` too.
+    for var in ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS"):
+        os.environ[var] = str(threads)
+    runs = []
+    start = time.perf_counter()
+    # spawn: torch / onnxruntime thread pools don't survive fork.
+    with ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn"),
+                             initializer=_init_worker, initargs=(dataset_dir, threads)) as pool:
+        for fut in as_completed([pool.submit(_run_trial, t) for t in tasks]):
+            run = fut.result()
+            runs.append(run)
+            best = max(run["policies"], key=lambda p: p["recall"])
+            print(f"  [{len(runs):3d}/{len(tasks)}] lr={run['lr']:g} epochs={run['epochs']} "
+                  f"aug={run['augment_factor']} fold={run['fold']}  val_loss={run['val_loss']:.4f}  "
+                  f"recall={best['recall']:.3f}  ({run['seconds']:.0f}s)")
+    print(f"  trained in {time.perf_counter() - start:.0f}s")
+
+    print("Measuring ONNX latency...")
+    feat = np.ascontiguousarray(_X[:1])
+    latencies = {(t[0], t[2]): _latency_ms(t[-1], feat, args.latency_runs) for t in tasks}
+
+    board = _leaderboard(runs, latencies)
+    os.makedirs(args.out_dir, exist_ok=True)
+    columns = ["rank", "lr", "epochs", "augment_factor", "max_hard_negative_rate", "recall", "recall_std",
+               "hard_negative_rate", "false_alarm_rate", "threshold", "val_loss", "best_epoch",
+               "latency_ms", "folds"]
+    csv_path = os.path.join(args.out_dir, "leaderboard.csv")
+    with open(csv_path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=columns)
+        writer.writeheader()
+        writer.writerows(board)
+    json_path = os.path.join(args.out_dir, "leaderboard.json")
+    with open(json_path, "w") as f:
+        json.dump({"folds": args.folds, "seed": args.seed, "leaderboard": board,
+                   "runs": sorted(runs, key=lambda r: (r["trial"], r["fold"]))}, f, indent=2)
+
+    print(f"\n  {'#':>3}  {'lr':>7}  {'epochs':>6}  {'aug':>3}  {'policy':>6}  {'recall':>13}  "
+          f"{'hard-neg':>8}  {'FA rate':>7}  {'thr':>5}  {'latency':>9}")
+    for row in board[:20]:
+        print(f"  {row['rank']:3d}  {row['lr']:7.1e}  {row['epochs']:6d}  {row['augment_factor']:3d}  "
+              f"{row['max_hard_negative_rate']:6.3f}  {row['recall']:.3f} +/- {row['recall_std']:.3f}  "
+              f"{row['hard_negative_rate']:8.3f}  {row['false_alarm_rate']:7.3f}  {row['threshold']:5.3f}  "
+              f"{row['latency_ms']:7.3f}ms")
+    print(f"\nWrote {csv_path}")
+    print(f"Wrote {json_path}")
+
+
+if __name__ == "__main__":
+    main()
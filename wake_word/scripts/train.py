@@ -7,6 +7,9 @@ Runs locally on CPU in a few minutes. Usage::
 Outputs:
     wake_word/models/aurora.onnx   - probability-output model for the detector
     wake_word/models/aurora.json   - threshold + feature params + metrics
+    wake_word/models/aurora.roc.json - full validation ROC curves
+    wake_word/models/aurora.int8.onnx - INT8 copy (only with --quantize)
+    wake_word/models/aurora.stream.onnx - incremental streaming variant (only with --streaming)
 
 The decision threshold is chosen to favour recall (false positives are
 preferable to false negatives for this application), subject to a cap on the
@@ -23,12 +26,155 @@ import os
 import _bootstrap  # noqa: F401
 import numpy as np
 
-from prepare_dataset import DATA_DIR, build_dataset, to_arrays
-from wake_word import config
+from metrics import choose_threshold, rate_curve, write_report
+from prepare_dataset import (
+    CACHE_DIR,
+    DATA_DIR,
+    augment_batch,
+    build_dataset,
+    load_dataset,
+    load_noise_bank,
+)
+from wake_word import config, features
 
 MODELS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "models")
 
 
+class _WindowDataset:
+    """Map-style dataset over rows ``idx`` of the (memory-mapped) feature array.
+
+    Rows are read from disk a batch at a time (``__getitems__``) so the full
+    tensor is never loaded. ``standardize`` applies the CNN's per-window
+    standardization to a raw log-mel dataset (see train.py --streaming).
+    """
+
+    def __init__(self, X: np.ndarray, y: np.ndarray, idx: np.ndarray, standardize: bool = False) -> None:
+        self.X, self.y, self.idx, self.standardize = X, y, np.asarray(idx), standardize
+
+    def __len__(self) -> int:
+        return len(self.idx)
+
+    def __getitem__(self, i: int):
+        return self.__getitems__([i])[0]
+
+    def __getitems__(self, items: list[int]) -> list:
+        rows = self.idx[np.asarray(items)]
+        order = np.argsort(rows)   # sequential reads from the memmap
+        feats = np.empty((len(rows),) + self.X.shape[1:], dtype=np.float32)
+        feats[order] = self.X[rows[order]]
+        if self.standardize:
+            feats = features.standardize_windows(feats)
+        return list(zip(feats, self.y[rows]))
+
+    def read(self, idx: np.ndarray) -> np.ndarray:
+        """Features for dataset positions ``idx`` as one array."""
+        return np.stack([f for f, _ in self.__getitems__(list(idx))])
+
+
+class _WaveformWindows(_WindowDataset):
+    """Map-style dataset over rows ``idx`` of the clean-window memmap
+    (build_dataset(waveforms=True)) that augments and featurizes per batch.
+
+    Every time a window is drawn it gets a fresh time shift / gain / noise mix
+    (prepare_dataset.augment_batch, vectorized over the batch), so nothing but
+    the clean windows and the noise bank is kept. The random draws are seeded
+    from ``seed`` and the batch's rows (which the shuffling sampler picks in
+    the main process), not from the loader worker that happens to build the
+    batch, so runs are reproducible under --seed with any number of workers.
+    """
+
+    def __init__(self, W: np.ndarray, y: np.ndarray, idx: np.ndarray, bank=None,
+                 augment: bool = True, standardize: bool = True, seed: int = 0) -> None:
+        super().__init__(W, y, idx)
+        self.bank, self.augment, self.standardize_out = bank, augment, standardize
+        self.seed = seed
+
+    def __getitems__(self, items: list[int]) -> list:
+        rows = self.idx[np.asarray(items)]
+        order = np.argsort(rows)
+        clean = np.empty((len(rows), self.X.shape[1]), dtype=np.float32)
+        clean[order] = self.X[rows[order]]
+        if self.augment:
+            rng = np.random.default_rng([self.seed, *items])
+            clean = augment_batch(clean, self.bank, rng)
+        feats = features.waveforms_to_model_input(clean, self.standardize_out)
+        return list(zip(feats, self.y[rows]))
+
+
+def _band_stats(ds: _WindowDataset, chunk: int = 4096) -> tuple[np.ndarray, np.ndarray]:
+    """Per-mel-band mean / std of a raw log-mel dataset, accumulated in chunks
+    so memory stays flat."""
+    total = np.zeros(config.N_MELS, dtype=np.float64)
+    total_sq = np.zeros(config.N_MELS, dtype=np.float64)
+    for start in range(0, len(ds), chunk):
+        block = ds.read(np.arange(start, min(start + chunk, len(ds)))).astype(np.float64)
+        total += block.sum(axis=(0, 1, 3))
+        total_sq += (block ** 2).sum(axis=(0, 1, 3))
+    count = len(ds) * config.NUM_FRAMES
+    mean = total / count
+    std = np.sqrt(np.maximum(total_sq / count - mean ** 2, 0.0))
+    return mean.astype(np.float32), std.astype(np.float32)
+
+
+def _logits(m, ds):
+    """Model logits over a whole dataset, a batch at a time."""
+    import torch
+    from torch.utils.data import DataLoader
+
+    m.eval()
+    out = []
+    with torch.no_grad():
+        for xb, _yb in DataLoader(ds, batch_size=1024):
+            out.append(m(xb).squeeze(-1))
+    return torch.cat(out)
+
+
+def _fit(train_ds, epochs: int, lr: float, batch_size: int, val_ds=None, make_model=None,
+         loader_workers: int = 0, verbose: bool = True):
+    """Train a fresh model (default WakeWordCNN); with a val set, early-stop on
+    best val loss. Returns (model, best val loss, best epoch)."""
+    import torch
+    from torch.utils.data import DataLoader
+
+    from wake_word.model import WakeWordCNN
+
+    loader = DataLoader(train_ds, batch_size=batch_size, shuffle=True,
+                        num_workers=loader_workers, persistent_workers=loader_workers > 0)
+    train_y = train_ds.y[train_ds.idx]
+    p = float(train_y.sum())
+    n = float(len(train_y) - p)
+    pos_weight = torch.tensor([n / p]) if p > 0 else torch.tensor([1.0])
+    m = (make_model or WakeWordCNN)()
+    opt = torch.optim.Adam(m.parameters(), lr=lr)
+    loss_fn = torch.nn.BCEWithLogitsLoss(pos_weight=pos_weight)
+    yva = torch.from_numpy(np.asarray(val_ds.y[val_ds.idx])) if val_ds is not None else None
+    best_val, best_state, best_epoch = float("inf"), None, epochs - 1
+    for epoch in range(epochs):
+        m.train()
+        total = 0.0
+        for xb, yb in loader:
+            opt.zero_grad()
+            loss = loss_fn(m(xb).squeeze(-1), yb)
+            loss.backward()
+            opt.step()
+            total += loss.item() * len(xb)
+        train_loss = total / len(train_ds)
+        report = verbose and (epoch % 5 == 0 or epoch == epochs - 1)
+        if val_ds is not None:
+            with torch.no_grad():
+                val_loss = loss_fn(_logits(m, val_ds), yva).item()
+            if val_loss < best_val:
+                best_val, best_epoch = val_loss, epoch
+                best_state = {k: v.clone() for k, v in m.state_dict().items()}
+            if report:
+                print(f"  epoch {epoch:3d}  train_loss={train_loss:.4f}  val_loss={val_loss:.4f}")
+        elif report:
+            print(f"  epoch {epoch:3d}  train_loss={train_loss:.4f}")
+    if best_state is not None:
+        m.load_state_dict(best_state)
+    return m, best_val, best_epoch
+
+
 def _grouped_split(groups: np.ndarray, y: np.ndarray, val_frac: float, seed: int):
     """Split indices by group so a speaker/source is never in both sets."""
     rng = np.random.default_rng(seed)
@@ -48,37 +194,25 @@ def _grouped_split(groups: np.ndarray, y: np.ndarray, val_frac: float, seed: int
     return np.where(~val_mask)[0], np.where(val_mask)[0]
 
 
-def _choose_threshold(
-    probs: np.ndarray,
+def _choose_gate_threshold(
+    gate_probs: np.ndarray,
+    accepted: np.ndarray,
     labels: np.ndarray,
-    categories: np.ndarray,
-    max_hard_neg_rate: float,
-) -> float:
-    """Most permissive threshold that still rejects the hard negatives ("Alexa").
-
-    The requirements are asymmetric: random speech triggering the wake word is
-    acceptable (the realtime session just closes), but the household's Alexa
-    devices must NOT set it off. So we treat the hard-negative trigger rate as
-    the binding constraint and otherwise maximize recall: pick the *lowest*
-    threshold whose hard-negative trigger rate stays <= ``max_hard_neg_rate``.
-    """
-    pos = probs[labels == 1]
-    if len(pos) == 0:
-        return config.DEFAULT_THRESHOLD
-
-    hard = probs[(labels == 0) & (categories == "hard_negatives")]
-    candidates = np.linspace(0.05, 0.95, 19)
-
-    feasible = [
-        thr for thr in candidates
-        if (len(hard) == 0 or float(np.mean(hard >= thr)) <= max_hard_neg_rate)
-    ]
-    if feasible:
-        best = float(min(feasible))   # lowest feasible thr => max recall, Alexa still rejected
-    else:
-        best = 0.9                    # cannot reject Alexa; be as strict as possible
-    # Keep a safety margin against garbage/near-silence triggers.
-    return round(min(max(best, config.MIN_AUTO_THRESHOLD), 0.9), 3)
+    min_recall: float,
+) -> tuple[float, float]:
+    """Highest cascade gate threshold that still lets ``min_recall`` of the
+    positives the full model accepts through (all positives if it accepts
+    none). Returns the threshold and the fraction of negatives it passes."""
+    keep = gate_probs[accepted & (labels == 1)]
+    if len(keep) == 0:
+        keep = gate_probs[labels == 1]
+    if len(keep) == 0:
+        return config.CASCADE_GATE_THRESHOLD, 1.0
+    # Round down so the boundary positive stays on the passing side.
+    thr = round(float(np.floor(float(np.quantile(keep, 1.0 - min_recall)) * 1e4)) / 1e4, 4)
+    neg = gate_probs[labels == 0]
+    passed = float(np.mean(neg >= thr)) if len(neg) else 0.0
+    return thr, passed
 
 
 def main() -> None:
@@ -88,26 +222,66 @@ def main() -> None:
     ap.add_argument("--batch-size", type=int, default=64)
     ap.add_argument("--lr", type=float, default=1e-3)
     ap.add_argument("--augment-factor", type=int, default=4)
+    ap.add_argument("--workers", type=int, default=None,
+                    help="Dataset build processes (default: all cores).")
+    ap.add_argument("--no-cache", action="store_true",
+                    help="Recompute all features instead of using the feature cache.")
+    ap.add_argument("--dataset", default=None,
+                    help="Train on a dataset directory from prepare_dataset.py instead of building one.")
+    ap.add_argument("--online-augment", action="store_true",
+                    help="Keep only clean windows and augment freshly every epoch in the data loader.")
+    ap.add_argument("--loader-workers", type=int, default=min(4, os.cpu_count() or 1),
+                    help="DataLoader worker processes for --online-augment.")
     ap.add_argument("--val-frac", type=float, default=0.2)
     ap.add_argument("--max-hard-negative-rate", type=float, default=config.MAX_HARD_NEGATIVE_RATE,
                     help="Max allowed trigger rate on hard negatives ('Alexa') when picking the threshold.")
     ap.add_argument("--seed", type=int, default=0)
     ap.add_argument("--out-dir", default=MODELS_DIR)
+    ap.add_argument("--quantize", choices=["none", "static", "dynamic"], default="none",
+                    help="Also export an INT8 model (static = calibrated on training features).")
+    ap.add_argument("--calibration-windows", type=int, default=256,
+                    help="Training windows used to calibrate --quantize static.")
+    ap.add_argument("--cascade", action="store_true",
+                    help="Also train a tiny first-stage gate model (aurora.gate.onnx).")
+    ap.add_argument("--streaming", action="store_true",
+                    help="Also train the causal streaming variant (aurora.stream.onnx).")
     args = ap.parse_args()
 
     import torch
-    from torch.utils.data import DataLoader, TensorDataset
 
-    from wake_word.model import WakeWordCNN, export_onnx
+    from wake_word.model import (
+        StreamingWakeWordCNN,
+        WakeWordGate,
+        export_onnx,
+        export_streaming_onnx,
+    )
 
     torch.manual_seed(args.seed)
     np.random.seed(args.seed)
 
-    print("Building dataset...")
-    samples = build_dataset(args.data_dir, augment=True, augment_factor=args.augment_factor, seed=args.seed)
-    if len(samples) < 4:
+    # The streaming variant needs the raw log-mel; the CNN's standardized input
+    # is derived from it per batch rather than building the dataset twice.
+    raw = args.streaming
+    if args.online_augment:
+        if args.dataset:
+            raise SystemExit("--online-augment builds its own clean-window dataset; drop --dataset.")
+        print("Building clean windows (augmented per batch while training)...")
+        W, y, groups, categories = build_dataset(args.data_dir, workers=args.workers, waveforms=True)
+        bank = load_noise_bank()
+    elif args.dataset:
+        if raw:
+            raise SystemExit("--streaming needs the raw log-mel; drop --dataset to build it here.")
+        print(f"Loading dataset {args.dataset}...")
+        X, y, groups, categories = load_dataset(args.dataset)
+    else:
+        print("Building dataset...")
+        X, y, groups, categories = build_dataset(
+            args.data_dir, augment=True, augment_factor=args.augment_factor,
+            seed=args.seed, standardize=not args.streaming, workers=args.workers,
+            cache_dir=None if args.no_cache else CACHE_DIR,
+        )
+    if len(y) < 4:
         raise SystemExit("Not enough data. Add wavs under wake_word/data/ (see README).")
-    X, y, groups, categories = to_arrays(samples)
     n_pos = int(y.sum())
     print(f"  {len(y)} windows, {n_pos} positive, {len(y) - n_pos} negative")
     if n_pos == 0 or n_pos == len(y):
@@ -116,63 +290,42 @@ def main() -> None:
     train_idx, val_idx = _grouped_split(groups, y, args.val_frac, args.seed)
     print(f"  train={len(train_idx)} val={len(val_idx)}")
 
-    def _fit(train_X, train_y, epochs, val_X=None, val_y=None):
-        """Train a fresh model; with a val set, early-stop on best val loss."""
-        loader = DataLoader(TensorDataset(train_X, train_y), batch_size=args.batch_size, shuffle=True)
-        p = float(train_y.sum().item())
-        n = float(len(train_y) - p)
-        pos_weight = torch.tensor([n / p]) if p > 0 else torch.tensor([1.0])
-        m = WakeWordCNN()
-        opt = torch.optim.Adam(m.parameters(), lr=args.lr)
-        loss_fn = torch.nn.BCEWithLogitsLoss(pos_weight=pos_weight)
-        best_val, best_state, best_epoch = float("inf"), None, epochs - 1
-        for epoch in range(epochs):
-            m.train()
-            total = 0.0
-            for xb, yb in loader:
-                opt.zero_grad()
-                loss = loss_fn(m(xb).squeeze(-1), yb)
-                loss.backward()
-                opt.step()
-                total += loss.item() * len(xb)
-            train_loss = total / len(train_X)
-            if val_X is not None:
-                m.eval()
-                with torch.no_grad():
-                    val_loss = loss_fn(m(val_X).squeeze(-1), val_y).item()
-                if val_loss < best_val:
-                    best_val, best_epoch = val_loss, epoch
-                    best_state = {k: v.clone() for k, v in m.state_dict().items()}
-                if epoch % 5 == 0 or epoch == epochs - 1:
-                    print(f"  epoch {epoch:3d}  train_loss={train_loss:.4f}  val_loss={val_loss:.4f}")
-            elif epoch % 5 == 0 or epoch == epochs - 1:
-                print(f"  epoch {epoch:3d}  train_loss={train_loss:.4f}")
-        if best_state is not None:
-            m.load_state_dict(best_state)
-        return m, best_val, best_epoch
-
-    Xtr, ytr = torch.from_numpy(X[train_idx]), torch.from_numpy(y[train_idx])
-    Xva, yva = torch.from_numpy(X[val_idx]), torch.from_numpy(y[val_idx])
+    loader_workers = args.loader_workers if args.online_augment else 0
+
+    def _train(train_ds, val_ds, make_model=None):
+        return _fit(train_ds, args.epochs, args.lr, args.batch_size, val_ds,
+                    make_model=make_model, loader_workers=loader_workers)
+
+    # CNN / gate inputs (standardized) and, for the streaming variant, raw
+    # log-mel, read lazily from the on-disk dataset.
+    if args.online_augment:
+        # Validation stays clean and fixed: featurize it once (raw).
+        rows = np.arange(len(val_idx))
+        X_val = _WaveformWindows(W, y, val_idx, augment=False, standardize=False).read(rows)
+        train_ds = _WaveformWindows(W, y, train_idx, bank, seed=args.seed)
+        val_ds = _WindowDataset(X_val, y[val_idx], rows, standardize=True)
+        raw_train = _WaveformWindows(W, y, train_idx, bank, standardize=False, seed=args.seed)
+        raw_val = _WindowDataset(X_val, y[val_idx], rows)
+        raw_stats = _WaveformWindows(W, y, train_idx, augment=False, standardize=False)
+    else:
+        train_ds = _WindowDataset(X, y, train_idx, standardize=raw)
+        val_ds = _WindowDataset(X, y, val_idx, standardize=raw)
+        raw_train = raw_stats = _WindowDataset(X, y, train_idx)
+        raw_val = _WindowDataset(X, y, val_idx)
 
     # Train on the train split with early stopping on val loss. We keep the
     # best-val checkpoint as the shipped model: refitting on all data (including
     # val) was tried and badly mis-calibrated the scores, so we don't do it.
     print("Training (early-stopped on held-out voices)...")
-    model, best_val, _best_epoch = _fit(Xtr, ytr, args.epochs, Xva, yva)
+    model, best_val, _best_epoch = _train(train_ds, val_ds)
 
-    model.eval()
-    with torch.no_grad():
-        val_probs = torch.sigmoid(model(Xva).squeeze(-1)).numpy()
+    val_probs = torch.sigmoid(_logits(model, val_ds)).numpy()
     val_labels = y[val_idx]
     val_categories = categories[val_idx]
-    threshold = _choose_threshold(val_probs, val_labels, val_categories, args.max_hard_negative_rate)
-
-    pos_p = val_probs[val_labels == 1]
-    neg_p = val_probs[val_labels == 0]
-    hard_p = val_probs[(val_labels == 0) & (val_categories == "hard_negatives")]
-    recall = float(np.mean(pos_p >= threshold)) if len(pos_p) else 0.0
-    fa = float(np.mean(neg_p >= threshold)) if len(neg_p) else 0.0
-    alexa_fa = float(np.mean(hard_p >= threshold)) if len(hard_p) else 0.0
+    val_curve = rate_curve(val_probs, val_labels, val_categories)
+    threshold = choose_threshold(val_curve, args.max_hard_negative_rate)
+    at = val_curve.at(threshold)
+    recall, fa, alexa_fa = at["recall"], at["false_alarm_rate"], at["hard_negative_rate"]
     print(f"Chosen threshold={threshold}  (held-out val recall={recall:.3f}  "
           f"FA rate={fa:.3f}  Alexa/hard-neg rate={alexa_fa:.3f})")
 
@@ -180,6 +333,71 @@ def main() -> None:
     onnx_path = os.path.join(args.out_dir, "aurora.onnx")
     export_onnx(model, onnx_path)
 
+    # Model variants the detector can select (WAKE_WORD_MODEL_VARIANT). Their
+    # latency / accuracy deltas are filled in by evaluate.py --update-metadata.
+    variants = {"float": {"file": os.path.basename(onnx_path)}}
+    if args.quantize != "none":
+        from wake_word.model import quantize_onnx
+
+        int8_path = os.path.join(args.out_dir, "aurora.int8.onnx")
+        calibration = None
+        if args.quantize == "static":
+            rng = np.random.default_rng(args.seed)
+            n_calib = min(len(train_idx), args.calibration_windows)
+            calibration = train_ds.read(rng.choice(len(train_idx), size=n_calib, replace=False))
+        quantize_onnx(onnx_path, int8_path, calibration)
+        variants["int8"] = {"file": os.path.basename(int8_path), "quantization": args.quantize}
+        print(f"Exported {int8_path} ({args.quantize} INT8)")
+
+    cascade = None
+    if args.cascade:
+        print("Training cascade gate...")
+        gate, _gate_val, _ = _train(train_ds, val_ds, make_model=WakeWordGate)
+        gate_probs = torch.sigmoid(_logits(gate, val_ds)).numpy()
+        gate_threshold, gate_pass = _choose_gate_threshold(
+            gate_probs, val_probs >= threshold, val_labels, config.CASCADE_GATE_RECALL
+        )
+        gate_path = os.path.join(args.out_dir, "aurora.gate.onnx")
+        export_onnx(gate, gate_path)
+        cascade = {
+            "file": os.path.basename(gate_path),
+            "threshold": gate_threshold,
+            "val_negative_pass_rate": round(gate_pass, 4),
+        }
+        print(f"Gate threshold={gate_threshold}  (passes {gate_pass:.1%} of val negatives "
+              f"to the full model)")
+        print(f"Exported {gate_path}")
+
+    if args.streaming:
+        print("Training streaming variant...")
+        band_mean, band_std = _band_stats(raw_stats)
+        band_std = band_std + 1e-6
+
+        def _make_streaming():
+            m = StreamingWakeWordCNN()
+            m.set_normalization(band_mean, band_std)
+            return m
+
+        stream_model, _stream_val, _ = _train(raw_train, raw_val, make_model=_make_streaming)
+        stream_probs = torch.sigmoid(_logits(stream_model, raw_val)).numpy()
+        stream_curve = rate_curve(stream_probs, val_labels, val_categories)
+        stream_thr = choose_threshold(stream_curve, args.max_hard_negative_rate)
+        stream_path = os.path.join(args.out_dir, "aurora.stream.onnx")
+        state_names = export_streaming_onnx(stream_model, stream_path)
+        stream_at = stream_curve.at(stream_thr)
+        variants["stream"] = {
+            "file": os.path.basename(stream_path),
+            "interface": "streaming",
+            "threshold": stream_thr,
+            "state_inputs": state_names,
+            "val_recall": round(stream_at["recall"], 4),
+            "val_hard_negative_rate": round(stream_at["hard_negative_rate"], 4),
+            "val_roc": stream_curve.to_metadata(stream_thr),
+        }
+        print(f"Streaming variant threshold={stream_thr}  (val recall="
+              f"{variants['stream']['val_recall']:.3f})")
+        print(f"Exported {stream_path}")
+
     metadata = {
         "version": 1,
         "trained_at": _dt.datetime.now().isoformat(timespec="seconds"),
@@ -200,13 +418,24 @@ def main() -> None:
             "num_windows": len(y),
             "num_positive": n_pos,
         },
+        "variants": variants,
+        # Validation rates at the threshold plus a coarse curve; every distinct
+        # score is in the report file (aurora.roc.json).
+        "val_roc": val_curve.to_metadata(threshold),
     }
+    if cascade:
+        metadata["cascade"] = cascade
     meta_path = os.path.join(args.out_dir, "aurora.json")
     with open(meta_path, "w") as f:
         json.dump(metadata, f, indent=2)
+    curves = {"val": val_curve}
+    if args.streaming:
+        curves["stream_val"] = stream_curve
+    roc_path = write_report(meta_path, curves)
 
     print(f"Exported {onnx_path}")
     print(f"Wrote    {meta_path}")
+    print(f"Wrote    {roc_path}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,21 @@
+"""Refractory timing: replay faster than real time must fire like live audio."""
+import numpy as np
+
+from wake_word import config
+from wake_word.detector import WakeWordDetector, replay_triggers
+
+
+def test_audio_clock_replay_matches_scan():
+    rng = np.random.default_rng(0)
+    audio = (rng.standard_normal(20 * config.SAMPLE_RATE) * 3000).astype(np.int16)
+
+    det = WakeWordDetector(threshold=0.0)   # every evaluation is a hit
+    det.clock = lambda: det._counts["samples"] / config.SAMPLE_RATE
+    fired = sum(det.process(audio[i:i + config.FRAME_LENGTH]) == 0
+                for i in range(0, len(audio), config.FRAME_LENGTH))
+
+    scanned = det.scan(audio.astype(np.float32) / 32768.0)
+    expected = replay_triggers(scanned.times, scanned.probs, 0.0)[1]
+    # Only the refractory period limits the rate: one trigger per REFRACTORY_SECONDS or so.
+    assert fired == len(expected)
+    assert fired >= (20 - config.WINDOW_SECONDS) / (config.REFRACTORY_SECONDS + 0.5)
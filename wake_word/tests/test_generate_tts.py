@@ -0,0 +1,121 @@
+"""generate_tts.py against a local stub of ``POST /audio/speech``: retries on
+429 (honouring Retry-After) and 500, the manifest, and resuming a run."""
+import io
+import json
+import os
+import subprocess
+import sys
+import threading
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import pytest
+import soundfile as sf
+
+SCRIPT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                      "scripts", "generate_tts.py")
+BROKEN_PHRASE = "Alexa"   # always answered with a 500 until the stub is fixed
+
+
+def _wav() -> bytes:
+    buf = io.BytesIO()
+    sf.write(buf, np.zeros(2400, dtype=np.float32), 24000, subtype="PCM_16", format="WAV")
+    return buf.getvalue()
+
+
+class _Stub(BaseHTTPRequestHandler):
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        server = self.server
+        with server.lock:
+            server.calls[body["input"]] += 1
+            n = server.calls[body["input"]]
+        if server.broken and body["input"] == BROKEN_PHRASE:
+            return self._error(500)
+        if n == 1:   # first attempt for every phrase is rate limited
+            return self._error(429, {"Retry-After": "0.05"})
+        if n == 2 and body["input"].endswith("?"):
+            return self._error(500)
+        payload = _wav()
+        self.send_response(200)
+        self.send_header("Content-Type", "audio/wav")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _error(self, status, headers=None):
+        payload = json.dumps({"error": {"message": "stub", "type": "stub"}}).encode()
+        self.send_response(status)
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Stub)
+    server.lock = threading.Lock()
+    server.calls = Counter()
+    server.broken = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _run(stub, data_dir) -> str:
+    base_url = f"http://127.0.0.1:{stub.server_address[1]}/v1"
+    out = subprocess.run(
+        [sys.executable, SCRIPT, "--voices", "alloy", "--data-dir", str(data_dir),
+         "--base-url", base_url, "--retries", "3", "--backoff", "0.01",
+         "--max-backoff", "0.2", "--concurrency", "4"],
+        capture_output=True, text=True, timeout=120,
+        env={**os.environ, "OPENAI_API_KEY": ""},
+    )
+    assert out.returncode == 0, out.stderr
+    return out.stdout
+
+
+def _manifest(data_dir) -> dict:
+    records = {}
+    with open(os.path.join(data_dir, "tts_manifest.jsonl")) as f:
+        for line in f:
+            rec = json.loads(line)
+            records[rec["key"]] = rec
+    return records
+
+
+def test_retries_manifest_and_resume(stub, tmp_path):
+    _run(stub, tmp_path)
+    records = _manifest(tmp_path)
+    phrases = list(stub.calls)
+    assert len(records) == len(phrases)
+
+    for key, rec in records.items():
+        path = os.path.join(tmp_path, key)
+        if rec["phrase"] == BROKEN_PHRASE:
+            assert rec["status"] == "failed"
+            assert rec["attempts"] == 4   # --retries 3
+            assert "500" in rec["error"]
+            assert not os.path.exists(path)
+        else:
+            assert rec["status"] == "done"
+            assert rec["attempts"] == (3 if rec["phrase"].endswith("?") else 2)
+            assert os.path.exists(path)
+    assert stub.calls[BROKEN_PHRASE] == 4
+
+    # Resume: only the failed item is requested again.
+    stub.broken = False
+    stub.calls.clear()
+    stdout = _run(stub, tmp_path)
+    assert "Resuming" in stdout
+    assert list(stub.calls) == [BROKEN_PHRASE]
+    assert all(rec["status"] == "done" for rec in _manifest(tmp_path).values())
@@ -0,0 +1,94 @@
+"""Exact rate curves and threshold choice; the model .json keeps a coarse ROC
+and the full curve goes to the report file."""
+import json
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scripts"))
+from metrics import (  # noqa: E402
+    MAX_AUTO_THRESHOLD, METADATA_CURVE_POINTS, choose_threshold, rate_curve, report_path, write_report,
+)
+from wake_word import config  # noqa: E402
+
+
+def _labelled(pos, hard, neg=()):
+    probs = np.array([*pos, *hard, *neg], dtype=np.float64)
+    labels = np.array([1] * len(pos) + [0] * (len(hard) + len(neg)))
+    categories = np.array(["positives"] * len(pos) + ["hard_negatives"] * len(hard)
+                          + ["negatives"] * len(neg))
+    return rate_curve(probs, labels, categories)
+
+
+def test_rate_curve_is_exact_at_every_score():
+    curve = _labelled(pos=[0.6, 0.7, 0.7, 0.9], hard=[0.3, 0.7], neg=[0.1, 0.6])
+    np.testing.assert_array_equal(curve.thresholds, [0.1, 0.3, 0.6, 0.7, 0.9])
+    np.testing.assert_array_equal(curve.recall, [1.0, 1.0, 1.0, 0.75, 0.25])
+    np.testing.assert_array_equal(curve.hard_negative_rate, [1.0, 1.0, 0.5, 0.5, 0.0])
+    np.testing.assert_array_equal(curve.false_alarm_rate, [1.0, 0.75, 0.5, 0.25, 0.0])
+    assert curve.at(0.65) == {"recall": 0.75, "false_alarm_rate": 0.25, "hard_negative_rate": 0.5}
+
+
+def test_threshold_sits_at_the_hard_negative_boundary():
+    curve = _labelled(pos=[0.6, 0.7, 0.8, 0.9], hard=[0.1, 0.35, 0.5])
+    # None allowed: just above the highest hard negative, below the lowest positive.
+    thr = choose_threshold(curve, max_hard_neg_rate=0.0)
+    assert 0.5 < thr <= 0.6
+    assert curve.at(thr) == {"recall": 1.0, "false_alarm_rate": 0.0, "hard_negative_rate": 0.0}
+    # One in three allowed: the rate is exactly the target, and any lower
+    # score-level threshold would exceed it.
+    thr = choose_threshold(curve, max_hard_neg_rate=1 / 3)
+    assert thr == 0.4
+    assert curve.at(thr)["hard_negative_rate"] == 1 / 3
+    assert curve.at(0.35)["hard_negative_rate"] > 1 / 3
+
+
+def test_tied_scores_are_rejected_together():
+    # Two hard negatives tie with a positive: allowing one of the three to
+    # trigger still means rejecting both, and the tied positive with them.
+    curve = _labelled(pos=[0.7, 0.8], hard=[0.2, 0.7, 0.7])
+    thr = choose_threshold(curve, max_hard_neg_rate=1 / 3)
+    assert 0.7 < thr <= 0.8
+    assert curve.at(thr) == {"recall": 0.5, "false_alarm_rate": 0.0, "hard_negative_rate": 0.0}
+
+
+def test_saturation_branches():
+    # All positives (no hard negatives to reject): maximize recall at the floor.
+    assert choose_threshold(_labelled(pos=[0.2, 0.9], hard=[]), 0.0) == config.MIN_AUTO_THRESHOLD
+    # Every hard negative may trigger: likewise.
+    assert choose_threshold(_labelled(pos=[0.9], hard=[0.8]), 1.0) == config.MIN_AUTO_THRESHOLD
+    # A hard negative at 1.0 can't be rejected: as strict as allowed.
+    assert choose_threshold(_labelled(pos=[0.9], hard=[1.0]), 0.0) == MAX_AUTO_THRESHOLD
+    # No positives: the package default.
+    assert choose_threshold(_labelled(pos=[], hard=[0.4]), 0.0) == config.DEFAULT_THRESHOLD
+
+
+def _curve(n=5000, seed=0):
+    rng = np.random.default_rng(seed)
+    labels = rng.integers(0, 2, n)
+    probs = np.clip(rng.normal(0.3 + 0.4 * labels, 0.2), 0, 1)
+    categories = np.where((labels == 0) & (rng.random(n) < 0.2), "hard_negatives", "negatives")
+    return rate_curve(probs, labels, categories)
+
+
+def test_metadata_is_downsampled_with_exact_operating_point():
+    curve = _curve()
+    meta = curve.to_metadata(0.55)
+    assert len(curve.thresholds) > METADATA_CURVE_POINTS
+    assert len(meta["thresholds"]) <= METADATA_CURVE_POINTS
+    assert meta["thresholds"][0] == round(float(curve.thresholds[0]), 6)
+    assert meta["thresholds"][-1] == round(float(curve.thresholds[-1]), 6)
+    assert meta["operating_point"]["threshold"] == 0.55
+    assert meta["operating_point"]["recall"] == round(curve.at(0.55)["recall"], 5)
+    assert len(curve.to_report()["thresholds"]) == len(curve.thresholds)
+
+
+def test_write_report_keeps_other_curves(tmp_path):
+    meta_path = str(tmp_path / "aurora.json")
+    write_report(meta_path, {"val": _curve()})
+    path = write_report(meta_path, {"eval": _curve(seed=1)})
+    assert path == report_path(meta_path) == str(tmp_path / "aurora.roc.json")
+    with open(path) as f:
+        report = json.load(f)
+    assert set(report) == {"val", "eval"}
@@ -0,0 +1,62 @@
+"""Streaming frontend parity: the live detector must score exactly what a full
+recompute over its ring buffer would, whatever the microphone frame size."""
+import numpy as np
+import pytest
+
+from wake_word import config, features
+from wake_word.detector import WakeWordDetector
+
+
+def _noise(seconds: float, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    n = int(seconds * config.SAMPLE_RATE)
+    return (rng.standard_normal(n) * 3000).clip(-32768, 32767).astype(np.int16)
+
+
+def _feed(det: WakeWordDetector, audio: np.ndarray, frame: int):
+    """Run ``audio`` through the detector; returns (feature, window) per evaluation."""
+    seen = []
+    score = det._score
+
+    def capture(feat):
+        seen.append((feat.copy(), det._window()))
+        return score(feat)
+
+    det._score = capture
+    for i in range(0, len(audio), frame):
+        det.process(audio[i:i + frame])
+    return seen
+
+
+@pytest.mark.parametrize("frame", [7, 333, 1000, 1024, 4096])
+def test_streaming_matches_full_recompute(frame):
+    det = WakeWordDetector(threshold=1.1)
+    audio = _noise(3.0)
+    seen = _feed(det, audio, frame)
+
+    expected = 1 + (len(audio) - config.WINDOW_SAMPLES) // config.EVAL_HOP_SAMPLES
+    assert len(seen) == expected
+    for k, (feat, window) in enumerate(seen):
+        end = config.WINDOW_SAMPLES + k * config.EVAL_HOP_SAMPLES
+        np.testing.assert_array_equal(window, audio[end - config.WINDOW_SAMPLES:end])
+        x = window.astype(np.float32) / 32768.0
+        full = features._standardize(features._log_mel_frames(x, config.NUM_FRAMES).T)
+        np.testing.assert_allclose(feat[0, 0], full, atol=1e-4)
+        np.testing.assert_allclose(feat, features.waveform_to_model_input(window), atol=1e-4)
+
+
+def test_fired_window_is_the_scored_audio():
+    det = WakeWordDetector(threshold=0.0)
+    audio = _noise(2.0, seed=1)
+    fired = None
+    for i in range(0, len(audio), 1000):
+        if det.process(audio[i:i + 1000]) == 0:
+            fired = i + 1000
+            break
+    assert fired is not None
+    # The evaluation that fired fell inside the last frame (usually not at
+    # its end); the rest of that frame must not leak into the reported window.
+    hops = (fired - config.WINDOW_SAMPLES) // config.EVAL_HOP_SAMPLES
+    end = config.WINDOW_SAMPLES + hops * config.EVAL_HOP_SAMPLES
+    assert fired >= end
+    assert det.window_pcm_bytes() == audio[end - config.WINDOW_SAMPLES:end].tobytes()
@@ -0,0 +1,53 @@
+"""DetectionWorker control messages: stop() and reset() must not block on a
+backed-up frame channel, and reset() must hide the previous cycle's state."""
+import asyncio
+import threading
+import time
+
+from wake_word.worker import DetectionWorker
+
+
+class _SlowDetector:
+    """Stands in for WakeWordDetector; each frame blocks until released."""
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.smoothed_probability = 0.0
+
+    def process_bytes(self, pcm):
+        self.release.wait()
+        self.smoothed_probability = 0.9
+        return -1
+
+    def reset(self):
+        self.smoothed_probability = 0.0
+
+
+def test_stop_does_not_block_on_a_full_channel():
+    det = _SlowDetector()
+    worker = DetectionWorker(det, asyncio.new_event_loop(), max_frames=4)
+    for _ in range(10):
+        worker.submit(b"\0\0")
+    assert worker.dropped_frames > 0
+
+    t0 = time.monotonic()
+    worker.stop(timeout=0.1)
+    assert time.monotonic() - t0 < 1.0
+    det.release.set()
+    worker._thread.join(1.0)
+    assert not worker._thread.is_alive()
+
+
+def test_reset_clears_published_probability():
+    det = _SlowDetector()
+    det.release.set()
+    worker = DetectionWorker(det, asyncio.new_event_loop())
+    worker.submit(b"\0\0")
+    deadline = time.monotonic() + 1.0
+    while worker.smoothed_probability == 0.0 and time.monotonic() < deadline:
+        time.sleep(0.005)
+    assert worker.smoothed_probability == 0.9
+
+    worker.reset()
+    assert worker.smoothed_probability == 0.0
+    worker.stop()
@@ -0,0 +1,140 @@
+"""Run a :class:`~wake_word.detector.WakeWordDetector` off the asyncio loop.
+
+Feature extraction and ``InferenceSession.run`` take a few milliseconds per
+evaluation on the Pi. Done inline in ``main.py`` they stall the event loop, which
+then can't service the PortAudio ``call_soon_threadsafe`` callbacks, UI polling
+or timer checks in the meantime. :class:`DetectionWorker` owns a dedicated thread
+(numpy and onnxruntime release the GIL while they work) fed by a bounded frame
+channel, and hands detections back to the loop as :class:`WakeEvent` objects.
+
+Runtime dependencies: stdlib + the detector's (numpy, onnxruntime).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import queue
+import threading
+from dataclasses import dataclass
+
+from wake_word import config
+from wake_word.detector import WakeWordDetector
+
+log = logging.getLogger("aurora.wakeword")
+
+# Control messages travel through the frame channel so they are applied in
+# order relative to the audio.
+_RESET = object()
+_STOP = object()
+
+
+@dataclass
+class WakeEvent:
+    """One wake word detection, delivered on the event loop."""
+
+    window_pcm: bytes   # the 1.2s int16 window that fired (see window_pcm_bytes)
+    generation: int     # reset() count when it fired; stale events are dropped
+
+
+class DetectionWorker:
+    """Feed mic frames to a detector on a background thread.
+
+    Usage from the event loop::
+
+        worker = DetectionWorker(detector, loop)
+        worker.reset()                 # start of each sleep cycle
+        worker.submit(frame)           # raw int16 PCM bytes, never blocks
+        event = worker.poll()          # WakeEvent or None
+        worker.smoothed_probability    # latest smoothed probability
+        worker.stop()
+
+    The worker only touches the detector from its own thread, so callers must
+    not use the detector directly while the worker is running.
+    """
+
+    def __init__(
+        self,
+        detector: WakeWordDetector,
+        loop: asyncio.AbstractEventLoop,
+        max_frames: int = config.WORKER_QUEUE_FRAMES,
+    ) -> None:
+        self._detector = detector
+        self._loop = loop
+        self._frames: queue.Queue = queue.Queue(maxsize=max_frames)
+        self._events: asyncio.Queue[WakeEvent] = asyncio.Queue()
+        self._generation = 0
+        # (generation, smoothed probability) published by the worker thread as
+        # one tuple, so a value from before the latest reset() is recognizable.
+        self._published = (0, 0.0)
+        self.dropped_frames = 0
+        self._thread = threading.Thread(target=self._run, name="wake-word", daemon=True)
+        self._thread.start()
+
+    # --- event loop side ---------------------------------------------------
+    def submit(self, frame: bytes) -> None:
+        """Queue one frame for detection. Drops it if the worker is backed up."""
+        try:
+            self._frames.put_nowait(frame)
+        except queue.Full:
+            self.dropped_frames += 1
+            if self.dropped_frames % 100 == 1:
+                log.warning("Wake word worker backed up, dropped %d frames", self.dropped_frames)
+
+    @property
+    def smoothed_probability(self) -> float:
+        """The detector's latest smoothed probability for the current cycle
+        (0 right after :meth:`reset`). Published by the worker thread as a
+        single tuple, so it can be read here without a lock."""
+        generation, value = self._published
+        return value if generation == self._generation else 0.0
+
+    def poll(self) -> WakeEvent | None:
+        """Return the next detection for the current cycle, if any."""
+        while True:
+            try:
+                event = self._events.get_nowait()
+            except asyncio.QueueEmpty:
+                return None
+            if event.generation == self._generation:
+                return event
+
+    def reset(self) -> None:
+        """Discard queued audio and re-arm the detector (see detector.reset)."""
+        self._generation += 1
+        self._drain()
+        self._frames.put_nowait((_RESET, self._generation))
+
+    def stop(self, timeout: float = 2.0) -> None:
+        # Queued audio is moot; draining first means the put can't block on a
+        # full channel if the worker is stuck or already gone.
+        self._drain()
+        self._frames.put_nowait(_STOP)
+        self._thread.join(timeout)
+
+    def _drain(self) -> None:
+        try:
+            while True:
+                self._frames.get_nowait()
+        except queue.Empty:
+            pass
+
+    # --- worker thread -----------------------------------------------------
+    def _run(self) -> None:
+        generation = self._generation
+        while True:
+            item = self._frames.get()
+            if item is _STOP:
+                return
+            if isinstance(item, tuple) and item[0] is _RESET:
+                generation = item[1]
+                self._detector.reset()
+                continue
+            try:
+                fired = self._detector.process_bytes(item) >= 0
+                self._published = (generation, self._detector.smoothed_probability)
+                if fired:
+                    event = WakeEvent(self._detector.window_pcm_bytes(), generation)
+                    self._loop.call_soon_threadsafe(self._events.put_nowait, event)
+            except Exception:
+                log.exception("Error in wake word worker")